@@ -1,8 +1,11 @@
 from fastapi import APIRouter
 
+from app.api.endpoints import admin
 from app.api.endpoints import auth
 from app.api.endpoints import user
 from app.api.endpoints import blog
+from app.api.endpoints import health
+from app.api.endpoints import metrics
 
 
 router = APIRouter()
@@ -11,3 +14,6 @@ router = APIRouter()
 router.include_router(auth.router, prefix="/auth", tags=["auth"])
 router.include_router(user.router, prefix="/user", tags=["users"])
 router.include_router(blog.router, prefix="/blogs", tags=["blogs"])
+router.include_router(admin.router, prefix="/admin", tags=["admin"])
+router.include_router(health.router, prefix="/health", tags=["health"])
+router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
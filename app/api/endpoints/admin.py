@@ -0,0 +1,63 @@
+from typing import Literal
+
+from fastapi import APIRouter, Response, Security
+from fastapi.responses import PlainTextResponse
+
+from app.core.cache import redis_cache
+from app.core.dependencies.current_user import get_admin_user
+from app.core.exceptions import BadRequestException, NotFoundException
+from app.core.profiling import SORT_KEYS, render, request_profiler
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get("/cache/hot-keys")
+async def get_hot_keys(
+        limit: int = 50,
+        current_user: User = Security(get_admin_user),
+):
+    """Hot-key rankings: this worker's live estimate and the persisted set."""
+    local = redis_cache.hot_keys.top(limit) if redis_cache.hot_keys else []
+    persisted = await redis_cache.read_hot_keys(limit)
+    return {
+        "local": [{"key": key, "count": count} for key, count in local],
+        "persisted": [{"key": key, "score": score} for key, score in persisted],
+    }
+
+
+@router.get("/profiles")
+async def get_profiles(
+        limit: int = 20,
+        current_user: User = Security(get_admin_user),
+):
+    """The latest stored request profiles, newest first."""
+    return await request_profiler.latest(limit)
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+        profile_id: str,
+        format: Literal["pstats", "text"] = "pstats",
+        sort: str = "cumulative",
+        current_user: User = Security(get_admin_user),
+):
+    """
+    A stored profile: the ``.prof`` file (open it with ``python -m pstats``,
+    snakeviz or speedscope) or, with ``format=text``, a report of the top
+    functions by ``sort``.
+    """
+    if sort not in SORT_KEYS:
+        raise BadRequestException(
+            f"Unknown sort key {sort!r}; use one of {', '.join(sorted(SORT_KEYS))}"
+        )
+    data = await request_profiler.get(profile_id)
+    if data is None:
+        raise NotFoundException("Profile not found")
+    if format == "text":
+        return PlainTextResponse(render(data, sort=sort))
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'},
+    )
@@ -1,26 +1,63 @@
-from fastapi import APIRouter, Depends, Security
+from typing import Any, Literal
 
-from app.controllers.blog import BlogController
+from fastapi import APIRouter, Depends, Query, Response, Security
+
+from app.controllers.blog import LIST_TAG, BlogController
 from app.core.dependencies.current_user import get_current_user
+from app.core.idempotency import idempotent
+from app.core.response_cache import cache_response
 from app.models import User
 from app.schemas.blog import BlogCreate, BlogUpdate
-from app.schemas.blog import BlogResponse
+from app.schemas.blog import BlogResponse, BlogSummary
 
 router = APIRouter()
 
+BlogList = list[BlogResponse] | list[BlogSummary] | list[dict[str, Any]]
+
 
-@router.get("", response_model=list[BlogResponse])
+@router.get("", response_model=BlogList)
+@cache_response(namespace="blogs", model=BlogList, tags=[LIST_TAG])
 async def get_blogs(
+        response: Response,
         offset: int = 0,
         limit: int = 100,
+        fields: str | None = None,
+        view: Literal["full", "summary"] = "full",
         current_user: User = Security(get_current_user),
         blog_controller: BlogController = Depends(BlogController),
 ):
+    """
+    List blogs. ``fields`` is a comma-separated sparse fieldset (``excerpt``
+    included); ``view=summary`` returns id, title, author and an excerpt.
+    """
+    response.headers["X-Total-Count"] = str(await blog_controller.count_blogs())
     return await blog_controller.read_blogs(
-        offset=offset, limit=limit
+        offset=offset,
+        limit=limit,
+        fields=[field.strip() for field in fields.split(",") if field.strip()]
+        if fields else None,
+        view=view,
     )
 
 
+@router.get("/feed", response_model=list[BlogResponse])
+async def get_feed(
+        response: Response,
+        before: str | None = None,
+        limit: int = Query(default=20, ge=1, le=100),
+        current_user: User = Security(get_current_user),
+        blog_controller: BlogController = Depends(BlogController),
+):
+    """
+    Latest posts, newest first. Pass the ``X-Next-Cursor`` response header
+    as ``before`` to get the next page; it is absent on the last page.
+    """
+    posts, cursor = await blog_controller.read_feed(before=before, limit=limit)
+    if cursor is not None:
+        response.headers["X-Next-Cursor"] = cursor
+    return posts
+
+
 @router.delete("{id}", status_code=204)
 async def delete_blog(
         id: int,
@@ -31,6 +68,7 @@ async def delete_blog(
 
 
 @router.post("", status_code=201, response_model=BlogResponse)
+@idempotent(namespace="blogs", model=BlogResponse, status_code=201)
 async def create_blog(
         blog: BlogCreate,
         current_user: User = Security(get_current_user),
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Request
+
+from app.core.exceptions import ServiceUnavailableException
+
+router = APIRouter()
+
+
+@router.get("")
+@router.get("/live")
+async def health():
+    """Liveness probe; never touches the database or Redis."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready(request: Request):
+    """Readiness probe; fails until start-up warm-up has finished."""
+    if not getattr(request.app.state, "ready", False):
+        raise ServiceUnavailableException("Warming up")
+    return {"status": "ready"}
@@ -1,20 +1,38 @@
-from fastapi import APIRouter, Depends, Security
+from typing import Any
 
-from app.controllers.user import UserController
+from fastapi import APIRouter, Depends, Response, Security
+
+from app.controllers.user import LIST_TAG, UserController
 from app.core.dependencies.current_user import get_current_user
+from app.core.idempotency import idempotent
+from app.core.response_cache import cache_response
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 from app.schemas.user import UserResponse
 
 router = APIRouter()
 
+UserList = list[UserResponse] | list[dict[str, Any]]
+
 
-@router.get("", response_model=list[UserResponse])
+@router.get("", response_model=UserList)
+@cache_response(namespace="users", model=UserList, tags=[LIST_TAG])
 async def get_users(
+        response: Response,
+        offset: int = 0,
+        limit: int = 100,
+        fields: str | None = None,
         current_user: User = Security(get_current_user),
         user_controller: UserController = Depends(UserController),
 ):
-    return await user_controller.read_users()
+    """List users. ``fields`` is a comma-separated sparse fieldset."""
+    response.headers["X-Total-Count"] = str(await user_controller.count_users())
+    return await user_controller.read_users(
+        offset=offset,
+        limit=limit,
+        fields=[field.strip() for field in fields.split(",") if field.strip()]
+        if fields else None,
+    )
 
 
 @router.delete("{id}", status_code=200, response_model=str)
@@ -27,6 +45,7 @@ async def delete_user(
 
 
 @router.post("", status_code=201, response_model=UserResponse)
+@idempotent(namespace="users", model=UserResponse, status_code=201)
 async def create_user(
         user: UserCreate,
         user_controller: UserController = Depends(UserController),
@@ -0,0 +1,117 @@
+"""
+Maintain the monthly partitions of ``blog_posts``.
+
+    python -m app.commands.partitions [--ahead N] [--retain N] [--drop]
+
+Creates the partitions for the current and the next ``--ahead`` months, so
+inserts never land in the default partition, and detaches partitions older
+than ``--retain`` months (0 keeps everything). Detached partitions stay as
+plain tables for archiving unless ``--drop`` is given. Run it daily.
+"""
+import argparse
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import Iterable, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import config
+from app.core.database import engine
+from app.models.blog import BlogPost
+
+logger = logging.getLogger(__name__)
+
+TABLE = BlogPost.__tablename__
+PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(day: date, offset: int = 0) -> date:
+    """First day of the month ``offset`` months from ``day``'s month."""
+    index = day.year * 12 + day.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def expired_partitions(names: Iterable[str], cutoff: date) -> List[str]:
+    """Monthly partitions whose whole range lies before ``cutoff``."""
+    expired = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match and date(int(match[1]), int(match[2]), 1) < cutoff:
+            expired.append(name)
+    return sorted(expired)
+
+
+async def create_partitions(engine_: AsyncEngine, today: date, ahead: int) -> List[str]:
+    names = []
+    for offset in range(ahead + 1):
+        # One short transaction per partition: creating one locks the table.
+        async with engine_.begin() as connection:
+            result = await connection.execute(
+                text("SELECT ensure_blog_posts_partition(:month)"),
+                {"month": month_start(today, offset)},
+            )
+            names.append(result.scalar_one())
+    return names
+
+
+async def detach_partitions(engine_: AsyncEngine, today: date, retain: int,
+                            drop: bool) -> List[str]:
+    async with engine_.connect() as connection:
+        result = await connection.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:table AS regclass)"
+            ),
+            {"table": TABLE},
+        )
+        names = list(result.scalars())
+
+    expired = expired_partitions(names, cutoff=month_start(today, -retain))
+    for name in expired:
+        async with engine_.begin() as connection:
+            await connection.execute(text(f'ALTER TABLE {TABLE} DETACH PARTITION "{name}"'))
+            if drop:
+                await connection.execute(text(f'DROP TABLE "{name}"'))
+    return expired
+
+
+async def main(ahead: int, retain: int, drop: bool) -> None:
+    today = datetime.now(timezone.utc).date()
+    try:
+        created = await create_partitions(engine, today, ahead)
+        logger.info("Partitions present: %s", ", ".join(created))
+        if retain > 0:
+            detached = await detach_partitions(engine, today, retain, drop)
+            logger.info("Partitions %s: %s", "dropped" if drop else "detached",
+                        ", ".join(detached) or "none")
+        async with engine.connect() as connection:
+            stray = (await connection.execute(
+                text(f"SELECT count(*) FROM {TABLE}_default")
+            )).scalar_one()
+        if stray:
+            # ensure_blog_posts_partition moves the rows of a month into its
+            # partition when creating it.
+            logger.warning("%d rows are in %s_default; create the partitions of "
+                           "their months to move them out", stray, TABLE)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--ahead", type=int, default=config.BLOG_PARTITION_MONTHS_AHEAD,
+        help="Months to partition ahead of the current one.",
+    )
+    parser.add_argument(
+        "--retain", type=int, default=config.BLOG_PARTITION_RETENTION_MONTHS,
+        help="Months to keep attached; 0 keeps every partition.",
+    )
+    parser.add_argument("--drop", action="store_true", help="Drop detached partitions.")
+    arguments = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(arguments.ahead, arguments.retain, arguments.drop))
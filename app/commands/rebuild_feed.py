@@ -0,0 +1,40 @@
+"""
+Rebuild the latest-posts feed in Redis from Postgres.
+
+    python -m app.commands.rebuild_feed [--batch-size N]
+
+Safe to run against a live deployment: readers keep the current feed until
+the rebuilt one is swapped in.
+"""
+import argparse
+import asyncio
+import logging
+
+from app.core.cache import redis_cache
+from app.core.config import config
+from app.core.database import AsyncSessionLocal, engine
+from app.core.feed import blog_feed
+
+logger = logging.getLogger(__name__)
+
+
+async def main(batch_size: int) -> None:
+    await redis_cache.connect()
+    try:
+        async with AsyncSessionLocal() as db:
+            total = await blog_feed.rebuild(db=db, batch_size=batch_size)
+        logger.info("Feed rebuilt with %d posts", total)
+    finally:
+        await redis_cache.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--batch-size", type=int, default=config.BLOG_FEED_REBUILD_BATCH_SIZE,
+        help="Posts read from Postgres per query.",
+    )
+    arguments = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(arguments.batch_size))
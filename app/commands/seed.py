@@ -0,0 +1,366 @@
+"""
+Load realistic users and blog posts for performance testing.
+
+    python -m app.commands.seed generate --users 100000 --posts 2000000 [--seed 42] [--truncate]
+    python -m app.commands.seed import [--users users.ndjson] [--posts posts.ndjson]
+
+``generate`` draws a reproducible dataset from ``--seed``: post authors
+follow a Zipf distribution (a few prolific authors, a long tail), content
+lengths are log-normal and timestamps are spread over ``--days`` before
+``--until``. Every user's password is ``seed-password-{id % 8}``; the eight
+bcrypt hashes are computed once instead of once per user.
+
+``import`` loads NDJSON exports, one JSON object per line keyed by column
+name. Rows without ``hashed_password`` get the template of their id.
+
+Rows are written with COPY (asyncpg ``copy_records_to_table``). Secondary
+indexes are dropped during the load and rebuilt afterwards, and the cache
+invalidation triggers are bypassed (``session_replication_role = replica``,
+which needs a superuser; it also skips foreign key checks, so imported
+posts must reference existing users). Sequences are moved past the loaded
+ids and the Redis caches are refreshed at the end.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterable, Iterator, List, Sequence, TextIO, Tuple
+
+import asyncpg
+
+from app.controllers.blog import COUNT_KEY as BLOG_COUNT_KEY
+from app.controllers.blog import LIST_TAG as BLOG_LIST_TAG
+from app.controllers.user import COUNT_KEY as USER_COUNT_KEY
+from app.controllers.user import LIST_TAG as USER_LIST_TAG
+from app.core.bloom import user_filter
+from app.core.cache import redis_cache
+from app.core.config import config
+from app.core.database import AsyncSessionLocal, engine
+from app.core.feed import blog_feed
+from app.core.listener import asyncpg_dsn
+from app.core.password import PasswordHandler
+from app.core.warmup import rebuild_user_filter
+from app.repositories.query_cache import PREFIX as REPO_CACHE_PREFIX
+
+logger = logging.getLogger(__name__)
+
+USER_COLUMNS = ("id", "username", "email", "hashed_password", "full_name", "is_active", "created_at")
+POST_COLUMNS = ("id", "title", "content", "author_id", "created_at", "updated_at")
+TABLES = {"users": USER_COLUMNS, "blog_posts": POST_COLUMNS}
+
+PASSWORD_TEMPLATES = 8
+FIRST_NAMES = (
+    "Ada", "Alan", "Amina", "Bruno", "Chen", "Dana", "Elif", "Farah", "Grace", "Hiro",
+    "Ines", "Jonas", "Kofi", "Lena", "Mateo", "Nadia", "Omar", "Priya", "Rosa", "Sven",
+)
+LAST_NAMES = (
+    "Ahmed", "Berg", "Costa", "Diaz", "Eze", "Fischer", "Garcia", "Haddad", "Ito", "Jensen",
+    "Khan", "Lopez", "Muller", "Nowak", "Okafor", "Park", "Rossi", "Silva", "Tanaka", "Zhang",
+)
+WORDS = (
+    "async", "cache", "query", "index", "latency", "throughput", "python", "postgres",
+    "redis", "request", "worker", "pool", "connection", "partition", "vacuum", "plan",
+    "the", "a", "of", "and", "to", "in", "is", "for", "with", "on", "that", "it", "as",
+    "we", "this", "by", "from", "be", "are", "when", "how", "why", "data", "system",
+    "performance", "design", "scaling", "memory", "disk", "network", "service", "api",
+    "response", "error", "retry", "timeout", "batch", "stream", "event", "lock", "table",
+)
+CORPUS_SIZE = 1 << 20
+
+
+def password_templates() -> List[str]:
+    return [PasswordHandler.hash(f"seed-password-{i}") for i in range(PASSWORD_TEMPLATES)]
+
+
+class Corpus:
+    """Random text sliced from one pre-generated buffer, so generating
+    millions of posts does not cost a string join per word."""
+
+    def __init__(self, rng: random.Random, size: int = CORPUS_SIZE):
+        words = []
+        length = 0
+        while length < size:
+            word = rng.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        self.text = " ".join(words)
+        self.rng = rng
+
+    def take(self, length: int) -> str:
+        """``length`` characters starting at a word boundary."""
+        start = self.text.find(" ", self.rng.randrange(0, len(self.text) - length - 64)) + 1
+        text = self.text[start:start + length]
+        return text[:-1] + "." if text.endswith(" ") else text
+
+
+def zipf_cum_weights(count: int, exponent: float) -> List[float]:
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+def generate_users(rng: random.Random, count: int, first_id: int,
+                   start: datetime, end: datetime,
+                   templates: Sequence[str]) -> Iterator[tuple]:
+    span = (end - start).total_seconds()
+    for id_ in range(first_id, first_id + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield (
+            id_,
+            f"{first.lower()}.{last.lower()}.{id_}",
+            f"user{id_}@example.com",
+            templates[id_ % len(templates)],
+            f"{first} {last}",
+            0 if rng.random() < 0.05 else 1,
+            start + timedelta(seconds=rng.random() * span),
+        )
+
+
+def generate_posts(rng: random.Random, count: int, first_id: int,
+                   author_ids: Sequence[int], start: datetime, end: datetime,
+                   exponent: float, batch_size: int) -> Iterator[tuple]:
+    # Zipf over a shuffled ranking, so the prolific authors are not simply
+    # the lowest ids.
+    ranking = list(author_ids)
+    rng.shuffle(ranking)
+    cum_weights = zipf_cum_weights(len(ranking), exponent)
+    corpus = Corpus(rng)
+    span = (end - start).total_seconds()
+    id_ = first_id
+    for batch_start in range(0, count, batch_size):
+        batch = min(batch_size, count - batch_start)
+        authors = rng.choices(ranking, cum_weights=cum_weights, k=batch)
+        for author_id in authors:
+            length = min(max(int(rng.lognormvariate(7.0, 0.8)), 200), 20000)
+            created_at = start + timedelta(seconds=rng.random() * span)
+            updated_at = (
+                created_at + timedelta(seconds=rng.random() * (end - created_at).total_seconds())
+                if rng.random() < 0.2 else None
+            )
+            yield (
+                id_,
+                corpus.take(rng.randint(20, 80)).capitalize(),
+                corpus.take(length),
+                author_id,
+                created_at,
+                updated_at,
+            )
+            id_ += 1
+
+
+def read_ndjson(lines: TextIO, columns: Sequence[str],
+                templates: Sequence[str]) -> Tuple[List[str], Iterator[tuple]]:
+    """
+    Parse an NDJSON export into COPY records.
+
+    :return: The columns present in the first row (unknown keys are
+        ignored) and the records.
+    """
+    rows = (json.loads(line) for line in lines if line.strip())
+    first = next(rows, None)
+    if first is None:
+        return [], iter(())
+    present = [column for column in columns if column in first]
+    if "hashed_password" in columns and "hashed_password" not in present:
+        present.append("hashed_password")
+
+    def records():
+        for index, row in enumerate(itertools.chain([first], rows)):
+            if "hashed_password" in present and not row.get("hashed_password"):
+                row["hashed_password"] = templates[(row.get("id") or index) % len(templates)]
+            yield tuple(_parse(column, row.get(column)) for column in present)
+
+    return present, records()
+
+
+def _parse(column: str, value):
+    if value is not None and column in ("created_at", "updated_at"):
+        return datetime.fromisoformat(value)
+    return value
+
+
+@asynccontextmanager
+async def bulk_load_session(connection: asyncpg.Connection, tables: Iterable[str]) -> AsyncIterator[None]:
+    """
+    Drop the secondary indexes of ``tables`` and bypass triggers for the
+    duration of the load, then rebuild the indexes (in parallel
+    maintenance workers) and refresh the statistics.
+    """
+    tables = list(tables)
+    indexes = await connection.fetch(
+        "SELECT i.schemaname, i.indexname, i.indexdef FROM pg_indexes i "
+        "WHERE i.tablename = ANY($1::text[]) AND NOT EXISTS ("
+        "SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname)",
+        tables,
+    )
+    await connection.execute("SET session_replication_role = replica")
+    for index in indexes:
+        await connection.execute(f'DROP INDEX "{index["schemaname"]}"."{index["indexname"]}"')
+    try:
+        yield
+    finally:
+        started = time.perf_counter()
+        await connection.execute("SET maintenance_work_mem = '512MB'")
+        for index in indexes:
+            # Definitions of partitioned indexes read "ON ONLY", which
+            # would skip the partitions.
+            await connection.execute(index["indexdef"].replace(" ON ONLY ", " ON ", 1))
+        await connection.execute("RESET session_replication_role")
+        for table in tables:
+            await connection.execute(f"ANALYZE {table}")
+        logger.info("Rebuilt %d indexes in %.1fs", len(indexes), time.perf_counter() - started)
+
+
+async def copy(connection: asyncpg.Connection, table: str, columns: Sequence[str],
+               records: Iterable[tuple], batch_size: int) -> int:
+    total = 0
+    started = time.perf_counter()
+    iterator = iter(records)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            break
+        await connection.copy_records_to_table(table, records=batch, columns=list(columns))
+        total += len(batch)
+        logger.info("%s: %d rows (%.0f rows/s)", table, total,
+                    total / (time.perf_counter() - started))
+    return total
+
+
+async def ensure_partitions(connection: asyncpg.Connection, start: datetime, end: datetime) -> None:
+    """Create the monthly blog_posts partitions the loaded range needs."""
+    if await connection.fetchval("SELECT to_regproc('ensure_blog_posts_partition')") is None:
+        return
+    month = start.date().replace(day=1)
+    while month <= end.date():
+        await connection.execute("SELECT ensure_blog_posts_partition($1)", month)
+        month = (month + timedelta(days=32)).replace(day=1)
+
+
+async def reset_sequences(connection: asyncpg.Connection) -> None:
+    for table in TABLES:
+        await connection.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"GREATEST((SELECT max(id) FROM {table}), 1))"
+        )
+
+
+async def refresh_caches() -> None:
+    await redis_cache.connect()
+    try:
+        await redis_cache.invalidate(
+            keys=[BLOG_COUNT_KEY, USER_COUNT_KEY], tags=[BLOG_LIST_TAG, USER_LIST_TAG]
+        )
+        # Cached misses of the loaded rows are not tagged; drop every
+        # repository cache entry.
+        await redis_cache.delete_pattern(f"{REPO_CACHE_PREFIX}*")
+        async with AsyncSessionLocal() as db:
+            await blog_feed.rebuild(db=db, batch_size=config.BLOG_FEED_REBUILD_BATCH_SIZE)
+            await rebuild_user_filter(
+                db, user_filter, batch_size=config.USER_FILTER_REBUILD_BATCH_SIZE
+            )
+    except ConnectionError as e:
+        logger.warning("Caches not refreshed: %r", e)
+    finally:
+        await redis_cache.close()
+        await engine.dispose()
+
+
+async def generate(arguments: argparse.Namespace) -> None:
+    rng = random.Random(arguments.seed)
+    end = arguments.until
+    start = end - timedelta(days=arguments.days)
+    templates = password_templates()
+
+    connection = await asyncpg.connect(asyncpg_dsn(config.DATABASE_URL))
+    try:
+        if arguments.truncate:
+            await connection.execute("TRUNCATE users, blog_posts RESTART IDENTITY CASCADE")
+        first_user = await connection.fetchval("SELECT COALESCE(max(id), 0) + 1 FROM users")
+        first_post = await connection.fetchval("SELECT COALESCE(max(id), 0) + 1 FROM blog_posts")
+        await ensure_partitions(connection, start, end)
+
+        async with bulk_load_session(connection, TABLES):
+            await copy(connection, "users", USER_COLUMNS, generate_users(
+                rng, arguments.users, first_user, start, end, templates
+            ), arguments.batch_size)
+            author_ids = range(first_user, first_user + arguments.users)
+            await copy(connection, "blog_posts", POST_COLUMNS, generate_posts(
+                rng, arguments.posts, first_post, author_ids, start, end,
+                arguments.zipf, arguments.batch_size,
+            ), arguments.batch_size)
+        await reset_sequences(connection)
+    finally:
+        await connection.close()
+    await refresh_caches()
+
+
+async def import_ndjson(arguments: argparse.Namespace) -> None:
+    templates = password_templates()
+    connection = await asyncpg.connect(asyncpg_dsn(config.DATABASE_URL))
+    try:
+        tables = [table for table, path in (("users", arguments.users), ("blog_posts", arguments.posts)) if path]
+        if "blog_posts" in tables:
+            # Partitions for the whole range are only known after reading
+            # the file; cover it up front with one pass over the timestamps.
+            with open(arguments.posts) as lines:
+                stamps = [
+                    datetime.fromisoformat(row["created_at"])
+                    for row in map(json.loads, filter(str.strip, lines))
+                    if row.get("created_at")
+                ]
+            if stamps:
+                await ensure_partitions(connection, min(stamps), max(stamps))
+
+        async with bulk_load_session(connection, tables):
+            for table in tables:
+                path = arguments.users if table == "users" else arguments.posts
+                with open(path) as lines:
+                    columns, records = read_ndjson(lines, TABLES[table], templates)
+                    if columns:
+                        await copy(connection, table, columns, records, arguments.batch_size)
+        await reset_sequences(connection)
+    finally:
+        await connection.close()
+    await refresh_caches()
+
+
+def _until(value: str) -> datetime:
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+
+def parser() -> argparse.ArgumentParser:
+    parser_ = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser_.add_subparsers(dest="command", required=True)
+
+    generate_ = commands.add_parser("generate", help="Generate a synthetic dataset.")
+    generate_.add_argument("--users", type=int, default=10000)
+    generate_.add_argument("--posts", type=int, default=200000)
+    generate_.add_argument("--seed", type=int, default=42)
+    generate_.add_argument("--days", type=int, default=730, help="Time span of created_at.")
+    generate_.add_argument(
+        "--until", type=_until, default=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        help="End of the time span (ISO date, UTC); fixed so seeds reproduce.",
+    )
+    generate_.add_argument(
+        "--zipf", type=float, default=1.1, help="Skew of posts per author (Zipf exponent).",
+    )
+    generate_.add_argument("--truncate", action="store_true", help="Empty both tables first.")
+
+    import_ = commands.add_parser("import", help="Import NDJSON exports.")
+    import_.add_argument("--users", help="NDJSON file of users.")
+    import_.add_argument("--posts", help="NDJSON file of blog posts.")
+
+    for command in (generate_, import_):
+        command.add_argument("--batch-size", type=int, default=10000, help="Rows per COPY.")
+    return parser_
+
+
+if __name__ == "__main__":
+    arguments = parser().parse_args()
+    logging.basicConfig(level=logging.INFO)
+    run = generate if arguments.command == "generate" else import_ndjson
+    asyncio.run(run(arguments))
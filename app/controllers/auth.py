@@ -10,9 +10,11 @@ from app.core.exceptions import (
 )
 from app.core.jwt import JWTHandler
 from app.core.password import PasswordHandler
+from app.core.tracing import instrument
 from app.repositories.user import UserRepository
 
 
+@instrument
 class AuthController:
     def __init__(
             self,
@@ -34,25 +36,26 @@ class AuthController:
 
         :return: Token: The access token for the authenticated user.
         """
-        async with self.session as db:
-            # Retrieve user based on email
-            user = await self.user_repository.get_by_email(email=email, db=db)
-
-            if not user:
-                raise BadRequestException("Invalid credentials")
-
-            # Verify the password against the stored hash
-            if not PasswordHandler.verify(hashed_password=user.hashed_password,
-                                          plain_password=password):
-                raise UnauthorizedException("Invalid credentials")
-
-            # Generate an access token for the user
-            access_token = JWTHandler.encode(
-                payload={"sub": user.email},
-            )
-            refresh_token = JWTHandler.encode(payload={"sub": user.email})
-            return {
-                "access_token": access_token,
-                "refresh_token": refresh_token,
-                "token_type": "bearer"
-            }
+        db = self.session
+        # Retrieve user based on email
+        user = await self.user_repository.get_by_email(email=email, db=db)
+
+        if not user:
+            raise BadRequestException("Invalid credentials")
+
+        # Verify the password against the stored hash
+        hashed_password = await self.user_repository.get_password_hash(db=db, user=user)
+        if not PasswordHandler.verify(hashed_password=hashed_password,
+                                      plain_password=password):
+            raise UnauthorizedException("Invalid credentials")
+
+        # Generate an access token for the user
+        access_token = JWTHandler.encode(
+            payload={"sub": user.email},
+        )
+        refresh_token = JWTHandler.encode(payload={"sub": user.email})
+        return {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "token_type": "bearer"
+        }
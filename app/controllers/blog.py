@@ -1,21 +1,38 @@
 import json
+from datetime import datetime, timezone
+
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
+from app.core.config import config
+from app.core.database import get_session, invalidate_on_commit
 from app.core.exceptions import NotFoundException, BadRequestException
+from app.core.feed import BlogFeed, Cursor, get_blog_feed, score
+from app.core.tracing import instrument
 from app.models import User, BlogPost
 from app.repositories.blog import BlogRepository
-from app.schemas.blog import BlogCreate, BlogUpdate, BlogResponse
+from app.schemas.blog import BlogCreate, BlogUpdate, BlogResponse, BlogSummary
 from app.core.cache import get_redis_cache, RedisCache
 
+COUNT_KEY = "count:blog_posts"
+# Tag of every cached blog list (and list response).
+LIST_TAG = "blogs"
+PROJECTABLE_FIELDS = set(BlogResponse.model_fields) | {"excerpt"}
+
+
+def author_tag(author_id: int) -> str:
+    """Tag of every cached entry holding one of the author's posts."""
+    return f"author:{author_id}"
+
 
+@instrument
 class BlogController:
     def __init__(
         self,
         session: AsyncSession = Depends(get_session),
         blog_repository: BlogRepository = Depends(BlogRepository),
-        redis_cache: RedisCache = Depends(get_redis_cache)
+        redis_cache: RedisCache = Depends(get_redis_cache),
+        blog_feed: BlogFeed = Depends(get_blog_feed),
     ):
         """
         Controller handling blog operations.
@@ -23,6 +40,7 @@ class BlogController:
         self.session = session
         self.blog_repository: BlogRepository = blog_repository
         self.redis_cache = redis_cache
+        self.blog_feed = blog_feed
 
     async def get_blog(self, id: int):
         cache_key = f"blog:{id}"
@@ -31,72 +49,199 @@ class BlogController:
         if cached_blog:
             return json.loads(cached_blog)  # Return cached data
 
-        async with self.session as db:
-            result = await self.blog_repository.get_by_id(id_=id, db=db)
-            if result is None:
+        db = self.session
+        if config.DB_FAST_PATH:
+            blog = await self.blog_repository.fetch_one(
+                db=db, schema=BlogResponse, column="id", value=id
+            )
+            if blog is None:
                 raise NotFoundException("Blog not found")
+            await self.redis_cache.set(
+                cache_key, blog.model_dump_json(), expire=600,
+                tags=[author_tag(blog.author_id)],
+            )
+            return blog
+
+        result = await self.blog_repository.get_by_id(id_=id, db=db)
+        if result is None:
+            raise NotFoundException("Blog not found")
 
-            # Store result in cache
-            blog = BlogResponse.model_validate(result.__dict__).model_dump()
-            await self.redis_cache.set(cache_key, json.dumps(blog), expire=600)
+        # Store result in cache
+        blog = BlogResponse.model_validate(result.__dict__).model_dump()
+        await self.redis_cache.set(
+            cache_key, json.dumps(blog), expire=600,
+            tags=[author_tag(result.author_id)],
+        )
 
-            return result
+        return result
 
-    async def read_blogs(self, offset: int = 0, limit: int = 100):
+    async def read_blogs(self, offset: int = 0, limit: int = 100,
+                         fields: list[str] | None = None, view: str = "full"):
+        columns = self._projection(fields=fields, view=view)
         cache_key = f"blogs:{offset}:{limit}"
+        if columns is not None:
+            cache_key = f"{cache_key}:{','.join(columns)}"
         cached_blogs = await self.redis_cache.get(cache_key)
 
         if cached_blogs:
             return json.loads(cached_blogs)  # Return cached data
 
-        async with self.session as db:
-            blogs = await self.blog_repository.get_all(db=db)
-            if blogs is None:
-                raise NotFoundException("Blogs not found")
-
-            # Convert SQLAlchemy model to Pydantic response model before caching
-            blog_list = [BlogResponse.model_validate(blog.__dict__).model_dump() for blog in blogs]
+        db = self.session
+        if columns is not None:
+            blog_list = await self.blog_repository.get_projection(
+                db=db,
+                columns=[self._column(column) for column in columns],
+                offset=offset,
+                limit=limit,
+            )
+            await self.redis_cache.set(
+                cache_key, json.dumps(blog_list), expire=600, tags=[LIST_TAG]
+            )
+            return blog_list
+
+        blogs = await self.blog_repository.get_all(db=db, offset=offset, limit=limit)
+        if blogs is None:
+            raise NotFoundException("Blogs not found")
+
+        # Convert SQLAlchemy model to Pydantic response model before caching
+        blog_list = [BlogResponse.model_validate(blog.__dict__).model_dump() for blog in blogs]
+
+        # Store in Redis
+        await self.redis_cache.set(
+            cache_key, json.dumps(blog_list), expire=600, tags=[LIST_TAG]
+        )
+        return blogs
+
+    async def read_feed(self, before: str | None = None,
+                        limit: int = 20) -> tuple[list[dict], str | None]:
+        """
+        Newest posts first, from the Redis feed while it can answer and
+        from Postgres otherwise.
 
-            # Store in Redis
-            await self.redis_cache.set(cache_key, json.dumps(blog_list), expire=600)
-            return blogs
+        :param before: Cursor returned with the previous page.
+        :return: ``(posts, next_cursor)``; the cursor is None on the last page.
+        """
+        try:
+            cursor = Cursor.parse(before) if before is not None else None
+        except ValueError:
+            raise BadRequestException(f"Invalid cursor: {before}")
+
+        entries = await self.blog_feed.page(before=cursor, limit=limit)
+        db = self.session
+        if entries is None:
+            blogs = await self.blog_repository.get_latest(
+                db=db,
+                limit=limit,
+                before=datetime.fromtimestamp(cursor.score, tz=timezone.utc)
+                if cursor is not None else None,
+                before_id=cursor.id if cursor is not None else None,
+            )
+            posts = [BlogResponse.model_validate(blog.__dict__).model_dump() for blog in blogs]
+            next_cursor = Cursor(score(blogs[-1].created_at), blogs[-1].id) \
+                if len(blogs) == limit else None
+            return posts, next_cursor and str(next_cursor)
+
+        missing = [entry.id for entry in entries if entry.item is None]
+        loaded = {}
+        if missing:
+            # Expired items are reloaded by id and written back.
+            blogs = await self.blog_repository.get_by_ids(db=db, ids=missing)
+            loaded = {blog.id: blog.__dict__ for blog in blogs}
+            await self.blog_feed.store(blogs)
+            await self.blog_feed.discard(set(missing) - set(loaded))
+
+        posts = [
+            BlogResponse.model_validate(entry.item or loaded[entry.id]).model_dump()
+            for entry in entries
+            if entry.item is not None or entry.id in loaded
+        ]
+        next_cursor = Cursor(entries[-1].score, entries[-1].id) \
+            if len(entries) == limit else None
+        return posts, next_cursor and str(next_cursor)
+
+    async def count_blogs(self) -> int:
+        cached_count = await self.redis_cache.get(COUNT_KEY)
+        if cached_count is not None:
+            return int(cached_count)
+
+        db = self.session
+        total = await self.blog_repository.count(
+            db=db, mode=config.TOTAL_COUNT_MODE
+        )
+        await self.redis_cache.set(COUNT_KEY, str(total), expire=config.TOTAL_COUNT_TTL)
+        return total
 
     async def create_blog(self, current_user: User, blog: BlogCreate) -> BlogPost:
-        async with self.session as db:
-            blog_dict = blog.model_dump(exclude_unset=True)
-            blog_dict["author_id"] = current_user.id
-            db_blog = await self.blog_repository.create(db=db, **blog_dict)
-            await db.commit()
-
-            # Invalidate cache
-            keys = await self.redis_cache.redis.keys("blogs:*")
-            if keys:
-                await self.redis_cache.redis.delete(*keys)
-            return db_blog
+        db = self.session
+        blog_dict = blog.model_dump(exclude_unset=True)
+        blog_dict["author_id"] = current_user.id
+        db_blog = await self.blog_repository.create(db=db, **blog_dict)
+
+        # Once committed, invalidate list caches and write the fresh entity through
+        invalidate_on_commit(
+            db, self.redis_cache,
+            tags=[LIST_TAG],
+            values=self._write_through(db_blog),
+            value_tags=[author_tag(db_blog.author_id)],
+            counters={COUNT_KEY: 1},
+            ops=[self.blog_feed.add(db_blog)],
+        )
+        return db_blog
 
     async def blog_delete(self, current_user: User, id: int):
-        async with self.session as db:
-            blog = await self.blog_repository.get_by_id(db=db, id_=id)
-            if blog.author_id != current_user.id:
-                raise BadRequestException("Only authors can delete their blogs.")
-            await self.blog_repository.delete(db=db, id=id)
-            await db.commit()
-
-            # Invalidate cache
-            await self.redis_cache.redis.delete(f"blog:{id}")
-            keys = await self.redis_cache.redis.keys("blogs:*")
-            if keys:
-                await self.redis_cache.redis.delete(*keys)
+        db = self.session
+        blog = await self.blog_repository.get_by_id(db=db, id_=id)
+        if blog.author_id != current_user.id:
+            raise BadRequestException("Only authors can delete their blogs.")
+        await self.blog_repository.delete(db=db, id=id)
+
+        # Invalidate cache once committed
+        invalidate_on_commit(
+            db, self.redis_cache,
+            keys=[f"blog:{id}"], tags=[LIST_TAG], counters={COUNT_KEY: -1},
+            ops=[self.blog_feed.remove(id)],
+        )
 
     async def edit_blog_db(self, id: int, blog: BlogUpdate) -> BlogPost:
-        async with self.session as db:
-            blog_ = blog.model_dump()
-            blog = await self.blog_repository.update(db=db, id_=id, update_data=blog_)
-
-            # Invalidate cache
-            await self.redis_cache.redis.delete(f"blog:{id}")
-            keys = await self.redis_cache.redis.keys("blogs:*")
-            if keys:
-                await self.redis_cache.redis.delete(*keys)
-
-            return blog
+        db = self.session
+        blog_ = blog.model_dump(exclude_unset=True)
+        blog = await self.blog_repository.update(db=db, id_=id, update_data=blog_)
+
+        # Once committed, invalidate list caches and write the fresh entity through
+        invalidate_on_commit(
+            db, self.redis_cache,
+            keys=[f"blog:{id}"],
+            tags=[LIST_TAG],
+            values=self._write_through(blog),
+            value_tags=[author_tag(blog.author_id)],
+            ops=[self.blog_feed.update(blog)],
+        )
+        return blog
+
+    @staticmethod
+    def _projection(fields: list[str] | None, view: str) -> list[str] | None:
+        """
+        Resolve the requested columns, or None for full entities. The
+        result is sorted so equivalent requests share one cache entry.
+        """
+        if view == "summary":
+            return sorted(BlogSummary.model_fields)
+        if not fields:
+            return None
+        unknown = set(fields) - PROJECTABLE_FIELDS
+        if unknown:
+            raise BadRequestException(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return sorted(set(fields))
+
+    @staticmethod
+    def _column(field: str):
+        if field == "excerpt":
+            return BlogRepository.excerpt(config.BLOG_EXCERPT_LENGTH)
+        return field
+
+    @staticmethod
+    def _write_through(blog: BlogPost) -> dict[str, str]:
+        if "blog" not in config.CACHE_WRITE_THROUGH:
+            return {}
+        data = BlogResponse.model_validate(blog.__dict__).model_dump()
+        return {f"blog:{blog.id}": json.dumps(data)}
@@ -2,23 +2,37 @@ import json
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
+from app.core.config import config
+from app.core.database import get_session, invalidate_on_commit
 from app.core.exceptions import (
+    BadRequestException,
     NotFoundException,
 )
+from app.core.feed import BlogFeed, get_blog_feed
 from app.core.password import PasswordHandler
+from app.core.tracing import instrument
 from app.models.user import User
+from app.repositories.blog import BlogRepository
 from app.repositories.user import UserRepository
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
 from app.core.cache import get_redis_cache, RedisCache
+from app.controllers.blog import COUNT_KEY as BLOG_COUNT_KEY
+from app.controllers.blog import LIST_TAG as BLOG_LIST_TAG, author_tag
 
+COUNT_KEY = "count:users"
+# Tag of every cached user list (and list response).
+LIST_TAG = "users"
 
+
+@instrument
 class UserController:
     def __init__(
             self,
             session: AsyncSession = Depends(get_session),
             user_repository: UserRepository = Depends(UserRepository),
-            redis_cache: RedisCache = Depends(get_redis_cache)
+            redis_cache: RedisCache = Depends(get_redis_cache),
+            blog_repository: BlogRepository = Depends(BlogRepository),
+            blog_feed: BlogFeed = Depends(get_blog_feed),
     ):
         """
         Controller handling user operations.
@@ -26,81 +40,142 @@ class UserController:
         self.session = session
         self.user_repository: UserRepository = user_repository
         self.redis_cache = redis_cache
+        self.blog_repository = blog_repository
+        self.blog_feed = blog_feed
 
     async def get_user(self, email: str):
-        cache_key = f"user:{id}"
+        cache_key = f"user:{email}"
         cached_user = await self.redis_cache.get(cache_key)
 
         if cached_user:
             return json.loads(cached_user)  # Return cached data
 
-        async with self.session as db:
-            result = await self.user_repository.get_by_email(email=email, db=db)
-            if result is None:
-                raise NotFoundException("User not found")
+        db = self.session
+        result = await self.user_repository.get_by_email(email=email, db=db)
+        if result is None:
+            raise NotFoundException("User not found")
 
-                # Store result in cache
-            blog = UserResponse.model_validate(result.__dict__).model_dump()
-            await self.redis_cache.set(cache_key, json.dumps(blog), expire=600)
+            # Store result in cache
+        blog = UserResponse.model_validate(result.__dict__).model_dump()
+        await self.redis_cache.set(cache_key, json.dumps(blog), expire=600)
 
-            return result
+        return result
 
-    async def read_users(self, offset: int = 0, limit: int =100):
+    async def read_users(self, offset: int = 0, limit: int =100,
+                         fields: list[str] | None = None):
+        columns = self._projection(fields=fields)
         cache_key = f"users:{offset}:{limit}"
+        if columns is not None:
+            cache_key = f"{cache_key}:{','.join(columns)}"
         cached_users = await self.redis_cache.get(cache_key)
 
         if cached_users:
             return json.loads(cached_users)  # Return cached data
 
-        async with self.session as db:
-            users = await self.user_repository.get_all(db=db)
-            if users is None:
-                raise NotFoundException("Users not found")
-            # Convert SQLAlchemy model to Pydantic response model before caching
-            blog_list = [UserResponse.model_validate(user.__dict__).model_dump() for
-                         user in users]
-            # Store in Redis
-            await self.redis_cache.set(cache_key, json.dumps(blog_list), expire=600)
-
-            return users
+        db = self.session
+        if columns is not None:
+            user_list = await self.user_repository.get_projection(
+                db=db, columns=columns, offset=offset, limit=limit
+            )
+            await self.redis_cache.set(
+                cache_key, json.dumps(user_list), expire=600, tags=[LIST_TAG]
+            )
+            return user_list
+
+        users = await self.user_repository.get_all(db=db, offset=offset, limit=limit)
+        if users is None:
+            raise NotFoundException("Users not found")
+        # Convert SQLAlchemy model to Pydantic response model before caching
+        blog_list = [UserResponse.model_validate(user.__dict__).model_dump() for
+                     user in users]
+        # Store in Redis
+        await self.redis_cache.set(
+            cache_key, json.dumps(blog_list), expire=600, tags=[LIST_TAG]
+        )
+
+        return users
+
+    async def count_users(self) -> int:
+        cached_count = await self.redis_cache.get(COUNT_KEY)
+        if cached_count is not None:
+            return int(cached_count)
+
+        db = self.session
+        total = await self.user_repository.count(
+            db=db, mode=config.TOTAL_COUNT_MODE
+        )
+        await self.redis_cache.set(COUNT_KEY, str(total), expire=config.TOTAL_COUNT_TTL)
+        return total
 
     async def create_user(self, user: UserCreate) -> User:
-        async with self.session as db:
-            user_dict = user.model_dump(exclude_unset=True)
-            password = user_dict.pop("password")
-            user_dict["hashed_password"] = PasswordHandler.hash(password)
-            db_user = await self.user_repository.create(db=db, **user_dict)
-            await db.commit()
-
-            # Invalidate cache
-            keys = await self.redis_cache.redis.keys("users:*")
-            if keys:
-                await self.redis_cache.redis.delete(*keys)
-            return db_user
+        db = self.session
+        user_dict = user.model_dump(exclude_unset=True)
+        password = user_dict.pop("password")
+        user_dict["hashed_password"] = PasswordHandler.hash(password)
+        db_user = await self.user_repository.create(db=db, **user_dict)
+
+        # Once committed, invalidate list caches and write the fresh entity through
+        invalidate_on_commit(
+            db, self.redis_cache,
+            tags=[LIST_TAG],
+            values=self._write_through(db_user),
+            counters={COUNT_KEY: 1},
+        )
+        return db_user
 
     async def user_delete(self,  id: int):
-        async with self.session as db:
-            await self.user_repository.delete(db=db, id=id)
-
-            # Invalidate cache
-            await self.redis_cache.redis.delete(f"user:{id}")
-            keys = await self.redis_cache.redis.keys("users:*")
-            if keys:
-                await self.redis_cache.redis.delete(*keys)
-            await db.commit()
+        db = self.session
+        user = await self.user_repository.get_by_id(db=db, id_=id)
+        post_ids = await self.blog_repository.get_ids_by_author(db=db, author_id=id)
+        await self.user_repository.delete(db=db, id=id)
+
+        # Invalidate cache once committed
+        # The user's posts are removed by the cascade: their cached posts,
+        # feed entries and every blog list go too, and the blog count is
+        # dropped and recomputed rather than adjusted.
+        invalidate_on_commit(
+            db, self.redis_cache,
+            keys=[f"user:{user.email}", BLOG_COUNT_KEY],
+            tags=[LIST_TAG, BLOG_LIST_TAG, author_tag(id)],
+            counters={COUNT_KEY: -1},
+            ops=[self.blog_feed.remove(post_id) for post_id in post_ids],
+        )
 
     async def edit_user_db(self, id: int, user: UserUpdate) -> User:
-        async with self.session as db:
-            user_ = user.model_dump()
-            if user.password:
-                password = user_.pop("password")
-                user_["hashed_password"] = PasswordHandler.hash(password)
-
-            user = await self.user_repository.update(db=db, id_=id,
-                                                     update_data=user_)
-            # Invalidate cache
-            await self.redis_cache.redis.delete(f"user:{id}")
-            keys = await self.redis_cache.redis.keys("users:*")
-            if keys:
-                await self.redis_cache.redis.delete(*keys)
-            return user
+        db = self.session
+        user_ = user.model_dump(exclude_unset=True)
+        password = user_.pop("password", None)
+        if password:
+            user_["hashed_password"] = PasswordHandler.hash(password)
+
+        user = await self.user_repository.update(db=db, id_=id,
+                                                 update_data=user_)
+
+        # Once committed, invalidate list caches and write the fresh entity through
+        invalidate_on_commit(
+            db, self.redis_cache,
+            keys=[f"user:{user.email}"],
+            tags=[LIST_TAG],
+            values=self._write_through(user),
+        )
+        return user
+
+    @staticmethod
+    def _projection(fields: list[str] | None) -> list[str] | None:
+        """
+        Resolve the requested columns, or None for full entities. Only
+        response fields are projectable, never ``hashed_password``.
+        """
+        if not fields:
+            return None
+        unknown = set(fields) - set(UserResponse.model_fields)
+        if unknown:
+            raise BadRequestException(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return sorted(set(fields))
+
+    @staticmethod
+    def _write_through(user: User) -> dict[str, str]:
+        if "user" not in config.CACHE_WRITE_THROUGH:
+            return {}
+        data = UserResponse.model_validate(user.__dict__).model_dump()
+        return {f"user:{user.email}": json.dumps(data)}
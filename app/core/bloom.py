@@ -0,0 +1,181 @@
+"""
+Bloom filters kept as Redis bitmaps, to answer "certainly absent" for
+lookups of values that do not exist without touching Postgres.
+
+A filter is built from Postgres in one pass and swapped in with RENAME;
+values written afterwards are added with SETBIT before their transaction
+commits, so a value is never missing from the filter while its row is
+visible. When Redis does not take them the filter is switched off until
+rebuilt, or, if that fails too, the write is refused. Rows written outside
+the API are added by the cache invalidation listener, and the filter is
+rebuilt once it is ``max_age`` seconds old, so deleted or renamed values
+only cost a database lookup until then.
+"""
+import asyncio
+import hashlib
+import math
+from functools import partial
+from typing import AsyncIterator, Iterable
+
+from app.core.cache import PipelineOp, RedisCache, redis_cache
+from app.core.config import config
+from app.core.metrics import metrics
+
+# Bits set during a rebuild are kept in a journal and merged into the
+# rebuilt bitmap, so concurrent additions are not lost by the swap.
+JOURNAL_TTL = 3600
+
+bloom_counter = metrics.counter(
+    "bloom_filter_checks_total", "Bloom filter membership checks by result."
+)
+
+
+class BloomFilter:
+    """
+    Bloom filter of ``capacity`` values with a false-positive rate of
+    ``error_rate``, stored in the bitmap ``bloom:{name}``.
+
+    Checks fail open: until the filter has been built, or while Redis is
+    unavailable, every value might be present.
+    """
+
+    def __init__(self, cache: RedisCache, name: str, capacity: int,
+                 error_rate: float = 0.01, max_age: int = 86400):
+        self.cache = cache
+        self.name = name
+        self.max_age = max_age
+        self.key = f"bloom:{name}"
+        self.ready_key = f"{self.key}:ready"
+        # Expires ``max_age`` seconds after a rebuild, which asks for the next.
+        self.fresh_key = f"{self.key}:fresh"
+        self.rebuild_key = f"{self.key}:rebuild"
+        self.journal_key = f"{self.key}:journal"
+        self.lock_key = f"{self.key}:rebuild:lock"
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+
+    def offsets(self, value: str) -> list[int]:
+        """Bit offsets of ``value``, by double hashing one 128-bit digest."""
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, value: str) -> PipelineOp:
+        offsets = self.offsets(value)
+
+        def op(pipe):
+            for offset in offsets:
+                pipe.setbit(self.key, offset, 1)
+                pipe.setbit(self.journal_key, offset, 1)
+            pipe.expire(self.journal_key, JOURNAL_TTL)
+
+        return op
+
+    async def add_values(self, *values: str) -> None:
+        """
+        Add ``values`` before they are written. If Redis does not take them
+        the filter is switched off until the next rebuild, so it can never
+        hide them.
+
+        :raises ConnectionError: If neither worked; the write must not go
+            ahead.
+        """
+        if not values:
+            return
+        if await self.cache.pipeline(*(self.add(value) for value in values)) is not None:
+            return
+        bloom_counter.inc(filter=self.name, result="disabled")
+        await self._require(
+            lambda pipe: pipe.delete(self.ready_key, self.fresh_key)
+        )
+
+    async def might_contain(self, value: str) -> bool:
+        """False only if ``value`` was certainly never added."""
+        replies = await self.cache.pipeline(
+            lambda pipe: pipe.exists(self.ready_key),
+            *(partial(_getbit, key=self.key, offset=offset)
+              for offset in self.offsets(value)),
+        )
+        if not replies or not replies[0]:
+            bloom_counter.inc(filter=self.name, result="unavailable")
+            return True
+        present = all(replies[1:])
+        bloom_counter.inc(filter=self.name, result="maybe" if present else "absent")
+        return present
+
+    async def acquire_rebuild_lock(self, expire: int = 300) -> bool:
+        """Lock a rebuild, unless the filter is ready and not too old."""
+        replies = await self.cache.pipeline(
+            lambda pipe: pipe.exists(self.fresh_key),
+            lambda pipe: pipe.set(self.lock_key, "1", nx=True, ex=expire),
+        )
+        return bool(replies) and not replies[0] and bool(replies[1])
+
+    async def release_rebuild_lock(self) -> None:
+        """Let another worker rebuild after this one gave up."""
+        await self.cache.pipeline(lambda pipe: pipe.delete(self.lock_key))
+
+    async def rebuild(self, batches: AsyncIterator[Iterable[str]]) -> int:
+        """
+        Build the filter from every value in ``batches`` and swap it in.
+        Hashing runs off the event loop.
+
+        :return: Number of values added.
+        """
+        await self._require(lambda pipe: pipe.delete(self.journal_key))
+        bits = bytearray((self.size + 7) // 8)
+        total = 0
+        async for batch in batches:
+            total += await asyncio.to_thread(self._set_bits, bits, batch)
+
+        def swap(pipe):
+            pipe.set(self.rebuild_key, bytes(bits))
+            pipe.bitop("OR", self.rebuild_key, self.rebuild_key, self.journal_key)
+            pipe.rename(self.rebuild_key, self.key)
+            pipe.set(self.ready_key, "1")
+            pipe.set(self.fresh_key, "1", ex=self.max_age)
+            pipe.delete(self.lock_key)
+
+        await self._require(swap, transaction=True)
+        return total
+
+    def _set_bits(self, bits: bytearray, values: Iterable[str]) -> int:
+        # SETBIT numbers bits from the most significant bit of each byte.
+        count = 0
+        for value in values:
+            for offset in self.offsets(value):
+                bits[offset >> 3] |= 0x80 >> (offset & 7)
+            count += 1
+        return count
+
+    async def _require(self, *ops: PipelineOp, transaction: bool = False) -> list:
+        replies = await self.cache.pipeline(*ops, transaction=transaction)
+        if replies is None:
+            raise ConnectionError("Redis is unavailable")
+        return replies
+
+
+def _getbit(pipe, key: str, offset: int) -> None:
+    pipe.getbit(key, offset)
+
+
+# Emails and usernames of every user, as ``email:{email}`` and
+# ``username:{username}``.
+user_filter = BloomFilter(
+    redis_cache,
+    "users",
+    capacity=config.USER_FILTER_CAPACITY,
+    error_rate=config.USER_FILTER_ERROR_RATE,
+    max_age=config.USER_FILTER_MAX_AGE,
+)
+
+
+def user_logins(email: str | None = None, username: str | None = None) -> list[str]:
+    """``user_filter`` values of a user's login identifiers."""
+    values = []
+    if email is not None:
+        values.append(f"email:{email}")
+    if username is not None:
+        values.append(f"username:{username}")
+    return values
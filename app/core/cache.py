@@ -1,27 +1,449 @@
+import asyncio
+import logging
+from typing import Any, Callable, Iterable, Mapping
+
 import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from app.core import deadline
+from app.core.circuit_breaker import CircuitBreaker
 from app.core.config import config
+from app.core.hotkeys import HotKeyTracker
+from app.core.metrics import metrics
+from app.core.tracing import instrument
+
+logger = logging.getLogger(__name__)
+
+HOT_KEYS_KEY = "cache:hot_keys"
+TAG_PREFIX = "tag:"
+_UNAVAILABLE = object()
+
+# Adjust a counter only while it is seeded, so a missing counter is
+# recomputed from the database instead of starting from zero.
+INCR_IF_EXISTS = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+# Delete every key recorded in the given tag sets, and the sets themselves,
+# in one server-side step. Members are deleted in chunks to stay below
+# Lua's unpack() limit.
+INVALIDATE_TAGS = """
+local deleted = 0
+for _, tag in ipairs(KEYS) do
+    local members = redis.call('SMEMBERS', tag)
+    for i = 1, #members, 500 do
+        deleted = deleted + redis.call('DEL', unpack(members, i, math.min(i + 499, #members)))
+    end
+    redis.call('DEL', tag)
+end
+return deleted
+"""
+
+# Queues extra commands on a pipeline; see ``RedisCache.pipeline``.
+PipelineOp = Callable[[Any], None]
+
+
+class Invalidation:
+    """
+    Cache changes collected during a unit of work and applied together by
+    ``RedisCache.invalidate`` once it has committed.
+    """
+
+    def __init__(self, cache: "RedisCache"):
+        self.cache = cache
+        self.keys: set[str] = set()
+        self.tags: set[str] = set()
+        self.values: dict[str, str] = {}
+        self.value_tags: dict[str, list[str]] = {}
+        self.counters: dict[str, int] = {}
+        self.ops: list[PipelineOp] = []
+
+    def add(
+            self,
+            keys: Iterable[str] = (),
+            tags: Iterable[str] = (),
+            values: Mapping[str, str] | None = None,
+            value_tags: Iterable[str] = (),
+            counters: Mapping[str, int] | None = None,
+            ops: Iterable[PipelineOp] = (),
+    ) -> None:
+        """
+        Merge one change. ``value_tags`` apply to every key in ``values``;
+        a later value for the same key wins. ``ops`` run in order, after
+        the deletes and writes.
+        """
+        self.keys.update(keys)
+        self.tags.update(tags)
+        for key, value in (values or {}).items():
+            self.values[key] = value
+            self.value_tags[key] = list(value_tags)
+        for key, delta in (counters or {}).items():
+            self.counters[key] = self.counters.get(key, 0) + delta
+        self.ops.extend(ops)
+
+    async def apply(self) -> None:
+        await self.cache.invalidate(
+            keys=sorted(self.keys - set(self.values)),
+            tags=sorted(self.tags),
+            values=self.values,
+            value_tags=self.value_tags,
+            counters={key: delta for key, delta in self.counters.items() if delta},
+            ops=self.ops,
+        )
 
 
+cache_errors_counter = metrics.counter(
+    "cache_errors_total", "Redis commands that failed or timed out."
+)
+
+
+@instrument
 class RedisCache:
-    def __init__(self, redis_url: str):
+    """
+    Redis cache with fail-open semantics.
+
+    Every command goes through a circuit breaker and is bounded by the
+    socket timeout and the remaining request budget. While Redis is slow
+    or unavailable reads behave as misses and writes/invalidations are
+    skipped, so a Redis incident costs latency instead of availability.
+    Skipped invalidations are bounded by the entries' TTL.
+    """
+
+    def __init__(
+            self,
+            redis_url: str,
+            max_connections: int = 50,
+            socket_timeout: float = 0.25,
+            socket_connect_timeout: float = 0.25,
+            breaker: CircuitBreaker | None = None,
+            hot_keys: HotKeyTracker | None = None,
+            tag_ttl: int = 86400,
+            scan_timeout: float = 5.0,
+    ):
         self.redis_url = redis_url
+        self.max_connections = max_connections
+        self.socket_timeout = socket_timeout
+        # Bound of commands that SCAN the keyspace; each SCAN step is still
+        # bounded by the socket timeout.
+        self.scan_timeout = scan_timeout
+        self.socket_connect_timeout = socket_connect_timeout
+        self.breaker = breaker or CircuitBreaker(name="redis")
+        self.hot_keys = hot_keys
+        self.tag_ttl = tag_ttl
+        self.pool = None
         self.redis = None
+        self.raw_pool = None
+        self.raw = None
 
     async def connect(self):
-        self.redis = await redis.from_url(self.redis_url, decode_responses=True)
+        self.pool = redis.ConnectionPool.from_url(
+            self.redis_url,
+            max_connections=self.max_connections,
+            socket_timeout=self.socket_timeout,
+            socket_connect_timeout=self.socket_connect_timeout,
+            health_check_interval=30,
+            decode_responses=True,
+        )
+        self.redis = redis.Redis(connection_pool=self.pool)
+        # Binary-safe client for pre-encoded (possibly compressed) payloads.
+        self.raw_pool = redis.ConnectionPool.from_url(
+            self.redis_url,
+            max_connections=self.max_connections,
+            socket_timeout=self.socket_timeout,
+            socket_connect_timeout=self.socket_connect_timeout,
+            health_check_interval=30,
+        )
+        self.raw = redis.Redis(connection_pool=self.raw_pool)
+        self._incr_if_exists = self.redis.register_script(INCR_IF_EXISTS)
+        self._invalidate_tags = self.redis.register_script(INVALIDATE_TAGS)
 
     async def get(self, key: str):
-        return await self.redis.get(key)
+        if self.hot_keys is not None:
+            self.hot_keys.record(key)
+        return await self._execute(lambda: self.redis.get(key))
+
+    async def set(self, key: str, value: str, expire: int = 600,  # Default expiration: 10 minutes
+                  tags: Iterable[str] = ()):
+        """
+        Store ``value`` and record ``key`` under each of ``tags``, so it is
+        purged by ``invalidate_tags``.
+        """
+        tags = list(tags)
+        if not tags:
+            await self._execute(lambda: self.redis.set(key, value, ex=expire))
+            return
+
+        async def run():
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.set(key, value, ex=expire)
+                self._tag(pipe, key, tags, expire)
+                await pipe.execute()
+
+        await self._execute(run)
+
+    async def set_if_absent(self, key: str, value: str, expire: int) -> bool | None:
+        """
+        SET NX with an expiry.
+
+        :return: True if stored, False if ``key`` exists, None if Redis is
+            unavailable.
+        """
+        stored = await self._execute(
+            lambda: self.redis.set(key, value, nx=True, ex=expire),
+            fallback=_UNAVAILABLE,
+        )
+        if stored is _UNAVAILABLE:
+            return None
+        return bool(stored)
+
+    async def set_many(self, values: Mapping[str, str], expire: int = 600,
+                       tags: Mapping[str, Iterable[str]] | None = None):
+        """
+        Write several keys in one pipelined round trip.
+
+        :param tags: Optional tags per key.
+        """
+        async def run():
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in values.items():
+                    pipe.set(key, value, ex=expire)
+                    self._tag(pipe, key, (tags or {}).get(key, ()), expire)
+                await pipe.execute()
+
+        if values:
+            await self._execute(run)
 
-    async def set(self, key: str, value: str, expire: int = 600):  # Default expiration: 10 minutes
-        await self.redis.set(key, value, ex=expire)
+    async def invalidate_tags(self, *tags: str):
+        """Delete every key recorded under ``tags`` in one round trip."""
+        if tags:
+            await self._execute(lambda: self._invalidate_tags(
+                keys=[TAG_PREFIX + tag for tag in tags]
+            ))
+
+    def _tag(self, pipe, key: str, tags: Iterable[str], expire: int) -> None:
+        # Tag sets outlive their members; a member that already expired is
+        # simply a no-op DEL on invalidation.
+        for tag in tags:
+            pipe.sadd(TAG_PREFIX + tag, key)
+            pipe.expire(TAG_PREFIX + tag, max(expire, self.tag_ttl))
+
+    async def get_response(self, key: str, encoding: str) -> tuple[str, bytes, bytes] | None:
+        """
+        Read the ``encoding`` variant of a cached response, falling back to
+        the identity body, together with its headers in one round trip.
+
+        :return: ``(encoding, body, headers_json)`` or None on a miss.
+        """
+        body, identity, headers = await self._execute(
+            lambda: self.raw.hmget(key, encoding, "identity", "headers"),
+            fallback=(None, None, None),
+        )
+        if body is not None:
+            return encoding, body, headers
+        if identity is not None:
+            return "identity", identity, headers
+        return None
+
+    async def set_response(self, key: str, variants: Mapping[str, bytes],
+                           headers: bytes, expire: int = 600,
+                           tags: Iterable[str] = ()):
+        """Store every encoded variant of a response under one hash."""
+        async def run():
+            async with self.raw.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping={**variants, "headers": headers})
+                pipe.expire(key, expire)
+                self._tag(pipe, key, tags, expire)
+                await pipe.execute()
+
+        await self._execute(run)
+
+    async def adjust_counter(self, key: str, delta: int):
+        """Increment a seeded counter by ``delta``; unseeded counters stay unset."""
+        await self._execute(
+            lambda: self._incr_if_exists(keys=[key], args=[delta])
+        )
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self._execute(lambda: self.redis.delete(*keys))
+
+    async def delete_pattern(self, pattern: str):
+        """Delete every key matching ``pattern`` using SCAN instead of KEYS."""
+        async def scan_and_delete():
+            keys = [key async for key in self.redis.scan_iter(match=pattern, count=500)]
+            if keys:
+                await self.redis.delete(*keys)
+
+        await self._execute(scan_and_delete, timeout=self.scan_timeout)
+
+    async def invalidate(
+            self,
+            keys: Iterable[str] = (),
+            patterns: Iterable[str] = (),
+            values: Mapping[str, str] | None = None,
+            expire: int = 600,
+            tags: Iterable[str] = (),
+            value_tags: Mapping[str, Iterable[str]] | None = None,
+            counters: Mapping[str, int] | None = None,
+            ops: Iterable[PipelineOp] = (),
+    ):
+        """
+        Delete ``keys``, every key recorded under ``tags`` and every key
+        matching ``patterns``, write ``values`` (write-through, tagged per
+        key with ``value_tags``), adjust seeded ``counters`` and queue the
+        commands of ``ops``, all in a single MULTI pipeline: one round
+        trip, and readers never observe the gap between invalidation and
+        refill.
+
+        Prefer ``tags`` over ``patterns``: patterns need a SCAN of the
+        whole keyspace first.
+        """
+        async def run():
+            stale = list(keys)
+            for pattern in patterns:
+                stale.extend(
+                    [key async for key in self.redis.scan_iter(match=pattern, count=500)]
+                )
+            tag_keys = [TAG_PREFIX + tag for tag in tags]
+            async with self.redis.pipeline(transaction=True) as pipe:
+                # Plain EVAL rather than registered scripts: those make the
+                # pipeline check SCRIPT EXISTS first, an extra round trip.
+                if tag_keys:
+                    pipe.eval(INVALIDATE_TAGS, len(tag_keys), *tag_keys)
+                if stale:
+                    pipe.delete(*stale)
+                for key, value in (values or {}).items():
+                    pipe.set(key, value, ex=expire)
+                    self._tag(pipe, key, (value_tags or {}).get(key, ()), expire)
+                for key, delta in (counters or {}).items():
+                    pipe.eval(INCR_IF_EXISTS, 1, key, delta)
+                for op in ops:
+                    op(pipe)
+                await pipe.execute()
+
+        await self._execute(run, timeout=self.scan_timeout if patterns else None)
+
+    async def pipeline(self, *ops: PipelineOp, transaction: bool = False,
+                       binary: bool = False, fallback=None) -> list | Any:
+        """
+        Queue the commands of ``ops`` on one pipeline and run it in a
+        single round trip.
+
+        :param binary: Use the binary-safe client (replies are bytes).
+        :return: The replies of every queued command, or ``fallback``.
+        """
+        async def run():
+            client = self.raw if binary else self.redis
+            async with client.pipeline(transaction=transaction) as pipe:
+                for op in ops:
+                    op(pipe)
+                return await pipe.execute()
+
+        return await self._execute(run, fallback=fallback)
+
+    async def persist_hot_keys(self, expire: int = 86400):
+        """
+        Merge this worker's top-K ranking into the shared hot-key sorted set
+        used for warm-up, adding its counts to the other workers', then age
+        the local counters once they are stored.
+        """
+        if self.hot_keys is None:
+            return
+        ranking = dict(self.hot_keys.top())
+        if not ranking:
+            return
+
+        async def run():
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for key, count in ranking.items():
+                    pipe.zincrby(HOT_KEYS_KEY, count, key)
+                pipe.zremrangebyrank(HOT_KEYS_KEY, 0, -(self.hot_keys.capacity + 1))
+                pipe.expire(HOT_KEYS_KEY, expire)
+                return await pipe.execute()
+
+        if await self._execute(run) is not None:
+            self.hot_keys.decay()
+
+    async def read_hot_keys(self, limit: int) -> list[tuple[str, float]]:
+        """Return the persisted hot-key ranking, hottest first."""
+        return await self._execute(
+            lambda: self.redis.zrevrange(HOT_KEYS_KEY, 0, limit - 1, withscores=True),
+            fallback=[],
+        )
 
     async def close(self):
-        if self.redis:
-            await self.redis.close()
+        for client in (self.redis, self.raw):
+            if client:
+                await client.close()
+        for pool in (self.pool, self.raw_pool):
+            if pool:
+                await pool.disconnect()
+
+    async def _execute(self, command, fallback=None, timeout: float | None = None):
+        """
+        Run ``command`` (a callable returning an awaitable) through the
+        circuit breaker, returning ``fallback`` instead of raising.
+
+        :param timeout: Bound of the whole command, the socket timeout by
+            default. A command cut short by the request budget instead is
+            not counted as a Redis failure.
+        """
+        if self.redis is None:
+            return fallback
+
+        budget = deadline.remaining()
+        if budget is not None and budget <= 0:
+            return fallback
+
+        if not self.breaker.allow_request():
+            return fallback
+
+        timeout = timeout or self.socket_timeout
+        budget_bound = budget is not None and budget < timeout
+        try:
+            result = await asyncio.wait_for(
+                command(), timeout=budget if budget_bound else timeout
+            )
+        except asyncio.TimeoutError:
+            if budget_bound:
+                self.breaker.release()
+                cache_errors_counter.inc(error="DeadlineExceeded")
+                return fallback
+            self.breaker.record_failure()
+            cache_errors_counter.inc(error="TimeoutError")
+            logger.warning("Redis command timed out, bypassing cache")
+            return fallback
+        except (RedisError, OSError) as e:
+            self.breaker.record_failure()
+            cache_errors_counter.inc(error=e.__class__.__name__)
+            logger.warning("Redis command failed, bypassing cache: %r", e)
+            return fallback
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+        return result
 
 
-redis_cache = RedisCache(redis_url=config.REDIS_URL)
+redis_cache = RedisCache(
+    redis_url=config.REDIS_URL,
+    max_connections=config.REDIS_MAX_CONNECTIONS,
+    socket_timeout=config.REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=config.REDIS_SOCKET_CONNECT_TIMEOUT,
+    breaker=CircuitBreaker(
+        name="redis",
+        failure_threshold=config.REDIS_BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout=config.REDIS_BREAKER_RECOVERY_TIMEOUT,
+    ),
+    hot_keys=HotKeyTracker(capacity=config.HOT_KEYS_CAPACITY)
+    if config.HOT_KEYS_ENABLED else None,
+    tag_ttl=config.CACHE_TAG_TTL,
+    scan_timeout=config.REDIS_SCAN_TIMEOUT,
+)
 
 
 async def get_redis_cache():
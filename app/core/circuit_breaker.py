@@ -0,0 +1,104 @@
+import logging
+import time
+from typing import Callable
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+state_gauge = metrics.gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state (0 = closed, 1 = half open, 2 = open).",
+)
+transitions_counter = metrics.counter(
+    "circuit_breaker_transitions_total", "Circuit breaker state transitions."
+)
+rejected_counter = metrics.counter(
+    "circuit_breaker_rejected_total",
+    "Calls short-circuited while the breaker was open.",
+)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls for ``recovery_timeout`` seconds. It then lets a single
+    probe through (half open); a successful probe closes the breaker, a
+    failed one re-opens it for another recovery period.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            failure_threshold: int = 5,
+            recovery_timeout: float = 10.0,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        state_gauge.set(_STATE_VALUES[CLOSED], name=name)
+
+    @property
+    def state(self) -> str:
+        if (
+                self._state == OPEN
+                and self._clock() - self._opened_at >= self.recovery_timeout
+        ):
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may proceed. Every allowed call must be
+        followed by ``record_success``, ``record_failure`` or ``release``.
+        """
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        rejected_counter.inc(name=self.name)
+        return False
+
+    def release(self) -> None:
+        """Abandon an allowed call without recording an outcome."""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_in_flight = False
+        if self._state != CLOSED:
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+            if self._state != OPEN:
+                self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        logger.warning(
+            "Circuit breaker %s: %s -> %s", self.name, self._state, state
+        )
+        self._state = state
+        state_gauge.set(_STATE_VALUES[state], name=self.name)
+        transitions_counter.inc(name=self.name, state=state)
@@ -10,10 +10,118 @@ class BaseConfig(BaseSettings):
 class Config(BaseConfig):
     ENVIRONMENT: str
     DATABASE_URL: str
+    DB_PGBOUNCER: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 256
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 256
+    DB_FAST_PATH: bool = False
+    DB_POOL_PREWARM: int = 5
     SECRET_KEY: str = secrets.token_urlsafe(32)
     JWT_ALGORITHM: str
     JWT_EXPIRE_MINUTES: int
     REDIS_URL: str
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 0.25
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 0.25
+    # Bound of SCAN-based deletes (delete_pattern, pattern invalidation).
+    REDIS_SCAN_TIMEOUT: float = 5.0
+    REDIS_BREAKER_FAILURE_THRESHOLD: int = 5
+    REDIS_BREAKER_RECOVERY_TIMEOUT: float = 10.0
+    CACHE_TAG_TTL: int = 86400
+    CACHE_LISTENER_ENABLED: bool = True
+    # Direct Postgres URL for LISTEN; PgBouncer in transaction mode cannot
+    # hold a LISTEN session. Defaults to DATABASE_URL.
+    CACHE_LISTENER_DATABASE_URL: str | None = None
+    CACHE_WRITE_THROUGH: list[str] = ["blog", "user"]
+    HOT_KEYS_ENABLED: bool = True
+    HOT_KEYS_CAPACITY: int = 200
+    HOT_KEYS_PERSIST_INTERVAL: float = 60.0
+    # Emails of the users allowed to use the /admin endpoints.
+    ADMIN_EMAILS: list[str] = []
+    CACHE_WARMUP_LIMIT: int = 200
+    CACHE_WARMUP_CONCURRENCY: int = 4
+    CACHE_WARMUP_TIMEOUT: float = 10.0
+    # Budget of each feed / user filter rebuild; kept below the 300s
+    # expiry of their rebuild locks.
+    CACHE_REBUILD_TIMEOUT: float = 240.0
+    IDEMPOTENCY_TTL: int = 86400
+    # Bounds how long a crashed request blocks its key.
+    IDEMPOTENCY_LOCK_TTL: int = 60
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 2.0
+    TOTAL_COUNT_MODE: str = "estimate"
+    TOTAL_COUNT_TTL: int = 3600
+    BLOG_EXCERPT_LENGTH: int = 200
+    BLOG_PARTITION_MONTHS_AHEAD: int = 3
+    BLOG_PARTITION_RETENTION_MONTHS: int = 0  # 0: never detach
+    BLOG_FEED_MAX_ITEMS: int = 10000
+    BLOG_FEED_ITEM_TTL: int = 86400
+    BLOG_FEED_REBUILD_BATCH_SIZE: int = 1000
+
+    CONCURRENCY_LIMIT_ENABLED: bool = True
+    CONCURRENCY_LIMIT_INITIAL: int = 20
+    CONCURRENCY_LIMIT_MIN: int = 4
+    CONCURRENCY_LIMIT_MAX: int = 100
+    CONCURRENCY_QUEUE_SIZE: int = 50
+    CONCURRENCY_QUEUE_TIMEOUT: float = 1.0
+    CONCURRENCY_LATENCY_TOLERANCE: float = 2.0
+    LOAD_SHED_EXEMPT_PATHS: list[str] = ["/health", "/metrics"]
+
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0  # 0: one worker per CPU
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE: int = 75
+    SERVER_TIMEOUT: int = 60
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_MAX_REQUESTS: int = 10000
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    SERVER_REUSE_PORT: bool = True
+    # Peers whose X-Forwarded-* headers are trusted: the nginx proxy's
+    # address (comma-separated; "*" trusts every client).
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1,::1"
+
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL: float = 0.1
+    # Stalls longer than this log the loop thread's stack.
+    LOOP_MONITOR_THRESHOLD: float = 0.1
+
+    PROFILING_ENABLED: bool = False
+    # Value of the X-Profile header that profiles a request; None disables
+    # header-triggered profiling.
+    PROFILING_TOKEN: str | None = None
+    PROFILING_SAMPLE_RATE: int = 0  # profile 1 in N requests per route; 0: off
+    PROFILING_TTL: int = 3600
+    PROFILING_MAX_PROFILES: int = 100
+
+    # TTL of repository reads cached with ``cached_read``; 0 disables them.
+    REPO_CACHE_TTL: int = 300
+    # TTL of cached "not found" results of those reads; 0 disables them.
+    NEGATIVE_CACHE_TTL: int = 30
+
+    # Bloom filter of user emails and usernames, sized for this many values.
+    USER_FILTER_CAPACITY: int = 2_000_000
+    USER_FILTER_ERROR_RATE: float = 0.01
+    USER_FILTER_REBUILD_BATCH_SIZE: int = 5000
+    # Seconds until the filter is rebuilt, dropping deleted users' bits.
+    USER_FILTER_MAX_AGE: int = 86400
+    # Seconds between checks whether the filter needs a rebuild.
+    USER_FILTER_CHECK_INTERVAL: float = 60.0
+
+    TRACING_ENABLED: bool = False
+    TRACING_SERVICE_NAME: str = "nexaquanta-api"
+    # Fraction of requests traced; requests with a sampled W3C traceparent
+    # header are always traced.
+    TRACING_SAMPLE_RATIO: float = 0.01
+    # OTLP/JSON batches are appended to this file and/or POSTed to this
+    # OTLP/HTTP endpoint (e.g. http://localhost:4318/v1/traces).
+    TRACING_EXPORT_PATH: str | None = "traces.jsonl"
+    TRACING_EXPORT_URL: str | None = None
+    TRACING_BATCH_SIZE: int = 512
+    TRACING_EXPORT_INTERVAL: float = 5.0
+
+    REQUEST_TIMEOUT_HEADER: str = "X-Request-Timeout"
+    REQUEST_TIMEOUT_DEFAULT: float = 10.0
+    REQUEST_TIMEOUT_MAX: float = 30.0
+    REQUEST_TIMEOUT_ROUTES: dict[str, float] = {}
 
     class Config:
         env_file = "./.env"
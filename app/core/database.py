@@ -1,15 +1,57 @@
+import time
+from uuid import uuid4
+
+from fastapi import Request
+from sqlalchemy import event
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.util import await_only
 
+from app.core import deadline
+from app.core.cache import Invalidation, RedisCache
 from app.core.config import config
+from app.core.exceptions import GatewayTimeoutException
+from app.core.metrics import metrics
 
 Base = declarative_base()
 
+connections_per_request = metrics.histogram(
+    "db_connections_per_request",
+    "Pooled connection checkouts (transactions) per request.",
+    buckets=(0, 1, 2, 3, 5),
+)
+
 DEBUG = config.ENVIRONMENT == "development"
 
+
+def statement_cache_args() -> dict:
+    """
+    asyncpg statement-cache settings.
+
+    Direct connections keep server-side prepared statements cached per
+    connection (``statement_cache_size`` for asyncpg, and
+    ``prepared_statement_cache_size`` for SQLAlchemy's adapter). Behind
+    PgBouncer in transaction mode consecutive statements may land on
+    different server connections, so both caches are disabled and every
+    statement gets a unique name to avoid "prepared statement already
+    exists" errors.
+    """
+    if config.DB_PGBOUNCER:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {
+        "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": config.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    }
+
+
 engine = create_async_engine(
     config.DATABASE_URL,
+    connect_args=statement_cache_args(),
     pool_size=30,
     max_overflow=10,
     pool_timeout=30,
@@ -26,12 +68,89 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
-async def get_session() -> AsyncSession:
+@event.listens_for(Session, "after_begin")
+def apply_statement_timeout(session, transaction, connection) -> None:
+    """
+    Bound every transaction opened for a request by the time left until
+    the request deadline, so Postgres cancels statements nobody waits for.
+    """
+    session.info["checkouts"] = session.info.get("checkouts", 0) + 1
+    request_deadline = session.info.get("deadline")
+    if request_deadline is None:
+        return
+    timeout_ms = max(1, int((request_deadline - time.monotonic()) * 1000))
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+
+
+def invalidate_on_commit(session: AsyncSession | Session, cache: RedisCache,
+                         **changes) -> None:
+    """
+    Register cache changes (see ``Invalidation.add``) on the session. They
+    are applied as one Redis pipeline right after the transaction commits,
+    and dropped if it rolls back, so readers can never re-cache a row that
+    is about to change.
+    """
+    invalidation = session.info.get("invalidation")
+    if invalidation is None:
+        invalidation = session.info["invalidation"] = Invalidation(cache)
+    invalidation.add(**changes)
+
+
+def invalidate_on_rollback(session: AsyncSession | Session, cache: RedisCache,
+                           **changes) -> None:
+    """
+    Register cache changes to apply if the transaction rolls back instead,
+    a failed commit included, e.g. to release a marker set for a write
+    that never happened. They are dropped once it commits.
+    """
+    invalidation = session.info.get("rollback_invalidation")
+    if invalidation is None:
+        invalidation = session.info["rollback_invalidation"] = Invalidation(cache)
+    invalidation.add(**changes)
+
+
+@event.listens_for(Session, "after_commit")
+def apply_invalidation(session) -> None:
+    session.info.pop("rollback_invalidation", None)
+    invalidation = session.info.pop("invalidation", None)
+    if invalidation is not None:
+        # Runs inside AsyncSession.commit()'s greenlet, so the coroutine can
+        # be awaited from this synchronous hook.
+        await_only(invalidation.apply())
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_invalidation(session) -> None:
+    session.info.pop("invalidation", None)
+    invalidation = session.info.pop("rollback_invalidation", None)
+    if invalidation is not None:
+        # Likewise inside AsyncSession.rollback()'s (or close()'s) greenlet.
+        await_only(invalidation.apply())
+
+
+async def get_session(request: Request) -> AsyncSession:
+    """
+    Request-scoped unit of work.
+
+    FastAPI caches the dependency per request, so ``get_current_user``,
+    every controller and their repositories share this one session (and
+    therefore one pooled connection). It commits exactly once after the
+    endpoint returned, or rolls back if it raised; registered cache
+    invalidations follow the outcome (see ``invalidate_on_commit``).
+    """
     session = AsyncSessionLocal()
+    session.info["deadline"] = getattr(request.state, "deadline", None)
     try:
         yield session
+        await session.commit()
     except SQLAlchemyError as e:
         await session.rollback()
+        if deadline.expired(session.info["deadline"]):
+            raise GatewayTimeoutException("Request deadline exceeded", ex=e)
         raise e
+    except BaseException:
+        await session.rollback()
+        raise
     finally:
+        connections_per_request.observe(session.info.get("checkouts", 0))
         await session.close()
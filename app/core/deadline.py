@@ -0,0 +1,57 @@
+import time
+from contextvars import ContextVar
+from typing import Mapping
+
+request_deadline: ContextVar[float | None] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+def parse_timeout(value: str | None) -> float | None:
+    """
+    Parse a client supplied timeout header value in seconds.
+
+    :param value: Raw header value, e.g. ``"2.5"``.
+    :return: Positive timeout in seconds or None when missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        timeout = float(value)
+    except ValueError:
+        return None
+    return timeout if timeout > 0 else None
+
+
+def route_timeout(
+        path: str,
+        routes: Mapping[str, float],
+        default: float
+) -> float:
+    """
+    Resolve the default timeout for a path using the longest matching prefix.
+    """
+    matches = [prefix for prefix in routes if path.startswith(prefix)]
+    if not matches:
+        return default
+    return routes[max(matches, key=len)]
+
+
+def remaining(deadline: float | None = None) -> float | None:
+    """
+    Seconds left in the current request budget.
+
+    :param deadline: Absolute ``time.monotonic()`` deadline, defaults to the
+        deadline of the request being handled.
+    :return: Remaining seconds (may be negative) or None without a deadline.
+    """
+    if deadline is None:
+        deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def expired(deadline: float | None = None) -> bool:
+    budget = remaining(deadline)
+    return budget is not None and budget <= 0
@@ -1,6 +1,6 @@
 from typing import Union
 
-from fastapi import Depends
+from fastapi import Depends, Security
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import ValidationError, BaseModel
@@ -9,8 +9,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.controllers.user import UserController
 from app.core.config import config
 from app.core.database import get_session
-from app.core.exceptions import UnauthorizedException
+from app.core.exceptions import ForbiddenException, UnauthorizedException
+from app.core.tracing import traced
 from app.models.user import User
+from app.schemas.user import UserResponse
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", scheme_name="JWT")
 
@@ -20,11 +22,12 @@ class TokenData(BaseModel):
     expiry: Union[int, None] = None
 
 
+@traced()
 async def get_current_user(
         token: str = Depends(oauth2_scheme),
         session: AsyncSession = Depends(get_session),
         user_controller: UserController = Depends(UserController),
-) -> User:
+) -> User | UserResponse:
     """
     Get the current authenticated user based on the provided security
     scopes and token.
@@ -34,33 +37,52 @@ async def get_current_user(
         token (str): The authentication token.
 
     Returns:
-        User: The current authenticated user.
+        User: The current authenticated user, or its ``UserResponse`` when
+        ``DB_FAST_PATH`` is enabled.
 
     Raises:
         HTTPException: If the credentials cannot be validated or the token
         is expired.
     """
-    async with session as db:
-        try:
-            payload = jwt.decode(
-                token,
-                config.SECRET_KEY,
-                algorithms=[config.JWT_ALGORITHM]
-            )
-            username: str = payload.get("sub")
-            if username is None:
-                raise UnauthorizedException("Could not validate credentials")
-
-            expiry: int = payload.get("exp")
-            token_data = TokenData(username=username, expiry=expiry)
-        except jwt.ExpiredSignatureError:
-            raise UnauthorizedException("Token expired")
-        except (JWTError, ValidationError):
+    try:
+        payload = jwt.decode(
+            token,
+            config.SECRET_KEY,
+            algorithms=[config.JWT_ALGORITHM]
+        )
+        username: str = payload.get("sub")
+        if username is None:
             raise UnauthorizedException("Could not validate credentials")
 
+        expiry: int = payload.get("exp")
+        token_data = TokenData(username=username, expiry=expiry)
+    except jwt.ExpiredSignatureError:
+        raise UnauthorizedException("Token expired")
+    except (JWTError, ValidationError):
+        raise UnauthorizedException("Could not validate credentials")
 
-        user: User = await user_controller.user_repository.get_by_email(db=db, email=token_data.username)
-        if user is None:
-            raise UnauthorizedException("Could not validate credentials")
+    # ``session`` is the request's unit of work, shared with the controllers.
+    if config.DB_FAST_PATH:
+        user = await user_controller.user_repository.fetch_one(
+            db=session, schema=UserResponse, column="email", value=token_data.username
+        )
+    else:
+        user = await user_controller.user_repository.get_by_email(db=session, email=token_data.username)
+    if user is None:
+        raise UnauthorizedException("Could not validate credentials")
+
+    return user
 
-        return user
+
+async def get_admin_user(
+        current_user: User | UserResponse = Security(get_current_user),
+) -> User | UserResponse:
+    """
+    The current user, if listed in ``ADMIN_EMAILS``.
+
+    Raises:
+        ForbiddenException: For every other user.
+    """
+    if current_user.email not in config.ADMIN_EMAILS:
+        raise ForbiddenException("Admin access required")
+    return current_user
@@ -146,6 +146,32 @@ class DatabaseException(APIException):
         )
 
 
+class ServiceUnavailableException(APIException):
+    def __init__(self, custom_msg: str = None, ex: Exception = None):
+        default_msg = HTTPStatus.SERVICE_UNAVAILABLE.description
+        detail_msg = f"{custom_msg}" if custom_msg else default_msg
+
+        super().__init__(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            msg=HTTPStatus.SERVICE_UNAVAILABLE.description,
+            detail=detail_msg,
+            ex=ex,
+        )
+
+
+class GatewayTimeoutException(APIException):
+    def __init__(self, custom_msg: str = None, ex: Exception = None):
+        default_msg = HTTPStatus.GATEWAY_TIMEOUT.description
+        detail_msg = f"{custom_msg}" if custom_msg else default_msg
+
+        super().__init__(
+            status_code=HTTPStatus.GATEWAY_TIMEOUT,
+            msg=HTTPStatus.GATEWAY_TIMEOUT.description,
+            detail=detail_msg,
+            ex=ex,
+        )
+
+
 class ValidationException(APIException):
     def __init__(self, custom_msg: str = None, ex: Exception = None):
         default_msg = HTTPStatus.BAD_REQUEST
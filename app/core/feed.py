@@ -0,0 +1,289 @@
+"""
+Latest-posts feed kept in Redis, so the newest posts are served without
+touching Postgres.
+
+``feed:blogs`` is a sorted set of post ids scored by ``created_at`` (epoch
+seconds) and every post is stored as a hash ``feed:blog:{id}``. A page is
+one ZREVRANGEBYSCORE and one pipelined HGETALL, O(log n + page size) at
+any depth. Writes update the feed in the same pipeline as their cache
+invalidation (see ``invalidate_on_commit``), writes from elsewhere through
+the invalidation listener; ``python -m app.commands.rebuild_feed``
+repopulates it from Postgres.
+"""
+import math
+from datetime import datetime
+from functools import partial
+from typing import Iterable, List, NamedTuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import PipelineOp, RedisCache, redis_cache
+from app.core.config import config
+from app.models.blog import BlogPost
+from app.repositories.blog import BlogRepository
+
+FEED_KEY = "feed:blogs"
+# Set once the feed has been fully built; until then reads use Postgres.
+READY_KEY = "feed:blogs:ready"
+REBUILD_KEY = "feed:blogs:rebuild"
+REBUILD_LOCK_KEY = "feed:blogs:rebuild:lock"
+ITEM_PREFIX = "feed:blog:"
+
+
+def item_key(id_: int) -> str:
+    return f"{ITEM_PREFIX}{id_}"
+
+
+def score(created_at: datetime) -> float:
+    return created_at.timestamp()
+
+
+class Cursor(NamedTuple):
+    """Position of the last post of a page: its score and id."""
+    score: float
+    id: int
+
+    def __str__(self) -> str:
+        return f"{self.score!r}:{self.id}"
+
+    @classmethod
+    def parse(cls, value: str) -> "Cursor":
+        """Parse ``str(cursor)``; raises ValueError on anything else."""
+        score_, _, id_ = value.partition(":")
+        cursor = cls(float(score_), int(id_))
+        if not math.isfinite(cursor.score):
+            raise ValueError(f"Invalid cursor score: {score_}")
+        return cursor
+
+
+class FeedEntry(NamedTuple):
+    id: int
+    score: float
+    # None when the item hash has expired or was dropped.
+    item: dict[str, str] | None
+
+
+class BlogFeed:
+    """
+    Sorted-set feed of the newest ``max_items`` posts.
+
+    Item hashes expire after ``item_ttl`` and are then reloaded by id on
+    the next read, so trimmed or externally changed posts do not stay in
+    memory forever.
+    """
+
+    def __init__(self, cache: RedisCache, max_items: int = 10000,
+                 item_ttl: int = 86400):
+        self.cache = cache
+        self.max_items = max_items
+        self.item_ttl = item_ttl
+
+    @staticmethod
+    def item(blog: BlogPost) -> dict[str, str]:
+        return {
+            "id": str(blog.id),
+            "title": blog.title,
+            "content": blog.content,
+            "author_id": str(blog.author_id),
+        }
+
+    def add(self, blog: BlogPost) -> PipelineOp:
+        """Pipeline op adding a new post."""
+        def op(pipe):
+            self._write_item(pipe, blog)
+            self._insert(pipe, FEED_KEY, blog.id, blog.created_at)
+        return op
+
+    def update(self, blog: BlogPost) -> PipelineOp:
+        """Pipeline op refreshing a post's item."""
+        return partial(self._write_item, blog=blog)
+
+    def insert(self, id_: int, created_at: datetime) -> PipelineOp:
+        """
+        Pipeline op adding a post written elsewhere; its item is loaded on
+        the next read.
+        """
+        def op(pipe):
+            pipe.delete(item_key(id_))
+            self._insert(pipe, FEED_KEY, id_, created_at)
+        return op
+
+    def refresh(self, id_: int, created_at: datetime | None = None) -> PipelineOp:
+        """
+        Pipeline op dropping the item of a post changed elsewhere, to be
+        reloaded on the next read, and rescoring the post if it is listed.
+        """
+        def op(pipe):
+            pipe.delete(item_key(id_))
+            if created_at is not None:
+                pipe.zadd(FEED_KEY, {str(id_): score(created_at)}, xx=True)
+        return op
+
+    def remove(self, id_: int) -> PipelineOp:
+        """Pipeline op removing a deleted post."""
+        def op(pipe):
+            pipe.zrem(FEED_KEY, str(id_))
+            pipe.delete(item_key(id_))
+        return op
+
+    async def page(self, before: Cursor | None, limit: int) -> List[FeedEntry] | None:
+        """
+        Up to ``limit`` posts past the ``before`` cursor, newest first.
+        Posts are ordered on ``(score, id)``, so posts created at the same
+        time are neither skipped nor repeated across pages. Redis orders
+        equal scores by member string instead, so the ties at both ends of
+        the page are read in full and sorted here.
+
+        :return: The entries, or None when the feed cannot answer: it is
+            not built yet, Redis is unavailable, or the page reaches past
+            the trimmed tail.
+        """
+        upper = "+inf" if before is None else f"({before.score!r}"
+        ops = [
+            lambda pipe: pipe.exists(READY_KEY),
+            lambda pipe: pipe.zrevrangebyscore(
+                FEED_KEY, upper, "-inf", start=0, num=limit + 1, withscores=True
+            ),
+            lambda pipe: pipe.zcard(FEED_KEY),
+        ]
+        if before is not None:
+            ops.append(partial(self._read_ties, score_=before.score))
+        replies = await self.cache.pipeline(*ops)
+        if replies is None:
+            return None
+        ready, members, size, *ties = replies
+        if not ready:
+            return None
+        scores = {int(id_): score_ for id_, score_ in members}
+        if ties:
+            scores.update(
+                (int(id_), score_) for id_, score_ in ties[0] if int(id_) < before.id
+            )
+        if len(members) > limit and members[limit - 1][1] == members[limit][1]:
+            cut = await self.cache.pipeline(
+                partial(self._read_ties, score_=members[limit][1])
+            )
+            if cut is None:
+                return None
+            scores.update((int(id_), score_) for id_, score_ in cut[0])
+
+        ranked = sorted(scores.items(), key=lambda pair: (pair[1], pair[0]), reverse=True)
+        ranked = ranked[:limit]
+        if len(ranked) < limit and size >= self.max_items:
+            return None
+        if not ranked:
+            return []
+
+        items = await self.cache.pipeline(*(
+            partial(self._read_item, id_=id_) for id_, _ in ranked
+        ))
+        if items is None:
+            return None
+        return [
+            FeedEntry(id_, score_, item or None)
+            for (id_, score_), item in zip(ranked, items)
+        ]
+
+    async def store(self, blogs: Iterable[BlogPost]) -> None:
+        """Write the items of ``blogs`` that were missing on read."""
+        ops = [self.update(blog) for blog in blogs]
+        if ops:
+            await self.cache.pipeline(*ops)
+
+    async def discard(self, ids: Iterable[int]) -> None:
+        """Drop ids whose posts no longer exist."""
+        ops = [self.remove(id_) for id_ in ids]
+        if ops:
+            await self.cache.pipeline(*ops)
+
+    async def acquire_rebuild_lock(self, expire: int = 300) -> bool:
+        replies = await self.cache.pipeline(
+            lambda pipe: pipe.exists(READY_KEY),
+            lambda pipe: pipe.set(REBUILD_LOCK_KEY, "1", nx=True, ex=expire),
+        )
+        return bool(replies) and not replies[0] and bool(replies[1])
+
+    async def release_rebuild_lock(self) -> None:
+        """Let another worker rebuild after this one gave up."""
+        await self.cache.pipeline(lambda pipe: pipe.delete(REBUILD_LOCK_KEY))
+
+    async def rebuild(self, db: AsyncSession, batch_size: int = 1000) -> int:
+        """
+        Repopulate the feed from Postgres, newest first, in keyset-paginated
+        batches of ``batch_size``. The new set is built under a temporary
+        key and swapped in with RENAME, so readers keep the old feed until
+        the new one is complete.
+
+        :return: Number of posts in the feed.
+        """
+        repository = BlogRepository()
+        await self._require(lambda pipe: pipe.delete(REBUILD_KEY))
+        total = 0
+        cursor: BlogPost | None = None
+        while total < self.max_items:
+            blogs = await repository.get_latest(
+                db=db,
+                limit=min(batch_size, self.max_items - total),
+                before=cursor.created_at if cursor else None,
+                before_id=cursor.id if cursor else None,
+            )
+            if not blogs:
+                break
+            await self._require(*(
+                partial(self._rebuild_item, blog=blog) for blog in blogs
+            ))
+            total += len(blogs)
+            cursor = blogs[-1]
+
+        def swap(pipe):
+            if total:
+                pipe.rename(REBUILD_KEY, FEED_KEY)
+            else:
+                pipe.delete(FEED_KEY)
+            pipe.set(READY_KEY, "1")
+            pipe.delete(REBUILD_LOCK_KEY)
+
+        await self._require(swap, transaction=True)
+
+        # Posts created during the rebuild were added to the replaced set.
+        latest = await repository.get_latest(db=db, limit=batch_size)
+        if latest:
+            await self._require(*(self.add(blog) for blog in latest))
+        return total
+
+    def _rebuild_item(self, pipe, blog: BlogPost) -> None:
+        self._write_item(pipe, blog)
+        pipe.zadd(REBUILD_KEY, {str(blog.id): score(blog.created_at)})
+
+    @staticmethod
+    def _read_item(pipe, id_: int) -> None:
+        pipe.hgetall(item_key(id_))
+
+    @staticmethod
+    def _read_ties(pipe, score_: float) -> None:
+        pipe.zrangebyscore(FEED_KEY, score_, score_, withscores=True)
+
+    def _write_item(self, pipe, blog: BlogPost) -> None:
+        pipe.hset(item_key(blog.id), mapping=self.item(blog))
+        pipe.expire(item_key(blog.id), self.item_ttl)
+
+    def _insert(self, pipe, key: str, id_: int, created_at: datetime) -> None:
+        pipe.zadd(key, {str(id_): score(created_at)})
+        pipe.zremrangebyrank(key, 0, -(self.max_items + 1))
+
+    async def _require(self, *ops: PipelineOp, transaction: bool = False) -> list:
+        replies = await self.cache.pipeline(*ops, transaction=transaction)
+        if replies is None:
+            raise ConnectionError("Redis is unavailable")
+        return replies
+
+
+blog_feed = BlogFeed(
+    redis_cache,
+    max_items=config.BLOG_FEED_MAX_ITEMS,
+    item_ttl=config.BLOG_FEED_ITEM_TTL,
+)
+
+
+async def get_blog_feed():
+    return blog_feed
@@ -0,0 +1,86 @@
+import threading
+from array import array
+from typing import Dict, List, Tuple
+
+
+class CountMinSketch:
+    """
+    Count-min sketch giving an upper-bound estimate of how often a key has
+    been seen, in fixed memory of ``width * depth`` counters.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self._rows = [array("L", [0]) * width for _ in range(depth)]
+
+    def _indexes(self, key: str):
+        for seed in range(self.depth):
+            yield seed, hash((seed, key)) % self.width
+
+    def add(self, key: str, count: int = 1) -> int:
+        """
+        Count ``key`` and return its updated frequency estimate.
+        """
+        estimate = None
+        for row, index in self._indexes(key):
+            value = self._rows[row][index] + count
+            self._rows[row][index] = value
+            estimate = value if estimate is None else min(estimate, value)
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        return min(self._rows[row][index] for row, index in self._indexes(key))
+
+    def decay(self) -> None:
+        """Halve every counter so recent accesses outweigh old ones."""
+        for row in self._rows:
+            for index, value in enumerate(row):
+                if value:
+                    row[index] = value >> 1
+
+
+class HotKeyTracker:
+    """
+    Tracks the approximate top-K most frequently read cache keys using a
+    count-min sketch for frequencies and a small candidate table for the
+    ranking. ``record`` is O(depth) in the common case.
+    """
+
+    def __init__(self, capacity: int = 200, width: int = 2048, depth: int = 4):
+        self.capacity = capacity
+        self.sketch = CountMinSketch(width=width, depth=depth)
+        self._top: Dict[str, int] = {}
+        # Lower bound of the smallest count in ``_top``; counts only grow
+        # between decays, so keys estimated below it can be rejected cheaply.
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def record(self, key: str) -> None:
+        with self._lock:
+            estimate = self.sketch.add(key)
+            if key in self._top or len(self._top) < self.capacity:
+                self._top[key] = estimate
+                return
+            if estimate <= self._floor:
+                return
+
+            coldest = min(self._top, key=self._top.get)
+            if estimate > self._top[coldest]:
+                del self._top[coldest]
+                self._top[key] = estimate
+                coldest = min(self._top, key=self._top.get)
+            self._floor = self._top[coldest]
+
+    def top(self, limit: int | None = None) -> List[Tuple[str, int]]:
+        with self._lock:
+            ranked = sorted(self._top.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit] if limit else ranked
+
+    def decay(self) -> None:
+        with self._lock:
+            self.sketch.decay()
+            self._top = {
+                key: count >> 1 for key, count in self._top.items() if count >> 1
+            }
+            self._floor = min(self._top.values(), default=0)
@@ -0,0 +1,171 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+from typing import Any, Callable
+
+from fastapi import Depends, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import redis_cache
+from app.core.config import config
+from app.core.database import get_session, invalidate_on_commit, invalidate_on_rollback
+from app.core.exceptions import DuplicateValueException, UnprocessableEntity
+from app.core.metrics import metrics
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+PENDING = "pending"
+# Poll interval while a concurrent duplicate is in progress.
+POLL_INTERVAL = 0.05
+
+idempotency_counter = metrics.counter(
+    "idempotency_requests_total", "Requests carrying an Idempotency-Key."
+)
+
+
+def fingerprint(request: Request, body: bytes) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha256(f"{request.method} {request.url.path}?{query}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def client_scope(request: Request, user: Any = None) -> str:
+    """
+    Who an ``Idempotency-Key`` belongs to: the authenticated user, or the
+    client address for anonymous requests (``POST /user``), so anonymous
+    clients never share keys. Behind nginx the address is the
+    ``X-Forwarded-For`` client, see ``SERVER_FORWARDED_ALLOW_IPS``.
+    """
+    if user is not None:
+        return str(user.id)
+    return f"anonymous:{request.client.host if request.client else '-'}"
+
+
+def idempotent(namespace: str, model: Any, status_code: int = 200) -> Callable:
+    """
+    Make a POST route safe to retry with an ``Idempotency-Key`` header.
+
+    The first request stores an in-progress marker (SET NX) and, once its
+    transaction has committed, the final status and body, in the same
+    Redis pipeline as the write's cache invalidation. A duplicate then
+    replays the stored response without running the endpoint; a duplicate
+    arriving while the first is still in progress waits up to
+    ``IDEMPOTENCY_WAIT_TIMEOUT`` and then gets a 409. Reusing a key with a
+    different request is a 422.
+
+    Failed requests, and requests whose commit fails, release the key so
+    they can be retried. Keys are scoped per ``namespace`` and client (see
+    ``client_scope``); requests without the header, or while Redis is
+    unavailable, run unprotected.
+    """
+    adapter = TypeAdapter(model)
+
+    def decorator(endpoint: Callable) -> Callable:
+        signature = inspect.signature(endpoint)
+        parameters = list(signature.parameters.values())
+        injected = [
+            inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, **spec)
+            for name, spec in (
+                ("request", {"annotation": Request}),
+                # The request's own session (dependencies are cached per request).
+                ("session", {"annotation": AsyncSession, "default": Depends(get_session)}),
+            )
+            if name not in signature.parameters
+        ]
+        injected_names = {parameter.name for parameter in injected}
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs["request"]
+            session: AsyncSession = kwargs["session"]
+            for name in injected_names:
+                kwargs.pop(name)
+
+            idempotency_key = request.headers.get(HEADER)
+            if not idempotency_key:
+                return await endpoint(*args, **kwargs)
+
+            scope = client_scope(request, kwargs.get("current_user"))
+            key = f"idempotency:{namespace}:{scope}:{idempotency_key}"
+            request_fingerprint = fingerprint(request, await request.body())
+
+            marker = json.dumps({"state": PENDING, "fingerprint": request_fingerprint})
+            while True:
+                acquired = await redis_cache.set_if_absent(
+                    key, marker, expire=config.IDEMPOTENCY_LOCK_TTL
+                )
+                if acquired is None:
+                    idempotency_counter.inc(namespace=namespace, result="bypass")
+                    return await endpoint(*args, **kwargs)
+                if acquired:
+                    break
+                replayed = await _replay(key, request_fingerprint, namespace)
+                if replayed is not None:
+                    return replayed
+
+            idempotency_counter.inc(namespace=namespace, result="new")
+            try:
+                result = await endpoint(*args, **kwargs)
+            except BaseException:
+                await redis_cache.delete(key)
+                raise
+
+            if isinstance(result, Response):
+                body, code = bytes(result.body), result.status_code
+            else:
+                body = adapter.dump_json(
+                    adapter.validate_python(result, from_attributes=True)
+                )
+                code = status_code
+            record = json.dumps({
+                "state": "done",
+                "fingerprint": request_fingerprint,
+                "status": code,
+                "body": body.decode(),
+            })
+            # Only recorded if the write commits; a rollback releases the
+            # key instead of replaying a success.
+            invalidate_on_commit(session, redis_cache, ops=[
+                lambda pipe: pipe.set(key, record, ex=config.IDEMPOTENCY_TTL)
+            ])
+            invalidate_on_rollback(session, redis_cache, keys=[key])
+            return Response(content=body, status_code=code, media_type="application/json")
+
+        wrapper.__signature__ = signature.replace(parameters=parameters + injected)
+        return wrapper
+
+    return decorator
+
+
+async def _replay(key: str, request_fingerprint: str, namespace: str) -> Response | None:
+    """
+    Wait for the stored response of ``key``.
+
+    :return: The replayed response, or None once the key was released.
+    """
+    loop = asyncio.get_running_loop()
+    give_up = loop.time() + config.IDEMPOTENCY_WAIT_TIMEOUT
+    while True:
+        stored = await redis_cache.get(key)
+        if stored is None:
+            return None
+        record = json.loads(stored)
+        if record["fingerprint"] != request_fingerprint:
+            idempotency_counter.inc(namespace=namespace, result="mismatch")
+            raise UnprocessableEntity(f"{HEADER} was already used with a different request")
+        if record["state"] != PENDING:
+            idempotency_counter.inc(namespace=namespace, result="replay")
+            return Response(
+                content=record["body"],
+                status_code=record["status"],
+                media_type="application/json",
+                headers={REPLAYED_HEADER: "true"},
+            )
+        if loop.time() >= give_up:
+            idempotency_counter.inc(namespace=namespace, result="conflict")
+            raise DuplicateValueException(f"A request with this {HEADER} is in progress")
+        await asyncio.sleep(POLL_INTERVAL)
@@ -0,0 +1,185 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque
+
+from app.core.metrics import metrics
+
+limit_gauge = metrics.gauge(
+    "http_concurrency_limit", "Current adaptive concurrency limit per worker."
+)
+in_flight_gauge = metrics.gauge(
+    "http_requests_in_flight", "Requests currently holding a concurrency slot."
+)
+queued_gauge = metrics.gauge(
+    "http_requests_queued", "Requests waiting for a concurrency slot."
+)
+shed_counter = metrics.counter(
+    "http_requests_shed_total", "Requests rejected with 503 by the limiter."
+)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limiter keyed on observed request latency.
+
+    The limit grows by one slot while latency stays within
+    ``latency_tolerance`` times the best recently observed latency and the
+    current limit is actually being used. When latency degrades (or a
+    request fails with a server error) the limit is multiplied by
+    ``backoff_ratio``, at most once per smoothed latency period so that a
+    burst of slow responses does not collapse the limit to its floor.
+    """
+
+    def __init__(
+            self,
+            initial_limit: int = 20,
+            min_limit: int = 1,
+            max_limit: int = 100,
+            queue_size: int = 50,
+            queue_timeout: float = 1.0,
+            latency_tolerance: float = 2.0,
+            backoff_ratio: float = 0.9,
+            smoothing: float = 0.2,
+            baseline_window: int = 500,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.smoothing = smoothing
+        self.baseline_window = baseline_window
+
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        self._min_latency: float | None = None
+        self._window_min: float | None = None
+        self._window_samples = 0
+        self._smoothed_latency: float | None = None
+        self._last_decrease = 0.0
+
+        limit_gauge.set(self.limit)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """
+        Take a concurrency slot, waiting in the bounded queue if needed.
+
+        :return: False when the request should be shed.
+        """
+        if self._in_flight < self.limit and not self._waiters:
+            self._take_slot()
+            return True
+
+        if len(self._waiters) >= self.queue_size:
+            shed_counter.inc(reason="queue_full")
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        queued_gauge.set(len(self._waiters))
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as the timeout fired; keep it.
+                return True
+            shed_counter.inc(reason="queue_timeout")
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before cancellation.
+                self.release(latency=None)
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            queued_gauge.set(len(self._waiters))
+        return True
+
+    def release(self, latency: float | None, dropped: bool = False) -> None:
+        """
+        Return a slot and feed the request outcome into the limit.
+
+        :param latency: Request latency in seconds, None to skip the sample.
+        :param dropped: True when the request failed on the server side.
+        """
+        in_flight = self._in_flight
+        self._in_flight -= 1
+        in_flight_gauge.set(self._in_flight)
+        if latency is not None or dropped:
+            self._update_limit(latency, dropped, in_flight)
+        self._wake_waiters()
+
+    def _take_slot(self) -> None:
+        self._in_flight += 1
+        in_flight_gauge.set(self._in_flight)
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._take_slot()
+            waiter.set_result(None)
+        queued_gauge.set(len(self._waiters))
+
+    def _update_limit(
+            self,
+            latency: float | None,
+            dropped: bool,
+            in_flight: int
+    ) -> None:
+        if latency is not None:
+            self._record_latency(latency)
+
+        now = time.monotonic()
+        overloaded = dropped or (
+            latency is not None
+            and self._min_latency is not None
+            and latency > self._min_latency * self.latency_tolerance
+        )
+        if overloaded:
+            if now - self._last_decrease >= (self._smoothed_latency or 0.0):
+                self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+                self._last_decrease = now
+        elif in_flight * 2 >= self.limit:
+            self._limit = min(self.max_limit, self._limit + 1)
+
+        limit_gauge.set(self.limit)
+
+    def _record_latency(self, latency: float) -> None:
+        if self._smoothed_latency is None:
+            self._smoothed_latency = latency
+        else:
+            self._smoothed_latency += self.smoothing * (
+                latency - self._smoothed_latency
+            )
+
+        if self._min_latency is None or latency < self._min_latency:
+            self._min_latency = latency
+        if self._window_min is None or latency < self._window_min:
+            self._window_min = latency
+
+        # Re-baseline periodically so the limiter follows genuine shifts in
+        # the latency profile instead of anchoring on a single fast request.
+        self._window_samples += 1
+        if self._window_samples >= self.baseline_window:
+            self._min_latency = self._window_min
+            self._window_min = None
+            self._window_samples = 0
@@ -0,0 +1,235 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Callable, Iterable, List, Set, Tuple
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.controllers.blog import COUNT_KEY as BLOG_COUNT_KEY
+from app.controllers.blog import LIST_TAG as BLOG_LIST_TAG, author_tag
+from app.controllers.user import COUNT_KEY as USER_COUNT_KEY
+from app.controllers.user import LIST_TAG as USER_LIST_TAG
+from app.core.bloom import BloomFilter, user_logins
+from app.core.cache import PipelineOp, RedisCache
+from app.core.feed import BlogFeed
+from app.core.metrics import metrics
+from app.models import BlogPost, User
+from app.repositories.blog import BlogRepository
+from app.repositories.query_cache import changed_row, register
+from app.repositories.user import UserRepository
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+
+LocalInvalidator = Callable[[List[str], List[str]], None]
+
+notifications_counter = metrics.counter(
+    "cache_invalidation_notifications_total",
+    "Row change notifications received from Postgres.",
+)
+
+
+def asyncpg_dsn(database_url: str) -> str:
+    """Turn a SQLAlchemy ``postgresql+asyncpg://`` URL into a libpq DSN."""
+    return make_url(database_url).set(drivername="postgresql").render_as_string(
+        hide_password=False
+    )
+
+
+# Models of the notifying tables, for the repository read cache, whose
+# lookups are known once their repositories are registered.
+TABLE_MODELS = {"users": User, "blog_posts": BlogPost}
+register(UserRepository())
+register(BlogRepository())
+
+
+def entity_keys(key: Callable[[dict], str], old: dict | None,
+                new: dict | None) -> Set[str]:
+    """
+    Entity keys of a row before and after its change. Both are purged, also
+    when the writer wrote the row through to the cache: concurrent writers
+    can store their values out of commit order, so the entry is reloaded
+    from Postgres instead.
+    """
+    return {key(row) for row in (old, new) if row}
+
+
+def invalidations(notification: dict) -> Tuple[Set[str], Set[str]]:
+    """
+    Map one row change notification to the cache keys and tags it stales,
+    repository reads (see ``changed_row``) included.
+
+    :return: ``(keys, tags)``.
+    """
+    table, op = notification["table"], notification["op"]
+    old, new = notification.get("old"), notification.get("new")
+    model = TABLE_MODELS.get(table)
+    keys, tags = changed_row(model, old, new) if model is not None else (set(), set())
+
+    if table == "users":
+        tags.add(USER_LIST_TAG)
+        keys |= entity_keys(lambda row: f"user:{row['email']}", old, new)
+        if op != "UPDATE":
+            keys.add(USER_COUNT_KEY)
+        if op == "DELETE":
+            # Their posts go with them (ON DELETE CASCADE).
+            tags.update([BLOG_LIST_TAG, author_tag(old["id"])])
+            keys.add(BLOG_COUNT_KEY)
+    elif table == "blog_posts":
+        tags.add(BLOG_LIST_TAG)
+        keys |= entity_keys(lambda row: f"blog:{row['id']}", old, new)
+        if op != "UPDATE":
+            keys.add(BLOG_COUNT_KEY)
+    return keys, tags
+
+
+class InvalidationListener:
+    """
+    Listens for the row change notifications published by the
+    ``notify_cache_invalidation`` triggers on a dedicated asyncpg connection
+    and invalidates the affected cache entries, so writes from migrations,
+    admin SQL or other services are covered as well.
+
+    Notifications arriving within ``batch_window`` seconds are merged into
+    one Redis pipeline. Notifications sent while disconnected are lost, so
+    every (re)connect also drops the list caches and counters.
+
+    With a ``user_filter``, the emails and usernames of inserted and
+    updated users are added to it, so users created outside the API can
+    log in (ones missed while disconnected once the filter is rebuilt).
+
+    With a ``feed``, inserted posts are added to it and deleted ones
+    removed, and the items of changed posts are dropped to be reloaded on
+    the next read.
+    """
+
+    def __init__(
+            self,
+            dsn: str,
+            cache: RedisCache,
+            batch_window: float = 0.05,
+            reconnect_delay: float = 1.0,
+            feed: BlogFeed | None = None,
+            user_filter: BloomFilter | None = None,
+    ):
+        self.dsn = dsn
+        self.cache = cache
+        self.feed = feed
+        self.user_filter = user_filter
+        self.batch_window = batch_window
+        self.reconnect_delay = reconnect_delay
+        self.local_invalidators: List[LocalInvalidator] = []
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    def add_local_invalidator(self, invalidator: LocalInvalidator) -> None:
+        """Also call ``invalidator(keys, tags)`` for in-process caches."""
+        self.local_invalidators.append(invalidator)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("Cache invalidation listener cannot connect: %r", e)
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            lost = asyncio.Event()
+            connection.add_termination_listener(lambda _: lost.set())
+            try:
+                await connection.add_listener(CHANNEL, self._on_notification)
+                await self._invalidate(
+                    {BLOG_COUNT_KEY, USER_COUNT_KEY}, {BLOG_LIST_TAG, USER_LIST_TAG}
+                )
+                await self._consume(lost)
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logger.warning("Cache invalidation listener failed: %r", e)
+            finally:
+                if not connection.is_closed():
+                    await connection.close(timeout=1)
+            logger.warning("Cache invalidation listener lost its connection")
+            await asyncio.sleep(self.reconnect_delay)
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        self._queue.put_nowait(payload)
+
+    async def _consume(self, lost: asyncio.Event) -> None:
+        lost_wait = asyncio.create_task(lost.wait())
+        try:
+            while True:
+                get = asyncio.create_task(self._queue.get())
+                done, _ = await asyncio.wait(
+                    {get, lost_wait}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if get not in done:
+                    get.cancel()
+                    return
+                # Give concurrent writes a moment to coalesce into one batch.
+                await asyncio.sleep(self.batch_window)
+                payloads = [get.result()]
+                while not self._queue.empty():
+                    payloads.append(self._queue.get_nowait())
+                await self._process(payloads)
+        finally:
+            lost_wait.cancel()
+
+    async def _process(self, payloads: Iterable[str]) -> None:
+        keys: Set[str] = set()
+        tags: Set[str] = set()
+        ops: List[PipelineOp] = []
+        logins: List[str] = []
+        for payload in payloads:
+            notifications_counter.inc()
+            try:
+                notification = json.loads(payload)
+                batch_keys, batch_tags = invalidations(notification)
+                if self.feed is not None and notification["table"] == "blog_posts":
+                    ops.append(self._feed_op(notification))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning("Ignoring malformed invalidation %r: %r", payload, e)
+                continue
+            keys |= batch_keys
+            tags |= batch_tags
+            if notification["table"] == "users" and notification.get("new"):
+                new = notification["new"]
+                logins += user_logins(new.get("email"), new.get("username"))
+        if self.user_filter is not None:
+            ops += [self.user_filter.add(login) for login in sorted(set(logins))]
+        await self._invalidate(keys, tags, ops)
+
+    def _feed_op(self, notification: dict) -> PipelineOp:
+        if notification["op"] == "DELETE":
+            return self.feed.remove(notification["old"]["id"])
+        new = notification["new"]
+        # Missing from the payloads of triggers older than 8a3f6d2e4b17.
+        created_at = new.get("created_at")
+        created_at = datetime.fromisoformat(created_at) if created_at else None
+        if notification["op"] == "INSERT" and created_at is not None:
+            return self.feed.insert(new["id"], created_at)
+        return self.feed.refresh(new["id"], created_at)
+
+    async def _invalidate(self, keys: Set[str], tags: Set[str],
+                          ops: Iterable[PipelineOp] = ()) -> None:
+        if not keys and not tags and not ops:
+            return
+        await self.cache.invalidate(keys=sorted(keys), tags=sorted(tags), ops=list(ops))
+        for invalidator in self.local_invalidators:
+            try:
+                invalidator(sorted(keys), sorted(tags))
+            except Exception as e:
+                logger.warning("Local cache invalidation failed: %r", e)
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from types import FrameType
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+loop_lag_histogram = metrics.histogram(
+    "event_loop_lag_seconds",
+    "Delay of the event loop's periodic heartbeat beyond its schedule.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+loop_blocked_counter = metrics.counter(
+    "event_loop_blocked_total",
+    "Stalls of the event loop longer than the monitor's threshold.",
+)
+
+
+def route_of(frame: FrameType | None) -> str | None:
+    """
+    The request a stack belongs to, read from the ASGI ``scope`` of the
+    innermost frame that has one; the route template once routing has
+    matched, the raw path before that.
+    """
+    path = None
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") == "http":
+            route = scope.get("route")
+            if route is not None:
+                return f"{scope.get('method')} {route.path}"
+            path = path or f"{scope.get('method')} {scope.get('path')}"
+        frame = frame.f_back
+    return path
+
+
+class LoopMonitor:
+    """
+    Measures event-loop lag with a heartbeat task that sleeps ``interval``
+    and records how late it wakes up.
+
+    A watchdog thread checks the heartbeat; when the loop has been stuck
+    for more than ``threshold`` seconds it logs the loop thread's current
+    stack and route, once per stall, so synchronous work on the loop
+    (hashing, large serializations, blocking I/O) shows up with the code
+    that is running it.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1,
+                 stack_limit: int = 30):
+        self.interval = interval
+        self.threshold = threshold
+        self.stack_limit = stack_limit
+        self._beat = time.monotonic()
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Start monitoring the running loop."""
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-monitor", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            loop_lag_histogram.observe(max(loop.time() - start - self.interval, 0))
+            self._beat = time.monotonic()
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stopped.wait(self.threshold / 2):
+            beat = self._beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled > self.threshold and beat != reported:
+                reported = beat
+                self._report(stalled)
+
+    def _report(self, stalled: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        loop_blocked_counter.inc()
+        logger.warning(
+            "Event loop blocked for %.0f ms so far, route %s:\n%s",
+            stalled * 1000,
+            route_of(frame) or "-",
+            "".join(traceback.format_stack(frame, limit=self.stack_limit)),
+        )
@@ -1,14 +1,33 @@
+import asyncio
+import secrets
 import time
-from typing import Callable
+import uuid
+from typing import Callable, Mapping, Sequence
 
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.routing import Match, Router
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.core.exceptions import APIException
+from app.core import deadline
+from app.core.exceptions import (
+    APIException,
+    GatewayTimeoutException,
+    ServiceUnavailableException,
+)
+from app.core.limiter import AdaptiveConcurrencyLimiter
+from app.core.metrics import metrics
+from app.core.profiling import RequestProfiler
+from app.core.tracing import STATUS_ERROR, Tracer, current_span, start_span
 from app.utils.date_utils import Datetime
 from app.utils.logger import api_logger
 
+cancelled_counter = metrics.counter(
+    "http_requests_cancelled_total",
+    "Requests whose work was cancelled before completion.",
+)
+
 
 class AccessControlMiddleware(BaseHTTPMiddleware):
 
@@ -27,12 +46,13 @@ class AccessControlMiddleware(BaseHTTPMiddleware):
 
         request.state.ip = self._get_client_ip(request)
 
-        try:
-            response = await call_next(request)
-            await api_logger(request=request, response=response)
-        except Exception as e:
-            print(f"Exception {e}")
-            response = await self._handle_exception(request, e)
+        with start_span("AccessControlMiddleware"):
+            try:
+                response = await call_next(request)
+                await api_logger(request=request, response=response)
+            except Exception as e:
+                print(f"Exception {e}")
+                response = await self._handle_exception(request, e)
 
         return response
 
@@ -51,15 +71,305 @@ class AccessControlMiddleware(BaseHTTPMiddleware):
         if not isinstance(error, APIException):
             error = APIException(ex=error, detail=str(error))
 
-        error_dict = {
-            "status": error.status_code,
-            "msg": error.msg,
-            "detail": error.detail,
-            "code": error.status_code,
-        }
-        response = JSONResponse(
-            status_code=error.status_code,
-            content=error_dict
-        )
+        response = error_response(error)
         await api_logger(request=request, error=error)
         return response
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Caps in-flight requests per worker with an adaptive limit and sheds the
+    excess with fast 503 responses instead of letting it queue on the
+    database pool. Requests under ``exempt_paths`` bypass the limiter.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            limiter: AdaptiveConcurrencyLimiter,
+            exempt_paths: Sequence[str] = (),
+            retry_after: int = 1,
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.exempt_paths = tuple(exempt_paths)
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.limiter.acquire():
+            response = error_response(
+                ServiceUnavailableException("Server is overloaded, retry later")
+            )
+            response.headers["Retry-After"] = str(self.retry_after)
+            await response(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.limiter.release(
+                latency=time.perf_counter() - start,
+                dropped=status_code >= 500,
+            )
+
+
+class DeadlineMiddleware:
+    """
+    Assigns every request a deadline, taken from the ``header`` value
+    (capped at ``max_timeout``) or the per-route default, and exposes it as
+    ``request.state.deadline`` and through ``app.core.deadline``.
+
+    Work still running when the deadline passes or the client disconnects
+    is cancelled so it stops holding pooled connections.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            header: str,
+            default_timeout: float,
+            max_timeout: float,
+            route_timeouts: Mapping[str, float] | None = None,
+    ):
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+        self.default_timeout = default_timeout
+        self.max_timeout = max_timeout
+        self.route_timeouts = dict(route_timeouts or {})
+
+    def _timeout_for(self, scope: Scope) -> float:
+        for name, value in scope["headers"]:
+            if name == self.header:
+                requested = deadline.parse_timeout(value.decode("latin-1"))
+                if requested is not None:
+                    return min(requested, self.max_timeout)
+        return deadline.route_timeout(
+            scope["path"], self.route_timeouts, self.default_timeout
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_deadline = time.monotonic() + self._timeout_for(scope)
+        scope.setdefault("state", {})["deadline"] = request_deadline
+        token = deadline.request_deadline.set(request_deadline)
+
+        messages: asyncio.Queue = asyncio.Queue()
+        response_started = False
+        disconnected = False
+
+        async def receive_wrapper() -> Message:
+            return await messages.get()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        app_task = asyncio.create_task(self.app(scope, receive_wrapper, send_wrapper))
+
+        async def listen_for_disconnect() -> None:
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    if not app_task.done():
+                        disconnected = True
+                        app_task.cancel()
+                    return
+
+        listener = asyncio.create_task(listen_for_disconnect())
+        try:
+            done, _ = await asyncio.wait(
+                {app_task}, timeout=max(deadline.remaining(request_deadline), 0)
+            )
+            if app_task in done:
+                app_task.result()
+                return
+
+            app_task.cancel()
+            try:
+                await app_task
+            except asyncio.CancelledError:
+                pass
+            cancelled_counter.inc(reason="deadline")
+            if not response_started:
+                await error_response(
+                    GatewayTimeoutException("Request deadline exceeded")
+                )(scope, receive_wrapper, send)
+        except asyncio.CancelledError:
+            if not disconnected:
+                raise
+            cancelled_counter.inc(reason="disconnect")
+        finally:
+            listener.cancel()
+            if not app_task.done():
+                app_task.cancel()
+            deadline.request_deadline.reset(token)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a request with cProfile when it carries ``header`` set to
+    ``token``, or when it is sampled (1 in ``profiler.sample_rate`` requests
+    per route). The profile is stored through ``profiler`` and its id
+    returned in the ``X-Profile-Id`` response header; see
+    ``/admin/profiles``.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            profiler: RequestProfiler,
+            router: Router,
+            header: str = "X-Profile",
+            token: str | None = None,
+    ):
+        self.app = app
+        self.profiler = profiler
+        self.router = router
+        self.header = header.lower().encode("latin-1")
+        self.token = token.encode("latin-1") if token else None
+
+    def _route(self, scope: Scope) -> str:
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return f"{scope['method']} {route.path}"
+        return f"{scope['method']} {scope['path']}"
+
+    def _reason(self, scope: Scope) -> str | None:
+        if self.token is not None:
+            for name, value in scope["headers"]:
+                if name == self.header and secrets.compare_digest(value, self.token):
+                    return "header"
+        if self.profiler.sample_rate > 0 and self.profiler.sampled(self._route(scope)):
+            return "sampled"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        reason = self._reason(scope)
+        profile = self.profiler.start() if reason else None
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", []).append(
+                    (b"x-profile-id", profile_id.encode("latin-1"))
+                )
+            await send(message)
+
+        created_at = time.time()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            data = self.profiler.stop(profile)
+            await self.profiler.store(profile_id, {
+                "id": profile_id,
+                "route": self._route(scope),
+                "path": scope["path"],
+                "status": status_code,
+                "reason": reason,
+                "duration_ms": round(duration * 1000, 3),
+                "created_at": created_at,
+            }, data)
+
+
+class TracingMiddleware:
+    """
+    Opens the root span of sampled requests, so the middleware below it,
+    the auth dependency, controllers, repositories and cache calls record
+    child spans into the same trace. The span is named after the matched
+    route template and its trace id returned in ``X-Trace-Id``.
+    """
+
+    def __init__(self, app: ASGIApp, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        span = self.tracer.start_trace(
+            f"{scope['method']} {scope['path']}", traceparent=traceparent
+        )
+        if span is None:
+            await self.app(scope, receive, send)
+            return
+
+        span.attributes["http.method"] = scope["method"]
+        span.attributes["url.path"] = scope["path"]
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.attributes["http.status_code"] = message["status"]
+                if message["status"] >= 500:
+                    span.status = STATUS_ERROR
+                message.setdefault("headers", []).append(
+                    (b"x-trace-id", span.trace_id.encode("latin-1"))
+                )
+            await send(message)
+
+        token = current_span.set(span)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            current_span.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                span.name = f"{scope['method']} {route.path}"
+                span.attributes["http.route"] = route.path
+            span.finish()
+
+
+def error_response(error: APIException) -> JSONResponse:
+    error_dict = {
+        "status": error.status_code,
+        "msg": error.msg,
+        "detail": error.detail,
+        "code": error.status_code,
+    }
+    return JSONResponse(
+        status_code=error.status_code,
+        content=error_dict
+    )
@@ -0,0 +1,122 @@
+import cProfile
+import io
+import json
+import marshal
+import pstats
+from typing import Any, Dict, List
+
+from app.core.cache import RedisCache, redis_cache
+from app.core.config import config
+
+PROFILE_PREFIX = "profile:"
+PROFILES_KEY = "profiles"
+# Orders a text report can be sorted by.
+SORT_KEYS = frozenset(key.value for key in pstats.SortKey)
+
+
+class _Loaded:
+    """Stored stats in the shape ``pstats.Stats`` loads from."""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+def render(data: bytes, sort: str = "cumulative", limit: int = 50) -> str:
+    """
+    Text report of a stored profile, like ``python -m pstats``.
+
+    :raises ValueError: If ``sort`` is not one of ``SORT_KEYS``.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {sort}")
+    out = io.StringIO()
+    stats = pstats.Stats(_Loaded(marshal.loads(data)), stream=out)
+    stats.sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+class RequestProfiler:
+    """
+    Collects cProfile profiles of single requests and keeps the latest
+    ``max_profiles`` in Redis for ``ttl`` seconds.
+
+    cProfile hooks the whole thread, so a profile also contains whatever
+    other requests the worker ran concurrently; only one request per worker
+    is profiled at a time and the others run unprofiled meanwhile.
+    """
+
+    def __init__(self, cache: RedisCache, sample_rate: int = 0,
+                 ttl: int = 3600, max_profiles: int = 100):
+        self.cache = cache
+        self.sample_rate = sample_rate
+        self.ttl = ttl
+        self.max_profiles = max_profiles
+        self._counts: Dict[str, int] = {}
+        self._active: cProfile.Profile | None = None
+
+    def sampled(self, route: str) -> bool:
+        """True for every ``sample_rate``-th request of ``route``."""
+        if self.sample_rate <= 0:
+            return False
+        count = self._counts.get(route, 0) + 1
+        self._counts[route] = count % self.sample_rate
+        return count == self.sample_rate
+
+    def start(self) -> cProfile.Profile | None:
+        """Start profiling, or return None while another request is profiled."""
+        if self._active is not None:
+            return None
+        self._active = cProfile.Profile()
+        self._active.enable()
+        return self._active
+
+    def stop(self, profile: cProfile.Profile) -> bytes:
+        """Stop ``profile`` and return its stats in the ``.prof`` format."""
+        profile.disable()
+        self._active = None
+        profile.create_stats()
+        return marshal.dumps(profile.stats)
+
+    async def store(self, profile_id: str, meta: Dict[str, Any], data: bytes) -> None:
+        key = PROFILE_PREFIX + profile_id
+
+        def op(pipe):
+            pipe.hset(key, mapping={"meta": json.dumps(meta), "pstats": data})
+            pipe.expire(key, self.ttl)
+            pipe.zadd(PROFILES_KEY, {profile_id: meta["created_at"]})
+            pipe.zremrangebyrank(PROFILES_KEY, 0, -(self.max_profiles + 1))
+            pipe.expire(PROFILES_KEY, self.ttl)
+
+        await self.cache.pipeline(op, binary=True)
+
+    async def latest(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Metadata of the latest profiles, newest first."""
+        replies = await self.cache.pipeline(
+            lambda pipe: pipe.zrevrange(PROFILES_KEY, 0, limit - 1),
+        )
+        ids = replies[0] if replies else []
+        if not ids:
+            return []
+        metas = await self.cache.pipeline(*(
+            (lambda pipe, id_=id_: pipe.hget(PROFILE_PREFIX + id_, "meta"))
+            for id_ in ids
+        ), fallback=[])
+        return [json.loads(meta) for meta in metas if meta]
+
+    async def get(self, profile_id: str) -> bytes | None:
+        replies = await self.cache.pipeline(
+            lambda pipe: pipe.hget(PROFILE_PREFIX + profile_id, "pstats"),
+            binary=True,
+        )
+        return replies[0] if replies else None
+
+
+request_profiler = RequestProfiler(
+    redis_cache,
+    sample_rate=config.PROFILING_SAMPLE_RATE,
+    ttl=config.PROFILING_TTL,
+    max_profiles=config.PROFILING_MAX_PROFILES,
+)
@@ -0,0 +1,138 @@
+import functools
+import gzip
+import hashlib
+import inspect
+import json
+from typing import Any, Callable, Iterable
+
+import brotli
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from app.core.cache import redis_cache
+from app.core.metrics import metrics
+
+# Bodies below this size are served uncompressed; compression would not
+# pay for the extra bytes and CPU.
+MIN_COMPRESS_SIZE = 512
+
+response_cache_counter = metrics.counter(
+    "response_cache_requests_total", "Route response cache lookups."
+)
+
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """Pick the best stored variant acceptable to the client."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        name, _, quality = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                if float(quality) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    if "br" in accepted or "*" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return "identity"
+
+
+def encode_variants(body: bytes) -> dict[str, bytes]:
+    variants = {"identity": body}
+    if len(body) >= MIN_COMPRESS_SIZE:
+        variants["gzip"] = gzip.compress(body, compresslevel=6)
+        variants["br"] = brotli.compress(body, quality=5)
+    return variants
+
+
+def build_key(namespace: str, request: Request, user_id: Any = None) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(
+        f"{request.url.path}?{query}|{user_id}".encode()
+    ).hexdigest()
+    return f"{namespace}:resp:{digest}"
+
+
+def cache_response(
+        namespace: str,
+        model: Any,
+        expire: int = 600,
+        vary_on_user: bool = False,
+        headers: Iterable[str] = ("X-Total-Count",),
+        tags: Iterable[str] = (),
+) -> Callable:
+    """
+    Cache the final, encoded body of a JSON GET route in Redis.
+
+    The response is serialized once through ``model`` and stored in a Redis
+    hash together with its gzip and brotli variants and
+    the listed ``headers``. A hit is a single HMGET of the variant matching
+    ``Accept-Encoding``, written out without validation or encoding.
+
+    Keys live under ``{namespace}:resp:`` and are recorded under ``tags``,
+    so invalidating the tags of the underlying lists drops them too. With
+    ``vary_on_user`` the key includes the ``current_user`` dependency's id.
+    """
+    adapter = TypeAdapter(model)
+    stored_headers = tuple(headers)
+    tags = list(tags)
+
+    def decorator(endpoint: Callable) -> Callable:
+        signature = inspect.signature(endpoint)
+        parameters = list(signature.parameters.values())
+        inject_request = "request" not in signature.parameters
+        if inject_request:
+            parameters.insert(0, inspect.Parameter(
+                "request", inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=Request
+            ))
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs.pop("request") if inject_request else kwargs["request"]
+            user = kwargs.get("current_user") if vary_on_user else None
+            key = build_key(namespace, request, getattr(user, "id", None))
+            encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+
+            cached = await redis_cache.get_response(key, encoding)
+            if cached is not None:
+                response_cache_counter.inc(namespace=namespace, result="hit")
+                encoding, body, cached_headers = cached
+                return _build_response(body, encoding, json.loads(cached_headers), vary_on_user)
+
+            response_cache_counter.inc(namespace=namespace, result="miss")
+            result = await endpoint(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+
+            body = adapter.dump_json(
+                adapter.validate_python(result, from_attributes=True)
+            )
+            variants = encode_variants(body)
+            endpoint_response = kwargs.get("response")
+            extra = {
+                name: endpoint_response.headers[name]
+                for name in stored_headers
+                if endpoint_response is not None and name in endpoint_response.headers
+            }
+            await redis_cache.set_response(
+                key, variants, json.dumps(extra).encode(), expire=expire, tags=tags
+            )
+            encoding = encoding if encoding in variants else "identity"
+            return _build_response(variants[encoding], encoding, extra, vary_on_user)
+
+        wrapper.__signature__ = signature.replace(parameters=parameters)
+        return wrapper
+
+    return decorator
+
+
+def _build_response(body: bytes, encoding: str, headers: dict, vary_on_user: bool) -> Response:
+    headers = dict(headers)
+    headers["Vary"] = "Accept-Encoding, Authorization" if vary_on_user else "Accept-Encoding"
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,40 +1,207 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, List, Tuple
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.api import router
+from app.core.bloom import user_filter
 from app.core.cache import redis_cache
 from app.core.config import config
-from app.core.middlewares import AccessControlMiddleware
+from app.core.database import engine
+from app.core.feed import blog_feed
+from app.core.limiter import AdaptiveConcurrencyLimiter
+from app.core.listener import InvalidationListener, asyncpg_dsn
+from app.core.loop_monitor import LoopMonitor
+from app.core.middlewares import (
+    AccessControlMiddleware,
+    ConcurrencyLimitMiddleware,
+    DeadlineMiddleware,
+    ProfilingMiddleware,
+    TracingMiddleware,
+)
+from app.core.profiling import request_profiler
+from app.core.tracing import span_exporter, tracer
+from app.core.warmup import (
+    persist_hot_keys_periodically,
+    refresh_user_filter_periodically,
+    warm_up_cache,
+    warm_up_database,
+    warm_up_feed,
+    warm_up_process,
+    warm_up_user_filter,
+)
+
+logger = logging.getLogger(__name__)
 
 
 def init_routers(app_: FastAPI) -> None:
     app_.include_router(router)
 
 
+Step = Tuple[str, Callable[[], Awaitable[object]]]
+
+
+async def run_steps(steps: List[Step], timeout: float) -> None:
+    """
+    Run ``steps`` in order, each within ``timeout`` seconds. Each step is
+    best effort: a failure is logged and only costs the latency the step
+    would have saved.
+    """
+    for name, step in steps:
+        try:
+            await asyncio.wait_for(step(), timeout=timeout)
+            logger.info("Warm-up of %s done", name)
+        except Exception as e:
+            logger.warning("Warm-up of %s skipped: %r", name, e)
+
+
+async def warm_up(app_: FastAPI) -> None:
+    """Run the warm-up steps, then report ready on ``/health/ready``."""
+    steps: List[Step] = [
+        ("database pool", lambda: warm_up_database(config.DB_POOL_PREWARM)),
+        ("process", warm_up_process),
+    ]
+    if redis_cache.hot_keys is not None:
+        steps.append(("cache", lambda: warm_up_cache(
+            redis_cache,
+            limit=config.CACHE_WARMUP_LIMIT,
+            concurrency=config.CACHE_WARMUP_CONCURRENCY,
+        )))
+    await run_steps(steps, timeout=config.CACHE_WARMUP_TIMEOUT)
+    app_.state.ready = True
+
+
+async def rebuild() -> None:
+    """
+    Build the feed and the user filter. They run outside the readiness
+    gate, with their own time budget: until they are ready, their reads
+    go to Postgres.
+    """
+    await run_steps([
+        ("feed", lambda: warm_up_feed(
+            blog_feed, batch_size=config.BLOG_FEED_REBUILD_BATCH_SIZE
+        )),
+        ("user filter", lambda: warm_up_user_filter(
+            user_filter, batch_size=config.USER_FILTER_REBUILD_BATCH_SIZE
+        )),
+    ], timeout=config.CACHE_REBUILD_TIMEOUT)
+
+
+@asynccontextmanager
+async def lifespan(app_: FastAPI):
+    app_.state.ready = False
+    loop_monitor = None
+    if config.LOOP_MONITOR_ENABLED:
+        loop_monitor = LoopMonitor(
+            interval=config.LOOP_MONITOR_INTERVAL,
+            threshold=config.LOOP_MONITOR_THRESHOLD,
+        )
+        loop_monitor.start()
+    if config.TRACING_ENABLED:
+        span_exporter.start()
+    await redis_cache.connect()
+    listener = None
+    if config.CACHE_LISTENER_ENABLED:
+        listener = InvalidationListener(
+            asyncpg_dsn(config.CACHE_LISTENER_DATABASE_URL or config.DATABASE_URL),
+            cache=redis_cache,
+            feed=blog_feed,
+            user_filter=user_filter,
+        )
+        listener.start()
+        app_.state.invalidation_listener = listener
+    warm_up_task = asyncio.create_task(warm_up(app_))
+    rebuild_task = asyncio.create_task(rebuild())
+    filter_refresher = asyncio.create_task(
+        refresh_user_filter_periodically(
+            user_filter,
+            interval=config.USER_FILTER_CHECK_INTERVAL,
+            batch_size=config.USER_FILTER_REBUILD_BATCH_SIZE,
+        )
+    )
+    persister = None
+    if redis_cache.hot_keys is not None:
+        persister = asyncio.create_task(
+            persist_hot_keys_periodically(
+                redis_cache, interval=config.HOT_KEYS_PERSIST_INTERVAL
+            )
+        )
+
+    yield
+
+    # Fail readiness first so the load balancer stops routing here while
+    # in-flight requests drain.
+    app_.state.ready = False
+    warm_up_task.cancel()
+    rebuild_task.cancel()
+    filter_refresher.cancel()
+    # Cancelled rebuilds release their locks, which needs Redis.
+    await asyncio.gather(rebuild_task, filter_refresher, return_exceptions=True)
+    if listener is not None:
+        await listener.stop()
+    if persister is not None:
+        persister.cancel()
+        await redis_cache.persist_hot_keys()
+    await redis_cache.close()
+    await engine.dispose()
+    if config.TRACING_ENABLED:
+        await span_exporter.stop()
+    if loop_monitor is not None:
+        await loop_monitor.stop()
+
+
 def create_app() -> FastAPI:
     app_ = FastAPI(
         title="Nexaquanta Assessment",
         docs_url=None if config.ENVIRONMENT == "production" else "/docs",
         redoc_url=None if config.ENVIRONMENT == "production" else "/redoc",
+        lifespan=lifespan,
     )
     app_.add_middleware(AccessControlMiddleware)
+    if config.PROFILING_ENABLED:
+        # Wraps the access control middleware, routing and the endpoint.
+        app_.add_middleware(
+            ProfilingMiddleware,
+            profiler=request_profiler,
+            router=app_.router,
+            token=config.PROFILING_TOKEN,
+        )
+    app_.add_middleware(
+        DeadlineMiddleware,
+        header=config.REQUEST_TIMEOUT_HEADER,
+        default_timeout=config.REQUEST_TIMEOUT_DEFAULT,
+        max_timeout=config.REQUEST_TIMEOUT_MAX,
+        route_timeouts=config.REQUEST_TIMEOUT_ROUTES,
+    )
+    if config.CONCURRENCY_LIMIT_ENABLED:
+        app_.add_middleware(
+            ConcurrencyLimitMiddleware,
+            limiter=AdaptiveConcurrencyLimiter(
+                initial_limit=config.CONCURRENCY_LIMIT_INITIAL,
+                min_limit=config.CONCURRENCY_LIMIT_MIN,
+                max_limit=config.CONCURRENCY_LIMIT_MAX,
+                queue_size=config.CONCURRENCY_QUEUE_SIZE,
+                queue_timeout=config.CONCURRENCY_QUEUE_TIMEOUT,
+                latency_tolerance=config.CONCURRENCY_LATENCY_TOLERANCE,
+            ),
+            exempt_paths=config.LOAD_SHED_EXEMPT_PATHS,
+        )
     app_.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Total-Count", "X-Next-Cursor", "X-Trace-Id"],
     )
+    if config.TRACING_ENABLED:
+        # Outermost, so the root span covers load shedding and CORS too.
+        app_.add_middleware(TracingMiddleware, tracer=tracer)
     init_routers(app_=app_)
 
-    @app_.on_event("startup")
-    async def startup():
-        await redis_cache.connect()  # Connect to Redis on startup
-
-    @app_.on_event("shutdown")
-    async def shutdown():
-        await redis_cache.close()
-
     return app_
 
 
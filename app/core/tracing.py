@@ -0,0 +1,319 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import random
+import re
+import time
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+from app.core.config import config
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds and status codes.
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+spans_dropped_counter = metrics.counter(
+    "tracing_spans_dropped_total",
+    "Finished spans dropped because the export queue was full or export failed.",
+)
+
+# Innermost open span of the current request; None outside sampled traces,
+# which is what keeps instrumented calls cheap when a request is not traced.
+current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Span:
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind",
+        "start", "end", "attributes", "status", "tracer",
+    )
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str,
+                 parent_id: str | None = None, kind: int = KIND_INTERNAL):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start = time.time_ns()
+        self.end: int | None = None
+        self.attributes: Dict[str, Any] = {}
+        self.status = STATUS_OK
+
+    def child(self, name: str) -> "Span":
+        return Span(self.tracer, name, self.trace_id, parent_id=self.span_id)
+
+    def record_exception(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.attributes["exception.type"] = type(error).__name__
+
+    def finish(self) -> None:
+        self.end = time.time_ns()
+        self.tracer.exporter.add(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class SpanExporter:
+    """
+    Buffers finished spans and writes them in batches as OTLP/JSON
+    ``ExportTraceServiceRequest`` documents: one line per batch appended to
+    ``path``, and/or POSTed to an OTLP/HTTP collector at ``url``
+    (``.../v1/traces``).
+
+    Export runs off the event loop every ``interval`` seconds or as soon
+    as ``batch_size`` spans are buffered; past ``max_queue`` buffered
+    spans new ones are dropped rather than held in memory.
+    """
+
+    def __init__(self, service_name: str, path: str | None = None,
+                 url: str | None = None, batch_size: int = 512,
+                 interval: float = 5.0, max_queue: int = 8192):
+        self.service_name = service_name
+        self.path = path
+        self.url = url
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: deque[Span] = deque()
+        self.max_queue = max_queue
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def add(self, span: Span) -> None:
+        if len(self._queue) >= self.max_queue:
+            spans_dropped_counter.inc()
+            return
+        self._queue.append(span)
+        if self._wakeup is not None and len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the export task and flush what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wakeup = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        while self._queue:
+            batch = [
+                self._queue.popleft()
+                for _ in range(min(self.batch_size, len(self._queue)))
+            ]
+            try:
+                await asyncio.to_thread(self.export, batch)
+            except Exception as e:
+                spans_dropped_counter.inc(len(batch))
+                logger.warning("Exporting %d spans failed: %r", len(batch), e)
+
+    def encode(self, batch: List[Span]) -> bytes:
+        return json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": self.service_name}},
+            ]},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [span.to_otlp() for span in batch],
+            }],
+        }]}, separators=(",", ":")).encode()
+
+    def export(self, batch: List[Span]) -> None:
+        body = self.encode(batch)
+        if self.path:
+            with open(self.path, "ab") as f:
+                f.write(body + b"\n")
+        if self.url:
+            request = urllib.request.Request(
+                self.url, data=body, headers={"Content-Type": "application/json"}
+            )
+            with urllib.request.urlopen(request, timeout=10):
+                pass
+
+
+TRACEPARENT = re.compile(
+    r"([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})(-.*)?"
+)
+
+
+def parse_traceparent(header: str) -> tuple[str, str, bool] | None:
+    """
+    ``(trace_id, parent_id, sampled)`` of a W3C ``traceparent`` header, or
+    None if it is malformed and must be ignored. Later versions may append
+    fields, which are skipped; version 00 has exactly four.
+    """
+    match = TRACEPARENT.fullmatch(header.strip())
+    if match is None:
+        return None
+    version, trace_id, parent_id, flags, rest = match.groups()
+    if version == "ff" or (version == "00" and rest is not None):
+        return None
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+class Tracer:
+    """
+    Starts a trace for 1 in ``1 / sample_ratio`` requests, or when the
+    request's W3C ``traceparent`` header says the caller sampled it.
+    Spans of an unsampled request are never created.
+    """
+
+    def __init__(self, exporter: SpanExporter, sample_ratio: float = 0.01):
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+
+    def start_trace(self, name: str, traceparent: str | None = None) -> Span | None:
+        """
+        Root span of a request, or None when it is not sampled. A malformed
+        ``traceparent`` is ignored, as if the request had none.
+        """
+        parent = parse_traceparent(traceparent) if traceparent else None
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+            if not sampled:
+                return None
+        else:
+            if random.random() >= self.sample_ratio:
+                return None
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+        return Span(self, name, trace_id, parent_id=parent_id, kind=KIND_SERVER)
+
+
+def current_trace_id() -> str | None:
+    span = current_span.get()
+    return span.trace_id if span is not None else None
+
+
+@contextmanager
+def start_span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """
+    Child span of the current one around a block; yields None, without
+    creating anything, outside a sampled trace.
+    """
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    span = parent.child(name)
+    span.attributes.update(attributes)
+    token = current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        current_span.reset(token)
+        span.finish()
+
+
+def _wrap(func: Callable, name: Callable[[tuple], str]) -> Callable:
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        parent = current_span.get()
+        if parent is None:
+            return await func(*args, **kwargs)
+        span = parent.child(name(args))
+        token = current_span.set(span)
+        try:
+            return await func(*args, **kwargs)
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            current_span.reset(token)
+            span.finish()
+
+    return wrapper
+
+
+def traced(name: str | None = None) -> Callable:
+    """Run every call of the decorated coroutine function in a span."""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+        return _wrap(func, lambda args: span_name)
+
+    return decorator
+
+
+def instrument(cls: type) -> type:
+    """
+    Trace the public coroutine methods a class defines, as
+    ``<runtime class>.<method>`` spans so inherited methods are attributed
+    to the subclass they were called on.
+    """
+    for attr, value in list(vars(cls).items()):
+        if not attr.startswith("_") and inspect.iscoroutinefunction(value):
+            setattr(cls, attr, _wrap(
+                value, lambda args, attr=attr: f"{type(args[0]).__name__}.{attr}"
+            ))
+    return cls
+
+
+span_exporter = SpanExporter(
+    service_name=config.TRACING_SERVICE_NAME,
+    path=config.TRACING_EXPORT_PATH,
+    url=config.TRACING_EXPORT_URL,
+    batch_size=config.TRACING_BATCH_SIZE,
+    interval=config.TRACING_EXPORT_INTERVAL,
+)
+tracer = Tracer(span_exporter, sample_ratio=config.TRACING_SAMPLE_RATIO)
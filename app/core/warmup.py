@@ -0,0 +1,225 @@
+import asyncio
+import json
+import logging
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.controllers.blog import author_tag
+from app.core.bloom import BloomFilter, user_logins
+from app.core.cache import RedisCache
+from app.core.config import config
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import NotFoundException
+from app.core.feed import BlogFeed
+from app.core.jwt import JWTHandler
+from app.core.password import PasswordHandler
+from app.repositories.blog import BlogRepository
+from app.repositories.query_cache import bypass_cache
+from app.repositories.user import UserRepository
+from app.schemas.blog import BlogResponse, BlogSummary
+from app.schemas.user import UserResponse
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+
+
+Loaded = Tuple[Dict[str, str], Dict[str, List[str]]]
+
+
+async def _load_blogs(identifiers: List[str]) -> Loaded:
+    ids = [int(identifier) for identifier in identifiers if identifier.isdigit()]
+    async with AsyncSessionLocal() as db:
+        blogs = await BlogRepository().get_by_ids(db=db, ids=ids)
+    values = {
+        f"blog:{blog.id}": json.dumps(
+            BlogResponse.model_validate(blog.__dict__).model_dump()
+        )
+        for blog in blogs
+    }
+    return values, {f"blog:{blog.id}": [author_tag(blog.author_id)] for blog in blogs}
+
+
+async def _load_users(identifiers: List[str]) -> Loaded:
+    async with AsyncSessionLocal() as db:
+        users = await UserRepository().get_by_emails(db=db, emails=identifiers)
+    values = {
+        f"user:{user.email}": json.dumps(
+            UserResponse.model_validate(user.__dict__).model_dump()
+        )
+        for user in users
+    }
+    return values, {}
+
+
+LOADERS: Dict[str, Callable[[List[str]], Awaitable[Loaded]]] = {
+    "blog": _load_blogs,
+    "user": _load_users,
+}
+
+
+async def warm_up_cache(cache: RedisCache, limit: int, concurrency: int) -> int:
+    """
+    Preload the entities behind the persisted hot keys.
+
+    Keys are grouped per entity and loaded in batches, with at most
+    ``concurrency`` batches (and therefore pooled connections) in flight.
+
+    :return: Number of cache entries written.
+    """
+    hot_keys = await cache.read_hot_keys(limit)
+    batches: Dict[str, List[str]] = {}
+    for key, _ in hot_keys:
+        prefix, _, identifier = key.partition(":")
+        if prefix in LOADERS and identifier:
+            batches.setdefault(prefix, []).append(identifier)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def load(prefix: str, identifiers: List[str]) -> int:
+        async with semaphore:
+            values, tags = await LOADERS[prefix](identifiers)
+            await cache.set_many(values, tags=tags)
+            return len(values)
+
+    tasks = [
+        load(prefix, identifiers[start:start + BATCH_SIZE])
+        for prefix, identifiers in batches.items()
+        for start in range(0, len(identifiers), BATCH_SIZE)
+    ]
+    return sum(await asyncio.gather(*tasks))
+
+
+async def warm_up_feed(feed: BlogFeed, batch_size: int) -> int:
+    """
+    Build the latest-posts feed unless it is ready. Only the worker that
+    wins the rebuild lock builds it; the others keep serving the feed
+    from Postgres until it is ready. The lock is released if the rebuild
+    fails or is cancelled.
+
+    :return: Number of posts in the feed, 0 when nothing was built.
+    """
+    if not await feed.acquire_rebuild_lock():
+        return 0
+    try:
+        async with AsyncSessionLocal() as db:
+            return await feed.rebuild(db=db, batch_size=batch_size)
+    except BaseException:
+        await feed.release_rebuild_lock()
+        raise
+
+
+async def rebuild_user_filter(db: AsyncSession, user_filter: BloomFilter,
+                              batch_size: int) -> int:
+    """
+    Rebuild ``user_filter`` from every user's email and username, read in
+    id-ordered batches of ``batch_size``.
+
+    :return: Number of values in the filter.
+    """
+    repository = UserRepository()
+
+    async def batches():
+        after_id = 0
+        while True:
+            rows = await repository.get_logins(db=db, after_id=after_id, limit=batch_size)
+            if not rows:
+                return
+            yield [
+                value for row in rows
+                for value in user_logins(row.email, row.username)
+            ]
+            after_id = rows[-1].id
+
+    return await user_filter.rebuild(batches())
+
+
+async def warm_up_user_filter(user_filter: BloomFilter, batch_size: int) -> int:
+    """
+    Build the user Bloom filter unless it is ready and younger than its
+    ``max_age``, in the worker that wins its rebuild lock; lookups go to
+    Postgres until it is ready. The lock is released if the rebuild fails
+    or is cancelled.
+
+    :return: Number of values in the filter, 0 when nothing was built.
+    """
+    if not await user_filter.acquire_rebuild_lock():
+        return 0
+    try:
+        async with AsyncSessionLocal() as db:
+            return await rebuild_user_filter(db, user_filter, batch_size=batch_size)
+    except BaseException:
+        await user_filter.release_rebuild_lock()
+        raise
+
+
+async def warm_up_database(connections: int) -> None:
+    """
+    Open ``connections`` pooled connections at once and run the hot lookups
+    on each, so the pool is filled and every connection already holds the
+    compiled and server-side prepared statements.
+    """
+    async with AsyncExitStack() as stack:
+        sessions = [
+            await stack.enter_async_context(AsyncSessionLocal())
+            for _ in range(connections)
+        ]
+        await asyncio.gather(*(_prepare_statements(db) for db in sessions))
+
+
+async def _prepare_statements(db: AsyncSession) -> None:
+    users, blogs = UserRepository(), BlogRepository()
+    # The lookups must reach Postgres, not the repository caches.
+    with bypass_cache(db):
+        await users.get_by_email(db=db, email="")
+        await users.get_by_name(db=db, username="")
+        for repository in (users, blogs):
+            try:
+                await repository.get_by_id(db=db, id_=0)
+            except NotFoundException:
+                pass
+    if config.DB_FAST_PATH:
+        await users.fetch_one(db=db, schema=UserResponse, column="email", value="")
+        await blogs.fetch_one(db=db, schema=BlogResponse, column="id", value=0)
+
+
+async def warm_up_process() -> None:
+    """
+    Initialize the lazily loaded pieces of the request path: the bcrypt
+    backend, JWT signing and the response schemas' validators/serializers.
+    """
+    hashed = await asyncio.to_thread(PasswordHandler.hash, "warm-up-password")
+    await asyncio.to_thread(PasswordHandler.verify, "warm-up-password", hashed)
+
+    JWTHandler.decode(JWTHandler.encode({"sub": "warm-up@example.com"}))
+
+    UserResponse.model_validate(
+        {"id": 0, "email": "warm-up@example.com", "username": "warm-up"}
+    ).model_dump_json()
+    blog = BlogResponse.model_validate(
+        {"id": 0, "title": "", "content": "", "author_id": 0}
+    )
+    blog.model_dump_json()
+    BlogSummary.model_validate({**blog.model_dump(), "excerpt": ""}).model_dump_json()
+
+
+async def persist_hot_keys_periodically(cache: RedisCache, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await cache.persist_hot_keys()
+        except Exception as e:
+            logger.warning("Persisting hot keys failed: %r", e)
+
+
+async def refresh_user_filter_periodically(user_filter: BloomFilter, interval: float,
+                                           batch_size: int) -> None:
+    """Rebuild the user filter once it has been switched off or aged out."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await warm_up_user_filter(user_filter, batch_size=batch_size)
+        except Exception as e:
+            logger.warning("Rebuilding the user filter failed: %r", e)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -8,15 +8,25 @@ from app.core.database import Base
 class BlogPost(Base):
     """
     BlogPost model representing individual blog posts
+
+    The table is range-partitioned by month on ``created_at``, which is why
+    it is part of the table's primary key; the ORM still identifies posts
+    by ``id`` alone.
     """
     __tablename__ = 'blog_posts'
+    __table_args__ = (
+        Index('ix_blog_posts_created_at_id', 'created_at', 'id'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
     author_id = Column(Integer, ForeignKey('users.id', ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __mapper_args__ = {'primary_key': [id]}
+
     # Relationship to user
     author = relationship("User", back_populates="posts")
\ No newline at end of file
@@ -1,35 +1,146 @@
 import logging
-from typing import TypeVar, Generic, Type, List, Any, Dict
+from typing import TypeVar, Generic, Type, List, Any, Dict, Sequence
 
 from pydantic import BaseModel
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func, lambda_stmt, text
+from sqlalchemy.sql import ColumnElement
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import NotFoundException
+from app.core.tracing import instrument
+from app.repositories.query_cache import cached_read, mark_written, register
 
 T = TypeVar('T')
 PydanticT = TypeVar('PydanticT', bound=BaseModel)
 
 logger = logging.getLogger(__name__)
 
+# Pre-built fast-path SQL keyed by (table, schema, column).
+_FAST_PATH_SQL: Dict[tuple, str] = {}
 
+
+@instrument
 class BaseRepo(Generic[T]):
+    # Seconds reads decorated with ``cached_read`` cache found rows and
+    # misses for; None caches neither.
+    cache_ttl: int | None = None
+    negative_cache_ttl: int | None = None
+    # Columns never written to the cache; they are loaded from the database
+    # when accessed on a cached row.
+    cache_exclude: tuple[str, ...] = ()
+
     def __init__(self, model: Type[T]):
         self.model = model
+        if self.cache_ttl or self.negative_cache_ttl:
+            register(self)
     
+    @cached_read(by="id")
     async def get_by_id(self, db: AsyncSession, id_: int) -> T:
-        result = await db.execute(select(self.model).where(self.model.id == id_))
+        # Lambda statements are built and compiled once per model; later
+        # calls only bind ``id_``.
+        model = self.model
+        result = await db.execute(
+            lambda_stmt(lambda: select(model).where(model.id == id_))
+        )
         instance = result.scalar_one_or_none()
         if not instance:
             raise NotFoundException(f"{self.model.__name__} with id {id_} not found")
         return instance
 
     
-    async def get_all(self, db: AsyncSession) -> List[T]:
-        result = await db.execute(select(self.model))
+    async def fetch_one(self, db: AsyncSession, schema: Type[PydanticT],
+                        column: str, value: Any) -> PydanticT | None:
+        """
+        Fast path for hot point lookups: run pre-built SQL on the session's
+        raw asyncpg connection and map the record straight into ``schema``,
+        skipping statement construction, the identity map and validation.
+
+        The session's connection (and so its transaction and statement
+        timeout) is reused. Only the schema's fields are selected; their
+        names must match the model's columns.
+
+        :param column: Column compared with ``value``.
+        :return: Schema instance, or None when no row matches.
+        """
+        table = self.model.__tablename__
+        sql = _FAST_PATH_SQL.get((table, schema, column))
+        if sql is None:
+            sql = _FAST_PATH_SQL[(table, schema, column)] = (
+                f"SELECT {', '.join(schema.model_fields)} FROM {table} "
+                f"WHERE {getattr(self.model, column).name} = $1"
+            )
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        record = await raw.driver_connection.fetchrow(sql, value)
+        if record is None:
+            return None
+        return schema.model_construct(**record)
+
+    
+    async def get_by_ids(self, db: AsyncSession, ids: List[int]) -> List[T]:
+        result = await db.execute(select(self.model).where(self.model.id.in_(ids)))
+        return result.scalars().all()
+
+    
+    async def get_all(self, db: AsyncSession, offset: int | None = None,
+                      limit: int | None = None) -> List[T]:
+        query = self._paginate(select(self.model), offset, limit)
+        result = await db.execute(query)
         return result.scalars().all()
 
     
+    async def get_projection(self, db: AsyncSession,
+                             columns: Sequence[str | ColumnElement],
+                             offset: int | None = None,
+                             limit: int | None = None) -> List[Dict[str, Any]]:
+        """
+        Fetch only the requested columns as plain dicts, skipping ORM
+        instance construction and unused (possibly large) columns.
+
+        :param columns: Model attribute names or labelled SQL expressions.
+        """
+        selected = [
+            getattr(self.model, column) if isinstance(column, str) else column
+            for column in columns
+        ]
+        query = self._paginate(select(*selected), offset, limit)
+        result = await db.execute(query)
+        return [dict(row) for row in result.mappings()]
+
+    
+    def _paginate(self, query, offset: int | None, limit: int | None):
+        if offset is None and limit is None:
+            return query
+        return query.order_by(self.model.id).offset(offset).limit(limit)
+
+    
+    async def count(self, db: AsyncSession, mode: str = "exact") -> int:
+        """
+        Count rows of the model's table.
+
+        :param mode: ``exact`` runs ``COUNT(*)``; ``estimate`` reads the
+            planner statistics from ``pg_class.reltuples``, summed over the
+            partitions of a partitioned table, and only falls back to an
+            exact count while the table has no statistics yet.
+        :return: Row count.
+        """
+        if mode == "estimate":
+            result = await db.execute(
+                text(
+                    "SELECT sum(GREATEST(reltuples, 0))::bigint FROM pg_class "
+                    "WHERE oid = CAST(:table AS regclass) OR oid IN ("
+                    "SELECT inhrelid FROM pg_inherits "
+                    "WHERE inhparent = CAST(:table AS regclass))"
+                ),
+                {"table": self.model.__tablename__},
+            )
+            estimate = result.scalar_one_or_none()
+            if estimate and estimate > 0:
+                return estimate
+        result = await db.execute(select(func.count()).select_from(self.model))
+        return result.scalar_one()
+
+    
     async def create(self, db: AsyncSession, **kwargs) -> T:
         obj = self.model(**kwargs)
         db.add(obj)
@@ -40,6 +151,7 @@ class BaseRepo(Generic[T]):
     
     async def update(self, db: AsyncSession, id_: int,
                      update_data: Dict[str, Any]) -> T:
+        mark_written(db, self.model)
         instance = await self.get_by_id(db, id_)
         for key, value in update_data.items():
             setattr(instance, key, value)
@@ -49,6 +161,7 @@ class BaseRepo(Generic[T]):
 
     
     async def delete(self, db: AsyncSession, **kwargs) -> None:
+        mark_written(db, self.model)
         if 'id' in kwargs:
             obj = await self.get_by_id(db, kwargs['id'])
             await db.delete(obj)
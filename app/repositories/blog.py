@@ -1,11 +1,58 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
+
+from app.core.config import config
+from app.core.tracing import instrument
 from app.models.blog import BlogPost
 from app.repositories.base_repo import BaseRepo
 
 
+@instrument
 class BlogRepository(BaseRepo[BlogPost]):
     """
     Blog repository provides all the database operations for the BlogPost model.
+    Lookups of missing posts are cached (see ``cached_read``).
     """
+    negative_cache_ttl = config.NEGATIVE_CACHE_TTL
 
     def __init__(self):
         super().__init__(BlogPost)
+
+    @staticmethod
+    def excerpt(length: int) -> ColumnElement:
+        """
+        SQL expression for the first ``length`` characters of the content,
+        so list views never transfer the full post body.
+        """
+        return func.substr(BlogPost.content, 1, length).label("excerpt")
+
+    async def get_latest(self, db: AsyncSession, limit: int,
+                         before: datetime | None = None,
+                         before_id: int | None = None) -> List[BlogPost]:
+        """
+        Newest posts first, keyset-paginated on ``(created_at, id)`` so
+        every page is a range scan of ``ix_blog_posts_created_at_id``
+        however deep it is.
+
+        :param before: Only return posts created before this time, or at
+            this time with an id below ``before_id`` when it is given.
+        """
+        query = select(BlogPost).where(BlogPost.created_at.is_not(None))
+        if before is not None:
+            if before_id is None:
+                query = query.where(BlogPost.created_at < before)
+            else:
+                query = query.where(
+                    tuple_(BlogPost.created_at, BlogPost.id) < (before, before_id)
+                )
+        query = query.order_by(BlogPost.created_at.desc(), BlogPost.id.desc()).limit(limit)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    async def get_ids_by_author(self, db: AsyncSession, author_id: int) -> List[int]:
+        result = await db.execute(select(BlogPost.id).where(BlogPost.author_id == author_id))
+        return result.scalars().all()
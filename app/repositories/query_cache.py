@@ -0,0 +1,269 @@
+import functools
+import inspect
+import itertools
+import json
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Iterable, Iterator, Set, Tuple
+
+from sqlalchemy import DateTime, event
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.cache import redis_cache
+from app.core.database import invalidate_on_commit
+from app.core.exceptions import NotFoundException
+from app.core.metrics import metrics
+
+PREFIX = "repo:"
+# (method, column) of the cached reads of each model, by model name; only
+# writes of these models are tracked.
+cached_lookups: dict[str, set[tuple[str, str]]] = {}
+_registered: set[type] = set()
+# Session.info key of the cached models written in the open transaction.
+WRITTEN = "repo_cache_written"
+# Session.info key set within ``bypass_cache`` blocks.
+BYPASS = "repo_cache_bypass"
+
+repo_cache_counter = metrics.counter(
+    "repo_cache_requests_total", "Cached repository reads by result."
+)
+
+
+def cache_key(model: type, method: str, *args: Any) -> str:
+    return f"{PREFIX}{model.__name__}:{method}:{':'.join(map(str, args))}"
+
+
+def model_tag(model: type) -> str:
+    """Tag of every cached read of ``model``."""
+    return f"{PREFIX}{model.__name__}"
+
+
+def row_tag(model: type, pk: Any) -> str:
+    """Tag of the cached reads that returned the row with primary key ``pk``."""
+    return f"{PREFIX}{model.__name__}:{pk}"
+
+
+def register(repository: Any) -> None:
+    """Track writes of a caching repository's model."""
+    repository_class = type(repository)
+    if repository_class in _registered:
+        return
+    lookups = cached_lookups.setdefault(repository.model.__name__, set())
+    for name in dir(repository_class):
+        column = getattr(getattr(repository_class, name, None), "cached_by", None)
+        if column is not None:
+            lookups.add((name, column))
+    _registered.add(repository_class)
+
+
+def mark_written(session, model: type) -> None:
+    """
+    Read ``model`` from the database for the rest of the session's
+    transaction, so reads made to change a row, and reads of rows it has
+    written, never see cached or cache uncommitted values.
+    """
+    session.info.setdefault(WRITTEN, set()).add(model.__name__)
+
+
+@contextmanager
+def bypass_cache(session) -> Iterator[None]:
+    """Read every model of ``session`` from the database within the block."""
+    previous = session.info.get(BYPASS, False)
+    session.info[BYPASS] = True
+    try:
+        yield
+    finally:
+        session.info[BYPASS] = previous
+
+
+def bypasses_cache(session, model: type) -> bool:
+    return session.info.get(BYPASS, False) or model.__name__ in session.info.get(WRITTEN, ())
+
+
+def _pk(obj: Any) -> str:
+    return ",".join(map(str, sa_inspect(type(obj)).primary_key_from_instance(obj)))
+
+
+def encode(obj: Any, exclude: Iterable[str] = ()) -> str | None:
+    """
+    Column values of a loaded instance, but those in ``exclude``, as JSON,
+    or None if some column is not loaded (reading it would trigger a lazy
+    load).
+    """
+    loaded = sa_inspect(obj).dict
+    values = {}
+    for attr in sa_inspect(type(obj)).column_attrs:
+        if attr.key in exclude:
+            continue
+        if attr.key not in loaded:
+            return None
+        value = loaded[attr.key]
+        values[attr.key] = value.isoformat() if isinstance(value, datetime) else value
+    return json.dumps(values)
+
+
+async def _attach(db, model: type, data: str) -> Any:
+    """
+    Cached row as a persistent instance of ``db``, without a query. An
+    instance already in the session is returned as is, so changes made to
+    it in this unit of work are never overwritten by cached values.
+    Columns left out of the cache stay unloaded.
+    """
+    mapper = sa_inspect(model)
+    values = json.loads(data)
+    for attr in mapper.column_attrs:
+        value = values.get(attr.key)
+        if value is not None and isinstance(attr.columns[0].type, DateTime):
+            values[attr.key] = datetime.fromisoformat(value)
+    identity = mapper.identity_key_from_primary_key(
+        [values[mapper.get_property_by_column(column).key] for column in mapper.primary_key]
+    )
+    current = db.identity_map.get(identity)
+    if current is not None:
+        return current
+    obj = mapper.class_manager.new_instance()
+    for key, value in values.items():
+        setattr(obj, key, value)
+    make_transient_to_detached(obj)
+    return await db.merge(obj, load=False)
+
+
+def cached_read(by: str) -> Callable:
+    """
+    Cache a repository read of one instance by its ``by`` column in Redis,
+    under ``repo:{Model}:{method}:{value}``: found rows for ``cache_ttl``
+    seconds of the repository, misses (None, or the NotFoundException the
+    read raised) for ``negative_cache_ttl`` seconds.
+
+    Found rows are tagged with their model and primary key; flushing a
+    change to the row purges them once the transaction commits, and
+    inserting or updating a row purges the misses of its values (see
+    ``invalidate_flushed_rows``; ``changed_row`` does the same for changes
+    made outside the ORM). Sessions that already wrote the model in the
+    current transaction, or within ``bypass_cache``, read straight from the
+    database. The repository's ``cache_exclude`` columns are never cached.
+    """
+    def decorator(method: Callable) -> Callable:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self, db, *args, **kwargs):
+            model = self.model
+            if not (self.cache_ttl or self.negative_cache_ttl) or bypasses_cache(db, model):
+                return await method(self, db, *args, **kwargs)
+
+            bound = signature.bind(self, db, *args, **kwargs)
+            key = cache_key(model, method.__name__, *list(bound.arguments.values())[2:])
+            cached = await redis_cache.get(key)
+            # Found rows are JSON objects; a miss holds the NotFoundException
+            # detail, empty when the read returned None.
+            if cached is not None and cached.startswith("{"):
+                repo_cache_counter.inc(model=model.__name__, result="hit")
+                return await _attach(db, model, cached)
+            if cached is not None:
+                repo_cache_counter.inc(model=model.__name__, result="negative_hit")
+                if cached:
+                    raise NotFoundException(cached)
+                return None
+
+            repo_cache_counter.inc(model=model.__name__, result="miss")
+            try:
+                result = await method(self, db, *args, **kwargs)
+            except NotFoundException as e:
+                await _cache_miss(self, key, e.detail or "")
+                raise
+            if result is None:
+                await _cache_miss(self, key, "")
+                return None
+            data = encode(result, exclude=self.cache_exclude) if self.cache_ttl else None
+            if data is not None:
+                await redis_cache.set(
+                    key, data, expire=self.cache_ttl,
+                    tags=[model_tag(model), row_tag(model, _pk(result))],
+                )
+            return result
+
+        wrapper.cached_by = by
+        return wrapper
+
+    return decorator
+
+
+async def _cache_miss(repository: Any, key: str, detail: str) -> None:
+    if repository.negative_cache_ttl:
+        await redis_cache.set(key, detail, expire=repository.negative_cache_ttl)
+
+
+def changed_row(model: type, old: dict | None,
+                new: dict | None) -> Tuple[Set[str], Set[str]]:
+    """
+    Keys and tags of the cached reads one change of a ``model`` row stales,
+    from its column values before and after (None for an inserted or
+    deleted row): the reads that returned the old row, and the misses of
+    the new values. Columns missing from ``new`` are skipped.
+
+    :return: ``(keys, tags)``.
+    """
+    lookups = cached_lookups.get(model.__name__)
+    if lookups is None:
+        return set(), set()
+    tags = set()
+    if old:
+        mapper = sa_inspect(model)
+        pk = [old[mapper.get_property_by_column(column).key] for column in mapper.primary_key]
+        tags.add(row_tag(model, ",".join(map(str, pk))))
+    keys = {
+        cache_key(model, method, new[column])
+        for method, column in lookups if new and new.get(column) is not None
+    }
+    return keys, tags
+
+
+@event.listens_for(Session, "after_flush")
+def invalidate_flushed_rows(session, flush_context) -> None:
+    """
+    On commit, purge the cached reads of every updated or deleted row, and
+    the cached misses of the values of inserted and updated rows.
+    """
+    keys, tags = [], []
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        model = type(obj)
+        lookups = cached_lookups.get(model.__name__)
+        if lookups is None:
+            continue
+        mark_written(session, model)
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if obj not in session.new:
+            tags.append(row_tag(model, _pk(obj)))
+        if obj not in session.deleted:
+            values = sa_inspect(obj).dict
+            keys.extend(
+                cache_key(model, method, values[column])
+                for method, column in lookups if values.get(column) is not None
+            )
+    if keys or tags:
+        invalidate_on_commit(session, redis_cache, keys=keys, tags=tags)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def invalidate_bulk_statements(orm_execute_state) -> None:
+    """
+    ``update()``/``delete()`` statements do not say which rows they touch;
+    purge every cached read of the model on commit.
+    """
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_.__name__ not in cached_lookups:
+        return
+    session = orm_execute_state.session
+    mark_written(session, mapper.class_)
+    invalidate_on_commit(session, redis_cache, tags=[model_tag(mapper.class_)])
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def reset_written(session) -> None:
+    session.info.pop(WRITTEN, None)
@@ -1,16 +1,53 @@
-from sqlalchemy import select
+from typing import Any, Dict
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy import lambda_stmt, select
+
+from app.core.bloom import user_filter, user_logins
+from app.core.config import config
+from app.core.exceptions import ServiceUnavailableException
+from app.core.tracing import instrument
 from app.models.user import User
 from app.repositories.base_repo import BaseRepo
+from app.repositories.query_cache import bypasses_cache, cached_read
 
 
+@instrument
 class UserRepository(BaseRepo[User]):
     """
     User repository provides all the database operations for the User model.
+    Single-user lookups, including misses, are cached (see ``cached_read``)
+    and lookups by email or username skip the database for values the
+    ``user_filter`` Bloom filter has never seen.
     """
+    cache_ttl = config.REPO_CACHE_TTL
+    negative_cache_ttl = config.NEGATIVE_CACHE_TTL
+    # Password hashes stay out of Redis; see ``get_password_hash``.
+    cache_exclude = ("hashed_password",)
 
     def __init__(self):
         super().__init__(User)
 
+    async def create(self, db, **kwargs) -> User:
+        await self._add_logins(kwargs.get("email"), kwargs.get("username"))
+        return await super().create(db, **kwargs)
+
+    async def update(self, db, id_: int, update_data: Dict[str, Any]) -> User:
+        await self._add_logins(update_data.get("email"), update_data.get("username"))
+        return await super().update(db, id_, update_data)
+
+    async def _add_logins(self, email: str | None, username: str | None) -> None:
+        # Added before the row can be seen, so the filter never hides it.
+        try:
+            await user_filter.add_values(*user_logins(email, username))
+        except ConnectionError as e:
+            raise ServiceUnavailableException("Cannot save users right now", ex=e)
+
+    async def _unknown(self, db, login: str) -> bool:
+        """True if no user has ``login``, judging by ``user_filter`` alone."""
+        return not bypasses_cache(db, User) and not await user_filter.might_contain(login)
+
+    @cached_read(by="email")
     async def get_by_email(self, db, email: str) -> User | None:
         """
         Get user by email.
@@ -18,10 +55,13 @@ class UserRepository(BaseRepo[User]):
         :param email: Email.
         :return: User.
         """
-        query = select(User).filter(User.email == email)
+        if await self._unknown(db, *user_logins(email=email)):
+            return None
+        query = lambda_stmt(lambda: select(User).filter(User.email == email))
         result = await db.execute(query)
         return result.scalar_one_or_none()
 
+    @cached_read(by="username")
     async def get_by_name(self, db, username: str) -> User | None:
         """
         Get user by username.
@@ -29,6 +69,43 @@ class UserRepository(BaseRepo[User]):
         :param username: User name.
         :return: User.
         """
-        query = select(User).filter(User.username == username)
+        if await self._unknown(db, *user_logins(username=username)):
+            return None
+        query = lambda_stmt(lambda: select(User).filter(User.username == username))
         result = await db.execute(query)
         return result.scalar_one_or_none()
+
+    async def get_password_hash(self, db, user: User) -> str:
+        """
+        ``user.hashed_password``, loaded from the database when ``user``
+        came from the cache, which never holds it.
+        """
+        if "hashed_password" not in sa_inspect(user).dict:
+            await db.refresh(user, ["hashed_password"])
+        return user.hashed_password
+
+    async def get_by_emails(self, db, emails: list[str]) -> list[User]:
+        """
+        Get users by a batch of emails.
+
+        :param emails: Emails.
+        :return: Users found, in no particular order.
+        """
+        query = select(User).filter(User.email.in_(emails))
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    async def get_logins(self, db, after_id: int = 0, limit: int = 1000) -> list:
+        """
+        Emails and usernames of the users after ``after_id``, in id order.
+
+        :return: ``(id, email, username)`` rows.
+        """
+        query = (
+            select(User.id, User.email, User.username)
+            .where(User.id > after_id)
+            .order_by(User.id)
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        return result.all()
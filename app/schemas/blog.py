@@ -17,3 +17,10 @@ class BlogResponse(BaseModel):
     title: str
     content: str
     author_id: int
+
+
+class BlogSummary(BaseModel):
+    id: int
+    title: str
+    author_id: int
+    excerpt: str
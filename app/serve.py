@@ -0,0 +1,61 @@
+"""
+Production entry point: a gunicorn master supervising uvicorn workers.
+
+    python -m app.serve
+
+The master binds the listening socket once and forks ``SERVER_WORKERS``
+workers (default: one per CPU), restarts crashed workers and recycles each
+worker after ``SERVER_MAX_REQUESTS`` (+ random jitter) requests. On SIGTERM
+workers stop accepting connections, finish in-flight requests within
+``SERVER_GRACEFUL_TIMEOUT`` and run the application shutdown, which closes
+the database and Redis pools.
+"""
+import os
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+from app.core.config import config
+
+
+class Worker(UvicornWorker):
+    """Uvicorn worker on uvloop with the httptools parser."""
+
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
+
+
+class Server(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.core.server import app
+        return app
+
+
+def options() -> dict:
+    return {
+        "bind": f"{config.SERVER_HOST}:{config.SERVER_PORT}",
+        "workers": config.SERVER_WORKERS or os.cpu_count() or 1,
+        "worker_class": "app.serve.Worker",
+        "backlog": config.SERVER_BACKLOG,
+        # Longer than nginx's upstream keep-alive, so nginx always closes
+        # idle connections first and never reuses one we just closed.
+        "keepalive": config.SERVER_KEEPALIVE,
+        "timeout": config.SERVER_TIMEOUT,
+        "graceful_timeout": config.SERVER_GRACEFUL_TIMEOUT,
+        "max_requests": config.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": config.SERVER_MAX_REQUESTS_JITTER,
+        "reuse_port": config.SERVER_REUSE_PORT,
+        "forwarded_allow_ips": config.SERVER_FORWARDED_ALLOW_IPS,
+        "accesslog": None,
+    }
+
+
+if __name__ == "__main__":
+    Server(options()).run()
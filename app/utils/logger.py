@@ -7,6 +7,7 @@ from fastapi.logger import logger
 from fastapi.requests import Request
 
 from app.core.config import config
+from app.core.tracing import current_trace_id
 
 logging.basicConfig()
 logger.setLevel(
@@ -49,7 +50,8 @@ async def api_logger(request: Request, response=None, error=None):
         errorDetail=error_log,
         client=user_log,
         processedTime=str(round(t * 1000, 5)) + "ms",
-        datetimeUTC=datetime.utcnow().strftime(time_format)
+        datetimeUTC=datetime.utcnow().strftime(time_format),
+        traceId=current_trace_id(),
     )
     if error and error.status_code >= 500:
         logger.error(json.dumps(log_dict))
@@ -0,0 +1,95 @@
+"""
+CPU cost of a point lookup through the ORM versus the raw asyncpg fast
+path (``BaseRepo.fetch_one``).
+
+Without ``--url`` only the mapping step is compared: hydrating a ``User``
+instance and validating it into ``UserResponse`` versus constructing
+``UserResponse`` from a record-like mapping. With ``--url`` both full paths
+run against Postgres inside one session, as the application does.
+
+    python -m benchmarks.fast_path [--iterations 20000] [--url postgresql+asyncpg://... --email someone@example.com]
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import User
+from app.repositories.user import UserRepository
+from app.schemas.user import UserResponse
+
+ROW = {"id": 1, "email": "bench@example.com", "username": "bench", "full_name": "Bench"}
+
+
+def orm_mapping():
+    user = User(hashed_password="x", is_active=1, **ROW)
+    return UserResponse.model_validate(user.__dict__)
+
+
+def fast_mapping():
+    return UserResponse.model_construct(**ROW)
+
+
+def measure(call, iterations: int) -> float:
+    call()
+    start = time.process_time()
+    for _ in range(iterations):
+        call()
+    return (time.process_time() - start) / iterations
+
+
+async def measure_async(call, iterations: int) -> float:
+    await call()
+    start = time.process_time()
+    for _ in range(iterations):
+        await call()
+    return (time.process_time() - start) / iterations
+
+
+async def run_database(url: str, email: str, iterations: int):
+    engine = create_async_engine(url, pool_size=1)
+    repository = UserRepository()
+    try:
+        async with AsyncSession(engine) as db:
+            async def orm():
+                user = await repository.get_by_email(db=db, email=email)
+                db.expunge_all()
+                return UserResponse.model_validate(user.__dict__)
+
+            async def fast():
+                return await repository.fetch_one(
+                    db=db, schema=UserResponse, column="email", value=email
+                )
+
+            return await measure_async(orm, iterations), await measure_async(fast, iterations)
+    finally:
+        await engine.dispose()
+
+
+def report(label: str, seconds: float, baseline: float | None = None):
+    line = f"{label:<24} {seconds * 1e6:8.1f} us/lookup"
+    if baseline:
+        line += f"  ({(1 - seconds / baseline) * 100:+.0f}% CPU saved)"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--url", help="Postgres URL for the end-to-end comparison")
+    parser.add_argument("--email", default=ROW["email"], help="Existing user's email")
+    args = parser.parse_args()
+
+    baseline = measure(orm_mapping, args.iterations)
+    report("ORM mapping", baseline)
+    report("fast path mapping", measure(fast_mapping, args.iterations), baseline)
+
+    if args.url:
+        orm, fast = asyncio.run(run_database(args.url, args.email, args.iterations // 10))
+        report("ORM lookup", orm)
+        report("fast path lookup", fast, orm)
+
+
+if __name__ == "__main__":
+    main()
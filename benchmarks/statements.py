@@ -0,0 +1,90 @@
+"""
+Per-query CPU cost of plain ``select()`` construction versus the cached
+lambda statements used by the repositories.
+
+Runs against an in-memory SQLite database so only SQLAlchemy's Python-side
+work (statement construction, cache-key generation, compilation and result
+processing) is measured; the asyncpg prepared-statement cache is measured
+by ``--url`` against a real Postgres.
+
+    python -m benchmarks.statements [--iterations 20000] [--url postgresql+asyncpg://...]
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine, lambda_stmt, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+from app.models import User
+
+
+def plain(email):
+    return select(User).filter(User.email == email)
+
+
+def cached(email):
+    return lambda_stmt(lambda: select(User).filter(User.email == email))
+
+
+def run_sync(build, iterations: int) -> float:
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    with Session(engine) as session:
+        session.add(User(username="bench", email="bench@example.com", hashed_password="x"))
+        session.commit()
+        session.execute(build("bench@example.com")).scalar_one()
+        start = time.process_time()
+        for _ in range(iterations):
+            session.execute(build("bench@example.com")).scalar_one()
+        return (time.process_time() - start) / iterations
+
+
+async def run_async(url: str, connect_args: dict, iterations: int) -> float:
+    engine = create_async_engine(url, connect_args=connect_args, pool_size=1)
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(cached("bench@example.com"))
+            start = time.process_time()
+            for _ in range(iterations):
+                await connection.execute(cached("bench@example.com"))
+            return (time.process_time() - start) / iterations
+    finally:
+        await engine.dispose()
+
+
+def report(label: str, seconds: float, baseline: float | None = None):
+    line = f"{label:<32} {seconds * 1e6:8.1f} us/query"
+    if baseline:
+        line += f"  ({(1 - seconds / baseline) * 100:+.0f}% CPU saved)"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--url", help="Postgres URL for the asyncpg comparison")
+    args = parser.parse_args()
+
+    baseline = run_sync(plain, args.iterations)
+    report("select() per call", baseline)
+    report("lambda_stmt", run_sync(cached, args.iterations), baseline)
+
+    if args.url:
+        iterations = args.iterations // 10
+        uncached = asyncio.run(run_async(
+            args.url,
+            {"statement_cache_size": 0, "prepared_statement_cache_size": 0},
+            iterations,
+        ))
+        report("asyncpg, statement cache off", uncached)
+        report("asyncpg, statement cache on", asyncio.run(run_async(
+            args.url,
+            {"statement_cache_size": 256, "prepared_statement_cache_size": 256},
+            iterations,
+        )), uncached)
+
+
+if __name__ == "__main__":
+    main()
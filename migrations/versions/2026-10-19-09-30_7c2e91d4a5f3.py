@@ -0,0 +1,72 @@
+"""notify cache invalidation
+
+Revision ID: 7c2e91d4a5f3
+Revises: b40a83f97ac8
+Create Date: 2026-10-19 09:30:12.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e91d4a5f3'
+down_revision: Union[str, None] = 'b40a83f97ac8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Publishes {"table", "op", "old", "new"} on the cache_invalidation channel,
+# where old/new hold only the columns named in the trigger arguments, so the
+# payload stays far below NOTIFY's 8000 byte limit.
+NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_cache_invalidation() RETURNS trigger AS $$
+DECLARE
+    old_keys jsonb := NULL;
+    new_keys jsonb := NULL;
+    col text;
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        old_keys := '{}'::jsonb;
+        FOREACH col IN ARRAY TG_ARGV LOOP
+            old_keys := old_keys || jsonb_build_object(col, to_jsonb(OLD) -> col);
+        END LOOP;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        new_keys := '{}'::jsonb;
+        FOREACH col IN ARRAY TG_ARGV LOOP
+            new_keys := new_keys || jsonb_build_object(col, to_jsonb(NEW) -> col);
+        END LOOP;
+    END IF;
+    PERFORM pg_notify('cache_invalidation', jsonb_build_object(
+        'table', TG_TABLE_NAME, 'op', TG_OP, 'old', old_keys, 'new', new_keys
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+TRIGGERS = {
+    "users": ("id", "email"),
+    "blog_posts": ("id", "author_id"),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(NOTIFY_FUNCTION)
+    for table, columns in TRIGGERS.items():
+        arguments = ", ".join(f"'{column}'" for column in columns)
+        op.execute(
+            f"CREATE TRIGGER {table}_notify_cache_invalidation "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation({arguments})"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_cache_invalidation ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS notify_cache_invalidation()")
@@ -0,0 +1,28 @@
+"""blog posts created_at index
+
+Revision ID: 3f8b1c6e2d90
+Revises: 7c2e91d4a5f3
+Create Date: 2026-10-19 14:05:41.207318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8b1c6e2d90'
+down_revision: Union[str, None] = '7c2e91d4a5f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_blog_posts_created_at_id', 'blog_posts', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_blog_posts_created_at_id', table_name='blog_posts')
@@ -0,0 +1,173 @@
+"""partition blog posts by created_at
+
+Revision ID: a51d7e0c9b24
+Revises: 3f8b1c6e2d90
+Create Date: 2026-10-19 16:40:27.905114
+
+Rebuilds blog_posts as a table partitioned by month on created_at and
+copies the rows over, so it needs a maintenance window on large tables.
+The primary key becomes (id, created_at); ids still come from
+blog_posts_id_seq. Run ``python -m app.commands.partitions`` regularly to
+keep future partitions created ahead of time.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a51d7e0c9b24'
+down_revision: Union[str, None] = '3f8b1c6e2d90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months partitioned ahead of the current one by the migration itself.
+MONTHS_AHEAD = 3
+
+# Creates the partition holding the month of ``month_start`` (UTC) unless it
+# exists and returns its name, e.g. blog_posts_p202610.
+ENSURE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_blog_posts_partition(month_start date) RETURNS text AS $$
+DECLARE
+    first_day date := date_trunc('month', month_start)::date;
+    partition text := 'blog_posts_p' || to_char(first_day, 'YYYYMM');
+BEGIN
+    IF to_regclass(partition) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF blog_posts FOR VALUES FROM (%L) TO (%L)',
+            partition,
+            first_day::text || ' 00:00:00+00',
+            (first_day + interval '1 month')::date::text || ' 00:00:00+00'
+        );
+    END IF;
+    RETURN partition;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CREATE_PARTITIONS = f"""
+DO $$
+DECLARE
+    month date;
+BEGIN
+    SELECT date_trunc('month', COALESCE(min(created_at), now()) AT TIME ZONE 'UTC')::date
+    INTO month FROM blog_posts_legacy;
+    WHILE month <= (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{MONTHS_AHEAD} months')::date LOOP
+        PERFORM ensure_blog_posts_partition(month);
+        month := (month + interval '1 month')::date;
+    END LOOP;
+END;
+$$;
+"""
+
+# Row triggers on a partitioned table fire with the partition as
+# TG_TABLE_NAME; publish the partitioned table's name instead.
+NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_cache_invalidation() RETURNS trigger AS $$
+DECLARE
+    old_keys jsonb := NULL;
+    new_keys jsonb := NULL;
+    col text;
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        old_keys := '{}'::jsonb;
+        FOREACH col IN ARRAY TG_ARGV LOOP
+            old_keys := old_keys || jsonb_build_object(col, to_jsonb(OLD) -> col);
+        END LOOP;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        new_keys := '{}'::jsonb;
+        FOREACH col IN ARRAY TG_ARGV LOOP
+            new_keys := new_keys || jsonb_build_object(col, to_jsonb(NEW) -> col);
+        END LOOP;
+    END IF;
+    PERFORM pg_notify('cache_invalidation', jsonb_build_object(
+        'table', COALESCE(pg_partition_root(TG_RELID::regclass), TG_RELID::regclass)::text,
+        'op', TG_OP, 'old', old_keys, 'new', new_keys
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+NOTIFY_TRIGGER = (
+    "CREATE TRIGGER blog_posts_notify_cache_invalidation "
+    "AFTER INSERT OR UPDATE OR DELETE ON blog_posts "
+    "FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation('id', 'author_id')"
+)
+
+COLUMNS = "id, title, content, author_id, created_at, updated_at"
+
+
+def _rename_old_table() -> None:
+    op.execute("DROP TRIGGER IF EXISTS blog_posts_notify_cache_invalidation ON blog_posts")
+    op.rename_table('blog_posts', 'blog_posts_legacy')
+    op.execute("ALTER INDEX ix_blog_posts_id RENAME TO ix_blog_posts_legacy_id")
+    op.execute("ALTER INDEX ix_blog_posts_created_at_id RENAME TO ix_blog_posts_legacy_created_at_id")
+    op.execute("ALTER TABLE blog_posts_legacy RENAME CONSTRAINT blog_posts_pkey TO blog_posts_legacy_pkey")
+    op.execute(
+        "ALTER TABLE blog_posts_legacy "
+        "RENAME CONSTRAINT blog_posts_author_id_fkey TO blog_posts_legacy_author_id_fkey"
+    )
+
+
+def _create_indexes() -> None:
+    op.create_index(op.f('ix_blog_posts_id'), 'blog_posts', ['id'], unique=False)
+    op.create_index('ix_blog_posts_created_at_id', 'blog_posts', ['created_at', 'id'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rename_old_table()
+    op.create_table('blog_posts',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('blog_posts_id_seq'::regclass)"), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['author_id'], ['users.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)',
+    )
+    op.execute("ALTER SEQUENCE blog_posts_id_seq OWNED BY blog_posts.id")
+    # Catches rows outside the pre-created months; kept empty by the
+    # maintenance command.
+    op.execute("CREATE TABLE blog_posts_default PARTITION OF blog_posts DEFAULT")
+    op.execute(ENSURE_PARTITION_FUNCTION)
+    op.execute(CREATE_PARTITIONS)
+
+    op.execute(
+        f"INSERT INTO blog_posts ({COLUMNS}) "
+        f"SELECT id, title, content, author_id, COALESCE(created_at, now()), updated_at "
+        f"FROM blog_posts_legacy"
+    )
+    op.drop_table('blog_posts_legacy')
+    _create_indexes()
+    op.execute(NOTIFY_FUNCTION)
+    op.execute(NOTIFY_TRIGGER)
+    op.execute("ANALYZE blog_posts")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The partition-aware notify function also works for plain tables
+    # and is left in place.
+    _rename_old_table()
+    op.create_table('blog_posts',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('blog_posts_id_seq'::regclass)"), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['author_id'], ['users.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute("ALTER SEQUENCE blog_posts_id_seq OWNED BY blog_posts.id")
+    op.execute(f"INSERT INTO blog_posts ({COLUMNS}) SELECT {COLUMNS} FROM blog_posts_legacy")
+    op.execute("DROP TABLE blog_posts_legacy CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS ensure_blog_posts_partition(date)")
+    _create_indexes()
+    op.execute(NOTIFY_TRIGGER)
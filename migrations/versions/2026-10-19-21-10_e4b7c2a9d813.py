@@ -0,0 +1,91 @@
+"""move default partition rows into new blog post partitions
+
+Revision ID: e4b7c2a9d813
+Revises: a51d7e0c9b24
+Create Date: 2026-10-19 21:10:53.614027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7c2a9d813'
+down_revision: Union[str, None] = 'a51d7e0c9b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Creating a partition fails while the default partition holds rows of its
+# range. Those rows are moved over with the default partition detached:
+# the copy notifies as inserts into blog_posts, and deleting them from the
+# detached table, whose row triggers went with the detach, notifies
+# nothing, so the cache sees no spurious deletes.
+ENSURE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_blog_posts_partition(month_start date) RETURNS text AS $$
+DECLARE
+    first_day date := date_trunc('month', month_start)::date;
+    partition text := 'blog_posts_p' || to_char(first_day, 'YYYYMM');
+    lower_bound timestamptz := (first_day::text || ' 00:00:00+00')::timestamptz;
+    upper_bound timestamptz :=
+        ((first_day + interval '1 month')::date::text || ' 00:00:00+00')::timestamptz;
+    stray boolean;
+BEGIN
+    IF to_regclass(partition) IS NOT NULL THEN
+        RETURN partition;
+    END IF;
+    SELECT EXISTS (
+        SELECT 1 FROM blog_posts_default
+        WHERE created_at >= lower_bound AND created_at < upper_bound
+    ) INTO stray;
+    IF stray THEN
+        ALTER TABLE blog_posts DETACH PARTITION blog_posts_default;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF blog_posts FOR VALUES FROM (%L) TO (%L)',
+        partition, lower_bound, upper_bound
+    );
+    IF stray THEN
+        EXECUTE format(
+            'INSERT INTO %I SELECT * FROM blog_posts_default '
+            'WHERE created_at >= %L AND created_at < %L',
+            partition, lower_bound, upper_bound
+        );
+        DELETE FROM blog_posts_default
+        WHERE created_at >= lower_bound AND created_at < upper_bound;
+        ALTER TABLE blog_posts ATTACH PARTITION blog_posts_default DEFAULT;
+    END IF;
+    RETURN partition;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_ENSURE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_blog_posts_partition(month_start date) RETURNS text AS $$
+DECLARE
+    first_day date := date_trunc('month', month_start)::date;
+    partition text := 'blog_posts_p' || to_char(first_day, 'YYYYMM');
+BEGIN
+    IF to_regclass(partition) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF blog_posts FOR VALUES FROM (%L) TO (%L)',
+            partition,
+            first_day::text || ' 00:00:00+00',
+            (first_day + interval '1 month')::date::text || ' 00:00:00+00'
+        );
+    END IF;
+    RETURN partition;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(ENSURE_PARTITION_FUNCTION)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(PREVIOUS_ENSURE_PARTITION_FUNCTION)
@@ -0,0 +1,39 @@
+"""notify user username changes
+
+Revision ID: 5d9e3a7b1c42
+Revises: e4b7c2a9d813
+Create Date: 2026-10-19 21:40:08.532716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d9e3a7b1c42'
+down_revision: Union[str, None] = 'e4b7c2a9d813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _users_trigger(*columns: str) -> None:
+    arguments = ", ".join(f"'{column}'" for column in columns)
+    op.execute("DROP TRIGGER IF EXISTS users_notify_cache_invalidation ON users")
+    op.execute(
+        "CREATE TRIGGER users_notify_cache_invalidation "
+        "AFTER INSERT OR UPDATE OR DELETE ON users "
+        f"FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation({arguments})"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Cached lookups by username are invalidated from the payload too.
+    _users_trigger("id", "email", "username")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _users_trigger("id", "email")
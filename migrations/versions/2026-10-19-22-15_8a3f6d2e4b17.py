@@ -0,0 +1,39 @@
+"""notify blog post created_at changes
+
+Revision ID: 8a3f6d2e4b17
+Revises: 5d9e3a7b1c42
+Create Date: 2026-10-19 22:15:42.187305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a3f6d2e4b17'
+down_revision: Union[str, None] = '5d9e3a7b1c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _blog_posts_trigger(*columns: str) -> None:
+    arguments = ", ".join(f"'{column}'" for column in columns)
+    op.execute("DROP TRIGGER IF EXISTS blog_posts_notify_cache_invalidation ON blog_posts")
+    op.execute(
+        "CREATE TRIGGER blog_posts_notify_cache_invalidation "
+        "AFTER INSERT OR UPDATE OR DELETE ON blog_posts "
+        f"FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation({arguments})"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Posts inserted outside the API are added to the feed, scored by it.
+    _blog_posts_trigger("id", "author_id", "created_at")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _blog_posts_trigger("id", "author_id")
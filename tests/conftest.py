@@ -0,0 +1,27 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.info = {}
+    return session
+
+
+@pytest.fixture
+def make_controller(session):
+    """Build a controller on the mock ``session``."""
+    def make(controller_class, **dependencies):
+        return controller_class(session=session, **dependencies)
+    return make
+
+
+@pytest.fixture
+def commit(session):
+    """Apply the cache changes registered on the mock ``session``."""
+    def apply():
+        asyncio.run(session.info.pop("invalidation").apply())
+    return apply
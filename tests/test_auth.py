@@ -1,9 +1,14 @@
+import asyncio
+
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 from unittest.mock import AsyncMock, patch
 
 from app.controllers.auth import AuthController
+from app.core.config import config
+from app.core.dependencies.current_user import get_admin_user
+from app.core.exceptions import ForbiddenException
 from app.core.server import app
 from app.models.user import User
 from app.schemas.user import Token
@@ -93,3 +98,12 @@ async def test_read_users_me_authenticated(client, mock_user, mock_auth_controll
                                    "is_active": True, "is_superuser": False,
                                    "hashed_password": "hashed_password",
                                    "last_login": None}  # Adjust based on your User model
+
+
+def test_admin_endpoints_require_listed_email(mock_user, monkeypatch):
+    monkeypatch.setattr(config, "ADMIN_EMAILS", ["admin@example.com"])
+    with pytest.raises(ForbiddenException):
+        asyncio.run(get_admin_user(current_user=mock_user))
+
+    monkeypatch.setattr(config, "ADMIN_EMAILS", [mock_user.email])
+    assert asyncio.run(get_admin_user(current_user=mock_user)) is mock_user
@@ -1,10 +1,14 @@
+import asyncio
+from datetime import datetime, timezone
+
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 import json
 
 from app.controllers.blog import BlogController
+from app.core.feed import FeedEntry
 from app.core.server import app
 from app.models import User, BlogPost
 from app.schemas.blog import BlogCreate, BlogUpdate, BlogResponse
@@ -51,7 +55,8 @@ async def test_get_blogs(client, mock_blog_controller, mock_blog_response):
         assert response.status_code == status.HTTP_200_OK
         assert response.json() == [
             {"id": 1, "title": "Test Blog", "content": "Test Content", "author_id": 1}]
-        mock_blog_controller.read_blogs.assert_called_once_with(offset=0, limit=100)
+        mock_blog_controller.read_blogs.assert_called_once_with(
+            offset=0, limit=100, fields=None, view="full")
 
 
 async def test_delete_blog_success(client, mock_blog_controller, mock_user):
@@ -148,41 +153,86 @@ async def test_read_blogs_from_cache(mock_blog_controller, mock_redis_cache,
     mock_redis_cache.get.assert_called_once_with("blogs:0:100")
 
 
-async def test_create_blog_invalidates_cache(mock_blog_controller, mock_redis_cache,
-                                             mock_user, mock_blog):
-    mock_blog_controller.create_blog.return_value = mock_blog
-    mock_blog_controller.redis_cache = mock_redis_cache
-    mock_redis_cache.redis = AsyncMock()
+def test_create_blog_invalidates_cache(mock_redis_cache, mock_user, mock_blog,
+                                       make_controller, commit):
+    repository = AsyncMock()
+    repository.create.return_value = mock_blog
+    controller = make_controller(BlogController, blog_repository=repository,
+                                 redis_cache=mock_redis_cache, blog_feed=MagicMock())
 
     blog_create = BlogCreate(title="New Blog", content="New Content", author_id=1)
-    await mock_blog_controller.create_blog(current_user=mock_user, blog=blog_create)
-
-    mock_redis_cache.redis.keys.assert_called_once_with("blogs:*")
-    mock_redis_cache.redis.delete.assert_called_once()
-
-
-async def test_delete_blog_invalidates_cache(mock_blog_controller, mock_redis_cache,
-                                             mock_user, mock_blog):
-    mock_blog_controller.blog_delete.return_value = None
-    mock_blog_controller.redis_cache = mock_redis_cache
-    mock_redis_cache.redis = AsyncMock()
-
-    await mock_blog_controller.blog_delete(current_user=mock_user, id=1)
-
-    mock_redis_cache.redis.delete.assert_any_call("blog:1")
-    mock_redis_cache.redis.keys.assert_called_once_with("blogs:*")
-    mock_redis_cache.redis.delete.assert_called()
-
-
-async def test_edit_blog_invalidates_cache(mock_blog_controller, mock_redis_cache,
-                                           mock_blog):
-    mock_blog_controller.edit_blog_db.return_value = mock_blog
-    mock_blog_controller.redis_cache = mock_redis_cache
-    mock_redis_cache.redis = AsyncMock()
-
-    blog_update = BlogUpdate(title="Updated Title")
-    await mock_blog_controller.edit_blog_db(id=1, blog=blog_update)
-
-    mock_redis_cache.redis.delete.assert_any_call("blog:1")
-    mock_redis_cache.redis.keys.assert_called_once_with("blogs:*")
-    mock_redis_cache.redis.delete.assert_called()
+    asyncio.run(controller.create_blog(current_user=mock_user, blog=blog_create))
+    mock_redis_cache.invalidate.assert_not_called()
+    commit()
+
+    changes = mock_redis_cache.invalidate.call_args.kwargs
+    assert changes["tags"] == ["blogs"]
+    assert changes["counters"] == {"count:blog_posts": 1}
+    assert changes["value_tags"] == {"blog:1": ["author:1"]}
+    controller.blog_feed.add.assert_called_once_with(mock_blog)
+
+
+def test_delete_blog_invalidates_cache(mock_redis_cache, mock_user, mock_blog,
+                                       make_controller, commit):
+    repository = AsyncMock()
+    repository.get_by_id.return_value = mock_blog
+    controller = make_controller(BlogController, blog_repository=repository,
+                                 redis_cache=mock_redis_cache, blog_feed=MagicMock())
+
+    asyncio.run(controller.blog_delete(current_user=mock_user, id=1))
+    commit()
+
+    changes = mock_redis_cache.invalidate.call_args.kwargs
+    assert changes["keys"] == ["blog:1"]
+    assert changes["tags"] == ["blogs"]
+    assert changes["counters"] == {"count:blog_posts": -1}
+    controller.blog_feed.remove.assert_called_once_with(1)
+
+
+def test_edit_blog_invalidates_cache(mock_redis_cache, mock_blog,
+                                     make_controller, commit):
+    repository = AsyncMock()
+    repository.update.return_value = mock_blog
+    controller = make_controller(BlogController, blog_repository=repository,
+                                 redis_cache=mock_redis_cache, blog_feed=MagicMock())
+
+    asyncio.run(controller.edit_blog_db(id=1, blog=BlogUpdate(title="Test Blog")))
+    commit()
+
+    changes = mock_redis_cache.invalidate.call_args.kwargs
+    # The fresh entity is written through rather than deleted.
+    assert changes["keys"] == []
+    assert changes["tags"] == ["blogs"]
+    assert json.loads(changes["values"]["blog:1"])["title"] == "Test Blog"
+
+
+def test_feed_pages_alike_from_redis_and_postgres(mock_redis_cache, mock_blog, make_controller):
+    mock_blog.created_at = datetime(2026, 10, 19, 12, tzinfo=timezone.utc)
+    cursor = f"{mock_blog.created_at.timestamp()!r}:2"
+    repository = AsyncMock()
+    repository.get_latest.return_value = [mock_blog]
+    feed = AsyncMock()
+    controller = make_controller(BlogController, blog_repository=repository,
+                                 redis_cache=mock_redis_cache, blog_feed=feed)
+
+    feed.page.return_value = None
+    from_postgres = asyncio.run(controller.read_feed(before=cursor, limit=1))
+    repository.get_latest.assert_awaited_once_with(
+        db=controller.session, limit=1, before=mock_blog.created_at, before_id=2)
+
+    feed.page.return_value = [FeedEntry(1, mock_blog.created_at.timestamp(), {
+        "id": "1", "title": "Test Blog", "content": "Test Content", "author_id": "1",
+    })]
+    from_redis = asyncio.run(controller.read_feed(before=cursor, limit=1))
+
+    assert from_postgres == from_redis
+    assert from_redis[0] == [{"id": 1, "title": "Test Blog", "content": "Test Content",
+                              "author_id": 1}]
+    assert from_redis[1] == f"{mock_blog.created_at.timestamp()!r}:1"
+
+
+def test_feed_rejects_malformed_cursor(mock_redis_cache, make_controller):
+    controller = make_controller(BlogController, blog_repository=AsyncMock(),
+                                 redis_cache=mock_redis_cache, blog_feed=AsyncMock())
+    with pytest.raises(BadRequestException):
+        asyncio.run(controller.read_feed(before="12.5"))
@@ -0,0 +1,86 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.bloom import BloomFilter
+
+
+class BitmapPipe:
+    """Answers EXISTS and GETBIT from a bitmap."""
+
+    def __init__(self, bitmap: bytes):
+        self.bitmap = bitmap
+        self.replies = []
+
+    def exists(self, key):
+        self.replies.append(1)
+
+    def getbit(self, key, offset):
+        self.replies.append(self.bitmap[offset >> 3] >> (7 - (offset & 7)) & 1)
+
+
+def build(values):
+    bloom = BloomFilter(AsyncMock(), "test", capacity=1000, error_rate=0.01)
+
+    async def batches():
+        yield values[:2]
+        yield values[2:]
+
+    total = asyncio.run(bloom.rebuild(batches()))
+    swap = bloom.cache.pipeline.await_args.args[0]
+    pipe = MagicMock()
+    swap(pipe)
+    bitmap = pipe.set.call_args_list[0].args[1]
+
+    async def pipeline(*ops, **kwargs):
+        pipe = BitmapPipe(bitmap)
+        for op in ops:
+            op(pipe)
+        return pipe.replies
+
+    bloom.cache.pipeline = AsyncMock(side_effect=pipeline)
+    return bloom, total, pipe
+
+
+def test_rebuild_swaps_in_bitmap_merged_with_journal():
+    bloom, total, pipe = build(["email:a@example.com", "username:a", "email:b@example.com"])
+
+    assert total == 3
+    pipe.bitop.assert_called_once_with("OR", bloom.rebuild_key, bloom.rebuild_key, bloom.journal_key)
+    pipe.rename.assert_called_once_with(bloom.rebuild_key, bloom.key)
+    pipe.set.assert_any_call(bloom.ready_key, "1")
+    pipe.set.assert_any_call(bloom.fresh_key, "1", ex=bloom.max_age)
+
+
+def test_added_values_are_found_and_most_others_are_not():
+    values = [f"email:user{i}@example.com" for i in range(500)]
+    bloom, _, _ = build(values)
+
+    assert all(asyncio.run(bloom.might_contain(value)) for value in values)
+    unknown = [f"email:other{i}@example.com" for i in range(500)]
+    false_positives = sum(asyncio.run(bloom.might_contain(value)) for value in unknown)
+    assert false_positives < 25
+
+
+def test_unavailable_or_unbuilt_filter_might_contain_anything():
+    bloom = BloomFilter(AsyncMock(), "test", capacity=1000)
+
+    bloom.cache.pipeline.return_value = None
+    assert asyncio.run(bloom.might_contain("email:x@example.com"))
+    bloom.cache.pipeline.return_value = [0] + [0] * bloom.hashes
+    assert asyncio.run(bloom.might_contain("email:x@example.com"))
+
+
+def test_failed_add_switches_filter_off_or_fails():
+    bloom = BloomFilter(AsyncMock(), "test", capacity=1000)
+    pipe = MagicMock()
+
+    bloom.cache.pipeline.side_effect = [None, [1]]
+    asyncio.run(bloom.add_values("email:x@example.com"))
+    bloom.cache.pipeline.await_args.args[0](pipe)
+    pipe.delete.assert_called_once_with(bloom.ready_key, bloom.fresh_key)
+
+    bloom.cache.pipeline.side_effect = [None, None]
+    with pytest.raises(ConnectionError):
+        asyncio.run(bloom.add_values("email:x@example.com"))
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from app.core.cache import INCR_IF_EXISTS, INVALIDATE_TAGS, Invalidation, RedisCache
+
+
+class FakePipeline:
+    def __init__(self, store, log):
+        self.store = store
+        self.log = log
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def delete(self, *keys):
+        self.commands.append(("delete", keys))
+
+    def set(self, key, value, ex=None):
+        self.commands.append(("set", (key, value)))
+
+    def sadd(self, key, member):
+        self.commands.append(("sadd", (key, member)))
+
+    def expire(self, key, seconds):
+        self.commands.append(("expire", (key, seconds)))
+
+    def eval(self, script, numkeys, *keys_and_args):
+        name = {INVALIDATE_TAGS: "invalidate_tags", INCR_IF_EXISTS: "incr_if_exists"}[script]
+        self.commands.append((name, keys_and_args))
+
+    async def execute(self):
+        self.log.append([name for name, _ in self.commands])
+        for name, args in self.commands:
+            if name == "delete":
+                for key in args:
+                    self.store.pop(key, None)
+            elif name == "set":
+                self.store[args[0]] = args[1]
+            elif name == "sadd":
+                self.store.setdefault(args[0], set()).add(args[1])
+            elif name == "invalidate_tags":
+                for tag in args:
+                    for key in self.store.pop(tag, set()):
+                        self.store.pop(key, None)
+            elif name == "incr_if_exists":
+                key, delta = args
+                if key in self.store:
+                    self.store[key] = str(int(self.store[key]) + delta)
+
+
+class FakeRedis:
+    def __init__(self, store):
+        self.store = store
+        self.pipelines = []
+
+    async def scan_iter(self, match, count=None):
+        prefix = match.rstrip("*")
+        for key in list(self.store):
+            if key.startswith(prefix):
+                yield key
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.store, self.pipelines)
+
+
+@pytest.fixture
+def cache():
+    cache = RedisCache(redis_url="redis://localhost:6379/0", tag_ttl=3600)
+    cache.redis = FakeRedis({
+        "blog:1": "old",
+        "blogs:0:100": "[]",
+        "blogs:0:10": "[]",
+        "user:a@example.com": "{}",
+    })
+    return cache
+
+
+def test_invalidate_with_write_through_uses_one_pipeline(cache):
+    asyncio.run(cache.invalidate(
+        keys=["blog:1"], patterns=["blogs:*"], values={"blog:1": "new"}
+    ))
+
+    assert cache.redis.store == {"blog:1": "new", "user:a@example.com": "{}"}
+    assert cache.redis.pipelines == [["delete", "set"]]
+
+
+def test_invalidate_without_values_only_deletes(cache):
+    asyncio.run(cache.invalidate(patterns=["blogs:*"]))
+
+    assert "blogs:0:100" not in cache.redis.store
+    assert cache.redis.store["blog:1"] == "old"
+
+
+def test_set_with_tags_records_membership(cache):
+    asyncio.run(cache.set("blog:2", "{}", expire=600, tags=["author:7"]))
+
+    assert cache.redis.store["tag:author:7"] == {"blog:2"}
+    assert cache.redis.pipelines == [["set", "sadd", "expire"]]
+
+
+def test_invalidate_tags_drops_dependent_keys_in_one_pipeline(cache):
+    async def scenario():
+        await cache.set("blog:2", "{}", tags=["author:7"])
+        await cache.set("blogs:0:5", "[]", tags=["blogs"])
+        await cache.invalidate(keys=["user:a@example.com"], tags=["author:7", "blogs"])
+
+    asyncio.run(scenario())
+
+    assert set(cache.redis.store) == {"blog:1", "blogs:0:100", "blogs:0:10"}
+    assert cache.redis.pipelines[-1] == ["invalidate_tags", "delete"]
+
+
+def test_invalidation_merges_changes_into_one_pipeline(cache):
+    cache.redis.store["count:blog_posts"] = "10"
+    invalidation = Invalidation(cache)
+    invalidation.add(keys=["blog:1"], tags=["blogs"], counters={"count:blog_posts": 1})
+    invalidation.add(
+        values={"blog:1": "new"}, value_tags=["author:7"],
+        counters={"count:blog_posts": 1},
+    )
+
+    asyncio.run(invalidation.apply())
+
+    assert cache.redis.store["blog:1"] == "new"
+    assert cache.redis.store["count:blog_posts"] == "12"
+    assert cache.redis.store["tag:author:7"] == {"blog:1"}
+    assert cache.redis.pipelines == [
+        ["invalidate_tags", "set", "sadd", "expire", "incr_if_exists"]
+    ]
@@ -0,0 +1,105 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.core import deadline
+from app.core.cache import RedisCache
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(
+        name="test", failure_threshold=2, recovery_timeout=5.0, clock=clock
+    )
+
+
+def test_breaker_opens_after_consecutive_failures(breaker):
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+
+def test_success_resets_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_single_probe(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 5.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 5.0
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.now = 9.0
+    assert breaker.state == OPEN
+
+
+def test_cache_fails_open_and_stops_calling_redis(breaker):
+    cache = RedisCache(redis_url="redis://localhost:6379/0", breaker=breaker)
+    cache.redis = AsyncMock()
+    cache.redis.get.side_effect = ConnectionError("down")
+
+    async def scenario():
+        assert await cache.get("blog:1") is None
+        assert await cache.get("blog:1") is None
+        # The breaker is open now, so Redis is no longer contacted.
+        assert await cache.get("blog:1") is None
+        await cache.set("blog:1", "{}")
+
+    asyncio.run(scenario())
+    assert cache.redis.get.call_count == 2
+    cache.redis.set.assert_not_called()
+
+
+def test_request_budget_cutoff_is_not_a_redis_failure(breaker):
+    cache = RedisCache(redis_url="redis://localhost:6379/0", breaker=breaker)
+    cache.redis = AsyncMock()
+
+    async def slow_get(key):
+        await asyncio.sleep(0.1)
+
+    cache.redis.get.side_effect = slow_get
+
+    async def scenario():
+        token = deadline.request_deadline.set(time.monotonic() + 0.01)
+        try:
+            for _ in range(3):
+                assert await cache.get("blog:1") is None
+        finally:
+            deadline.request_deadline.reset(token)
+
+    asyncio.run(scenario())
+    assert breaker.state == CLOSED
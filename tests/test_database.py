@@ -0,0 +1,97 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.util import greenlet_spawn
+
+from app.core import database
+from app.core.database import (
+    apply_invalidation,
+    discard_invalidation,
+    get_session,
+    invalidate_on_commit,
+    invalidate_on_rollback,
+)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = MagicMock()
+    session.info = {}
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    session.close = AsyncMock()
+    monkeypatch.setattr(database, "AsyncSessionLocal", lambda: session)
+    return session
+
+
+def request():
+    return SimpleNamespace(state=SimpleNamespace(deadline=None))
+
+
+def test_commits_once_at_the_end(session):
+    async def scenario():
+        dependency = get_session(request())
+        await dependency.__anext__()
+        session.commit.assert_not_awaited()
+        with pytest.raises(StopAsyncIteration):
+            await dependency.__anext__()
+
+    asyncio.run(scenario())
+    session.commit.assert_awaited_once()
+    session.rollback.assert_not_awaited()
+    session.close.assert_awaited_once()
+
+
+def test_rolls_back_on_error(session):
+    async def scenario():
+        dependency = get_session(request())
+        await dependency.__anext__()
+        with pytest.raises(ValueError):
+            await dependency.athrow(ValueError("boom"))
+
+    asyncio.run(scenario())
+    session.commit.assert_not_awaited()
+    session.rollback.assert_awaited_once()
+
+
+def test_invalidations_are_applied_once_after_commit():
+    cache = AsyncMock()
+    session = SimpleNamespace(info={})
+    invalidate_on_commit(session, cache, keys=["blog:1"], tags=["blogs"])
+    invalidate_on_commit(session, cache, counters={"count:blog_posts": -1})
+
+    # The hook runs inside AsyncSession.commit()'s greenlet in production.
+    asyncio.run(greenlet_spawn(apply_invalidation, session))
+
+    cache.invalidate.assert_awaited_once_with(
+        keys=["blog:1"], tags=["blogs"], values={}, value_tags={},
+        counters={"count:blog_posts": -1}, ops=[],
+    )
+    assert "invalidation" not in session.info
+
+
+def test_invalidations_are_dropped_on_rollback():
+    cache = AsyncMock()
+    session = SimpleNamespace(info={})
+    invalidate_on_commit(session, cache, keys=["blog:1"])
+
+    discard_invalidation(session)
+    asyncio.run(greenlet_spawn(apply_invalidation, session))
+
+    cache.invalidate.assert_not_awaited()
+
+
+def test_rollback_changes_are_applied_only_on_rollback():
+    cache = AsyncMock()
+    committed, rolled_back = SimpleNamespace(info={}), SimpleNamespace(info={})
+    for session in (committed, rolled_back):
+        invalidate_on_rollback(session, cache, keys=["idempotency:k1"])
+
+    asyncio.run(greenlet_spawn(apply_invalidation, committed))
+    asyncio.run(greenlet_spawn(discard_invalidation, rolled_back))
+    asyncio.run(greenlet_spawn(discard_invalidation, committed))
+
+    cache.invalidate.assert_awaited_once()
+    assert cache.invalidate.await_args.kwargs["keys"] == ["idempotency:k1"]
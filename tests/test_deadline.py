@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, Request, status
+from fastapi.testclient import TestClient
+
+from app.core import deadline
+from app.core.middlewares import DeadlineMiddleware
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(1)
+        return {"ok": True}
+
+    @app.get("/budget")
+    async def budget(request: Request):
+        return {
+            "has_state": request.state.deadline is not None,
+            "remaining": deadline.remaining(),
+        }
+
+    app.add_middleware(
+        DeadlineMiddleware,
+        header="X-Request-Timeout",
+        default_timeout=5.0,
+        max_timeout=10.0,
+        route_timeouts={"/slow": 0.05},
+    )
+    return TestClient(app)
+
+
+def test_parse_timeout():
+    assert deadline.parse_timeout("2.5") == 2.5
+    assert deadline.parse_timeout("abc") is None
+    assert deadline.parse_timeout("-1") is None
+    assert deadline.parse_timeout(None) is None
+
+
+def test_route_timeout_uses_longest_prefix():
+    routes = {"/blogs": 2.0, "/blogs/feed": 0.5}
+    assert deadline.route_timeout("/blogs/feed", routes, 10.0) == 0.5
+    assert deadline.route_timeout("/blogs/1", routes, 10.0) == 2.0
+    assert deadline.route_timeout("/user", routes, 10.0) == 10.0
+
+
+def test_route_default_deadline_returns_504(client):
+    response = client.get("/slow")
+    assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+    assert response.json()["detail"] == "Request deadline exceeded"
+
+
+def test_header_deadline_is_capped_and_exposed(client):
+    response = client.get("/budget", headers={"X-Request-Timeout": "60"})
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["has_state"]
+    assert 0 < body["remaining"] <= 10.0
+
+
+def test_header_deadline_shortens_route_budget(client):
+    response = client.get("/budget", headers={"X-Request-Timeout": "1"})
+    assert response.json()["remaining"] <= 1.0
@@ -0,0 +1,43 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from app.repositories.blog import BlogRepository
+from app.repositories.user import UserRepository
+from app.schemas.blog import BlogResponse
+from app.schemas.user import UserResponse
+
+
+def session_returning(record):
+    raw = MagicMock()
+    raw.driver_connection.fetchrow = AsyncMock(return_value=record)
+    connection = MagicMock()
+    connection.get_raw_connection = AsyncMock(return_value=raw)
+    db = MagicMock()
+    db.connection = AsyncMock(return_value=connection)
+    return db, raw.driver_connection.fetchrow
+
+
+def test_fetch_one_maps_record_into_schema():
+    db, fetchrow = session_returning(
+        {"id": 1, "title": "Title", "content": "Body", "author_id": 2}
+    )
+
+    blog = asyncio.run(BlogRepository().fetch_one(
+        db=db, schema=BlogResponse, column="id", value=1
+    ))
+
+    assert blog == BlogResponse(id=1, title="Title", content="Body", author_id=2)
+    fetchrow.assert_awaited_once_with(
+        "SELECT id, title, content, author_id FROM blog_posts WHERE id = $1", 1
+    )
+
+
+def test_fetch_one_returns_none_when_missing():
+    db, fetchrow = session_returning(None)
+
+    user = asyncio.run(UserRepository().fetch_one(
+        db=db, schema=UserResponse, column="email", value="missing@example.com"
+    ))
+
+    assert user is None
+    assert fetchrow.call_args.args[0].endswith("FROM users WHERE email = $1")
@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.feed import FEED_KEY, BlogFeed, Cursor, FeedEntry, score
+from app.core.warmup import warm_up_feed
+from app.models import BlogPost
+
+
+class RecordingPipeline:
+    def __init__(self):
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+
+def queued(*ops):
+    pipe = RecordingPipeline()
+    for op in ops:
+        op(pipe)
+    return pipe.commands
+
+
+def post(id_):
+    created_at = datetime(2026, 10, 19, 12, 0, id_, tzinfo=timezone.utc)
+    return BlogPost(id=id_, title="t", content="c", author_id=7, created_at=created_at)
+
+
+def test_add_writes_item_scores_and_trims():
+    feed = BlogFeed(cache=AsyncMock(), max_items=100)
+    commands = queued(feed.add(post(1)))
+
+    assert [name for name, _, _ in commands] == ["hset", "expire", "zadd", "zremrangebyrank"]
+    assert commands[2][1] == (FEED_KEY, {"1": score(post(1).created_at)})
+    assert commands[3][1] == (FEED_KEY, 0, -101)
+
+
+def test_page_reads_scores_then_items():
+    cache = AsyncMock()
+    cache.pipeline.side_effect = [
+        [1, [("2", 20.0), ("1", 10.0)], 2],
+        [{"id": "2", "title": "t"}, {}],
+    ]
+    feed = BlogFeed(cache=cache)
+
+    entries = asyncio.run(feed.page(before=None, limit=2))
+
+    assert entries == [FeedEntry(2, 20.0, {"id": "2", "title": "t"}), FeedEntry(1, 10.0, None)]
+    assert cache.pipeline.await_count == 2
+
+
+def test_page_falls_back_until_ready_or_past_trimmed_tail():
+    cache = AsyncMock()
+    feed = BlogFeed(cache=cache, max_items=2)
+
+    cache.pipeline.side_effect = [[0, [], 0]]
+    assert asyncio.run(feed.page(before=None, limit=2)) is None
+
+    cache.pipeline.side_effect = [[1, [("1", 10.0)], 2, []]]
+    assert asyncio.run(feed.page(before=Cursor(11.0, 5), limit=2)) is None
+
+    cache.pipeline.side_effect = [None]
+    assert asyncio.run(feed.page(before=None, limit=2)) is None
+
+
+def test_pages_order_posts_created_together_by_id():
+    ties = [("10", 10.0), ("11", 10.0), ("9", 10.0)]
+    cache = AsyncMock()
+    feed = BlogFeed(cache=cache)
+
+    # Redis orders the tied members as strings: 9, 11, 10.
+    cache.pipeline.side_effect = [
+        [1, [("9", 10.0), ("11", 10.0), ("10", 10.0)], 4], [ties], [{}, {}],
+    ]
+    first = asyncio.run(feed.page(before=None, limit=2))
+    assert [(entry.id, entry.score) for entry in first] == [(11, 10.0), (10, 10.0)]
+
+    cache.pipeline.side_effect = [[1, [("1", 5.0)], 4, ties], [{}, {}]]
+    second = asyncio.run(feed.page(before=Cursor(10.0, 10), limit=2))
+    assert [(entry.id, entry.score) for entry in second] == [(9, 10.0), (1, 5.0)]
+
+
+def test_cursor_round_trips():
+    cursor = Cursor(score(post(1).created_at), 7)
+    assert Cursor.parse(str(cursor)) == cursor
+    for value in ("", "1.5", "nan:1", "x:1"):
+        with pytest.raises(ValueError):
+            Cursor.parse(value)
+
+
+def test_failed_warm_up_releases_rebuild_lock():
+    feed = AsyncMock()
+    feed.acquire_rebuild_lock.return_value = True
+    feed.rebuild.side_effect = asyncio.CancelledError
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(warm_up_feed(feed, batch_size=10))
+
+    feed.release_rebuild_lock.assert_awaited_once()
+
+
+def test_posts_written_elsewhere_drop_their_items():
+    feed = BlogFeed(cache=AsyncMock(), max_items=100)
+    created_at = post(1).created_at
+
+    inserted = queued(feed.insert(1, created_at))
+    assert [name for name, _, _ in inserted] == ["delete", "zadd", "zremrangebyrank"]
+
+    refreshed = queued(feed.refresh(1, created_at))
+    assert refreshed[0][:2] == ("delete", ("feed:blog:1",))
+    assert refreshed[1] == ("zadd", (FEED_KEY, {"1": score(created_at)}), {"xx": True})
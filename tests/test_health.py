@@ -0,0 +1,22 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.server import app
+
+
+@pytest.fixture
+def client():
+    # Not entering the client skips the lifespan, so no warm-up runs.
+    yield TestClient(app)
+    app.state.ready = False
+
+
+def test_live_does_not_wait_for_warm_up(client):
+    assert client.get("/health/live").status_code == 200
+
+
+def test_ready_fails_until_warmed_up(client):
+    assert client.get("/health/ready").status_code == 503
+
+    app.state.ready = True
+    assert client.get("/health/ready").json() == {"status": "ready"}
@@ -0,0 +1,79 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.cache import HOT_KEYS_KEY, RedisCache
+from app.core.hotkeys import CountMinSketch, HotKeyTracker
+
+
+@pytest.fixture
+def tracker():
+    return HotKeyTracker(capacity=3, width=256, depth=4)
+
+
+def test_sketch_never_underestimates():
+    sketch = CountMinSketch(width=64, depth=3)
+    for index in range(500):
+        sketch.add(f"blog:{index % 50}")
+    assert all(sketch.estimate(f"blog:{index}") >= 10 for index in range(50))
+
+
+def test_sketch_decay_halves_counts():
+    sketch = CountMinSketch(width=64, depth=3)
+    sketch.add("blog:1", count=8)
+    sketch.decay()
+    assert sketch.estimate("blog:1") == 4
+
+
+def test_tracker_keeps_most_frequent_keys(tracker):
+    for key, hits in (("blog:1", 10), ("blog:2", 5), ("blog:3", 1), ("user:a", 7)):
+        for _ in range(hits):
+            tracker.record(key)
+
+    ranking = [key for key, _ in tracker.top()]
+    assert ranking == ["blog:1", "user:a", "blog:2"]
+
+
+def test_tracker_top_limit_and_decay(tracker):
+    for _ in range(4):
+        tracker.record("blog:1")
+    tracker.record("blog:2")
+
+    assert tracker.top(1) == [("blog:1", 4)]
+    tracker.decay()
+    assert tracker.top() == [("blog:1", 2)]
+
+
+def cache_with_pipeline(tracker, execute):
+    cache = RedisCache(redis_url="redis://localhost:6379/0", hot_keys=tracker)
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(side_effect=execute)
+    pipeline = MagicMock()
+    pipeline.__aenter__ = AsyncMock(return_value=pipe)
+    pipeline.__aexit__ = AsyncMock(return_value=False)
+    cache.redis = MagicMock()
+    cache.redis.pipeline.return_value = pipeline
+    return cache, pipe
+
+
+def test_persist_adds_counts_to_other_workers_and_then_decays(tracker):
+    for _ in range(4):
+        tracker.record("blog:1")
+    cache, pipe = cache_with_pipeline(tracker, lambda: [4.0, 0, True])
+
+    asyncio.run(cache.persist_hot_keys())
+
+    pipe.zincrby.assert_called_once_with(HOT_KEYS_KEY, 4, "blog:1")
+    pipe.zadd.assert_not_called()
+    assert tracker.top() == [("blog:1", 2)]
+
+
+def test_failed_persist_keeps_local_counts(tracker):
+    for _ in range(4):
+        tracker.record("blog:1")
+    cache, _ = cache_with_pipeline(tracker, ConnectionError("down"))
+
+    asyncio.run(cache.persist_hot_keys())
+
+    assert tracker.top() == [("blog:1", 4)]
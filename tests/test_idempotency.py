@@ -0,0 +1,132 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.util import greenlet_spawn
+
+from app.core import idempotency
+from app.core.database import apply_invalidation, discard_invalidation, get_session
+from app.core.idempotency import idempotent
+from app.core.middlewares import AccessControlMiddleware
+
+
+class FakeIdempotencyCache:
+    def __init__(self):
+        self.store = {}
+
+    async def set_if_absent(self, key, value, expire):
+        if key in self.store:
+            return False
+        self.store[key] = value
+        return True
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    async def invalidate(self, keys=(), ops=(), **changes):
+        await self.delete(*keys)
+        pipe = SimpleNamespace(set=lambda key, value, ex=None: self.store.update({key: value}))
+        for op in ops:
+            op(pipe)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    cache = FakeIdempotencyCache()
+    monkeypatch.setattr(idempotency, "redis_cache", cache)
+    monkeypatch.setattr(idempotency.config, "IDEMPOTENCY_WAIT_TIMEOUT", 0.1)
+    calls = []
+    app = FastAPI()
+    app.add_middleware(AccessControlMiddleware)
+
+    commits = []
+
+    async def session():
+        db = SimpleNamespace(info={})
+        yield db
+        # Stands in for the commit: its after_commit hook, or the rollback
+        # hook when the commit fails.
+        hook = apply_invalidation if not commits or commits.pop(0) else discard_invalidation
+        await greenlet_spawn(hook, db)
+
+    app.dependency_overrides[get_session] = session
+
+    @app.post("/items", status_code=201, response_model=dict)
+    @idempotent(namespace="items", model=dict, status_code=201)
+    async def create_item(item: dict):
+        calls.append(item)
+        if item.get("fail"):
+            raise ValueError("boom")
+        return {"id": len(calls), **item}
+
+    test_client = TestClient(app, raise_server_exceptions=False)
+    test_client.calls = calls
+    test_client.cache = cache
+    test_client.commits = commits
+    return test_client
+
+
+def test_duplicate_replays_stored_response(client):
+    headers = {"Idempotency-Key": "k1"}
+    first = client.post("/items", json={"title": "a"}, headers=headers)
+    second = client.post("/items", json={"title": "a"}, headers=headers)
+
+    assert len(client.calls) == 1
+    assert second.status_code == first.status_code == 201
+    assert second.json() == first.json() == {"id": 1, "title": "a"}
+    assert second.headers["idempotent-replayed"] == "true"
+
+
+def test_requests_without_key_are_not_deduplicated(client):
+    client.post("/items", json={"title": "a"})
+    client.post("/items", json={"title": "a"})
+
+    assert len(client.calls) == 2
+
+
+def test_key_reused_with_different_body_is_rejected(client):
+    client.post("/items", json={"title": "a"}, headers={"Idempotency-Key": "k1"})
+    response = client.post("/items", json={"title": "b"}, headers={"Idempotency-Key": "k1"})
+
+    assert response.status_code == 422
+    assert len(client.calls) == 1
+
+
+def test_in_progress_duplicate_conflicts(client):
+    first = client.post("/items", json={"title": "a"}, headers={"Idempotency-Key": "k1"})
+    key = next(iter(client.cache.store))
+    client.cache.store[key] = client.cache.store[key].replace('"done"', '"pending"')
+
+    response = client.post("/items", json={"title": "a"}, headers={"Idempotency-Key": "k1"})
+
+    assert first.status_code == 201
+    assert response.status_code == 409
+
+
+def test_failed_request_releases_key(client):
+    headers = {"Idempotency-Key": "k1"}
+    client.post("/items", json={"fail": True}, headers=headers)
+
+    assert client.cache.store == {}
+
+
+def test_failed_commit_releases_key(client):
+    headers = {"Idempotency-Key": "k1"}
+    client.commits.append(False)
+    client.post("/items", json={"title": "a"}, headers=headers)
+
+    assert client.cache.store == {}
+    response = client.post("/items", json={"title": "a"}, headers=headers)
+    assert response.status_code == 201
+    assert len(client.calls) == 2
+
+
+def test_anonymous_keys_are_scoped_by_client_address(client):
+    client.post("/items", json={"title": "a"}, headers={"Idempotency-Key": "k1"})
+
+    assert list(client.cache.store) == ["idempotency:items:anonymous:testclient:k1"]
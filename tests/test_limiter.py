@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from app.core.limiter import AdaptiveConcurrencyLimiter
+from app.core.middlewares import ConcurrencyLimitMiddleware
+
+
+@pytest.fixture
+def limiter():
+    return AdaptiveConcurrencyLimiter(
+        initial_limit=2, min_limit=1, max_limit=10,
+        queue_size=1, queue_timeout=0.05,
+    )
+
+
+def test_acquire_sheds_when_queue_full(limiter):
+    async def scenario():
+        assert await limiter.acquire()
+        assert await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.queued == 1
+        # The queue holds a single waiter, so the next request is shed.
+        assert not await limiter.acquire()
+        limiter.release(latency=0.01)
+        assert await queued
+        assert limiter.in_flight == 2
+
+    asyncio.run(scenario())
+
+
+def test_acquire_sheds_after_queue_timeout(limiter):
+    async def scenario():
+        assert await limiter.acquire()
+        assert await limiter.acquire()
+        assert not await limiter.acquire()
+        assert limiter.queued == 0
+
+    asyncio.run(scenario())
+
+
+def test_limit_grows_while_latency_is_stable(limiter):
+    async def scenario():
+        for _ in range(5):
+            await limiter.acquire()
+            limiter.release(latency=0.01)
+
+    asyncio.run(scenario())
+    assert limiter.limit > 2
+
+
+def test_limit_backs_off_when_latency_degrades():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, min_limit=1)
+
+    async def scenario():
+        await limiter.acquire()
+        limiter.release(latency=0.01)
+        before = limiter.limit
+        await limiter.acquire()
+        limiter.release(latency=1.0)
+        return before
+
+    before = asyncio.run(scenario())
+    assert limiter.limit < before
+
+
+def test_middleware_returns_503_and_skips_exempt_paths():
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    limiter = AdaptiveConcurrencyLimiter(
+        initial_limit=1, min_limit=1, max_limit=1, queue_size=0
+    )
+    limiter._in_flight = 1  # Simulate a saturated worker.
+    app.add_middleware(
+        ConcurrencyLimitMiddleware, limiter=limiter, exempt_paths=["/health"]
+    )
+    client = TestClient(app)
+
+    response = client.get("/work")
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+    assert client.get("/health").status_code == status.HTTP_200_OK
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.listener import InvalidationListener, asyncpg_dsn, invalidations
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+def notification(table, op, old=None, new=None):
+    return {"table": table, "op": op, "old": old, "new": new}
+
+
+def test_blog_update_purges_entity():
+    keys, tags = invalidations(notification(
+        "blog_posts", "UPDATE", old={"id": 4, "author_id": 1}, new={"id": 4, "author_id": 1}
+    ))
+    assert keys == {"blog:4", "repo:BlogPost:get_by_id:4"}
+    assert tags == {"blogs", "repo:BlogPost:4"}
+
+
+def test_user_email_change_purges_previous_key_and_repository_reads():
+    keys, tags = invalidations(notification(
+        "users", "UPDATE", old={"id": 3, "email": "a@example.com", "username": "a"},
+        new={"id": 3, "email": "b@example.com", "username": "b"},
+    ))
+    assert keys == {
+        "user:a@example.com",
+        "user:b@example.com",
+        "repo:User:get_by_id:3",
+        "repo:User:get_by_email:b@example.com",
+        "repo:User:get_by_name:b",
+    }
+    assert tags == {"users", "repo:User:3"}
+
+
+def test_user_delete_cascades_to_posts():
+    keys, tags = invalidations(notification(
+        "users", "DELETE", old={"id": 3, "email": "a@example.com", "username": "a"}
+    ))
+    assert keys == {"user:a@example.com", "count:users", "count:blog_posts"}
+    assert tags == {"users", "blogs", "author:3", "repo:User:3"}
+
+
+def test_batch_is_merged_into_one_invalidation():
+    cache = AsyncMock()
+    feed = MagicMock()
+    listener = InvalidationListener("postgresql://localhost/db", cache=cache, feed=feed)
+    local = []
+    listener.add_local_invalidator(lambda keys, tags: local.append((keys, tags)))
+    created_at = "2026-10-19T12:00:00+00:00"
+
+    asyncio.run(listener._process([
+        json.dumps(notification("blog_posts", "DELETE", old={"id": 1, "author_id": 1})),
+        json.dumps(notification("blog_posts", "DELETE", old={"id": 2, "author_id": 1})),
+        json.dumps(notification(
+            "blog_posts", "INSERT", new={"id": 3, "author_id": 1, "created_at": created_at}
+        )),
+        json.dumps(notification("blog_posts", "UPDATE", new={"id": 4, "author_id": 1})),
+        "not json",
+    ]))
+
+    keys = [
+        "blog:1", "blog:2", "blog:3", "blog:4", "count:blog_posts",
+        "repo:BlogPost:get_by_id:3", "repo:BlogPost:get_by_id:4",
+    ]
+    tags = ["blogs", "repo:BlogPost:1", "repo:BlogPost:2"]
+    cache.invalidate.assert_awaited_once_with(keys=keys, tags=tags, ops=[
+        feed.remove.return_value, feed.remove.return_value,
+        feed.insert.return_value, feed.refresh.return_value,
+    ])
+    assert [call.args for call in feed.remove.call_args_list] == [(1,), (2,)]
+    feed.insert.assert_called_once_with(3, datetime(2026, 10, 19, 12, tzinfo=timezone.utc))
+    feed.refresh.assert_called_once_with(4, None)
+    assert local == [(keys, tags)]
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="needs TEST_DATABASE_URL (migrated)")
+def test_trigger_notifies_listener():
+    import asyncpg
+
+    cache = AsyncMock()
+    dsn = asyncpg_dsn(TEST_DATABASE_URL)
+    listener = InvalidationListener(dsn, cache=cache, batch_window=0.01)
+
+    async def scenario():
+        listener.start()
+        await asyncio.sleep(0.5)
+        connection = await asyncpg.connect(dsn)
+        try:
+            async with connection.transaction():
+                await connection.execute(
+                    "INSERT INTO users (username, email, hashed_password) "
+                    "VALUES ('listener', 'listener@example.com', 'x')"
+                )
+                await connection.execute(
+                    "DELETE FROM users WHERE email = 'listener@example.com'"
+                )
+            await asyncio.sleep(0.5)
+        finally:
+            await connection.close()
+            await listener.stop()
+
+    asyncio.run(scenario())
+    invalidated = {key for call in cache.invalidate.await_args_list for key in call.kwargs["keys"]}
+    assert "user:listener@example.com" in invalidated
+
+
+def test_users_written_elsewhere_are_added_to_filter():
+    cache = AsyncMock()
+    user_filter = MagicMock()
+    listener = InvalidationListener(
+        "postgresql://localhost/db", cache=cache, user_filter=user_filter
+    )
+    new = {"id": 3, "email": "a@example.com", "username": "a"}
+
+    asyncio.run(listener._process([
+        json.dumps(notification("users", "INSERT", new=new)),
+        json.dumps(notification("users", "DELETE", old=new)),
+    ]))
+
+    assert [call.args for call in user_filter.add.call_args_list] == [
+        ("email:a@example.com",), ("username:a",),
+    ]
+    assert cache.invalidate.await_args.kwargs["ops"] == [user_filter.add.return_value] * 2
@@ -0,0 +1,34 @@
+import asyncio
+import logging
+import time
+
+from app.core.loop_monitor import LoopMonitor, loop_blocked_counter, loop_lag_histogram
+
+
+def handle_request():
+    scope = {"type": "http", "method": "GET", "path": "/blogs/7"}
+    time.sleep(0.3)  # synchronous work on the loop
+    return scope
+
+
+def test_stall_logs_stack_and_route_once(caplog):
+    monitor = LoopMonitor(interval=0.02, threshold=0.05)
+    blocked = loop_blocked_counter.value()
+    observed = loop_lag_histogram.count()
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.1)
+        handle_request()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+    with caplog.at_level(logging.WARNING, logger="app.core.loop_monitor"):
+        asyncio.run(scenario())
+
+    reports = [record.getMessage() for record in caplog.records]
+    assert len(reports) == 1
+    assert "route GET /blogs/7" in reports[0]
+    assert "handle_request" in reports[0]
+    assert loop_blocked_counter.value() == blocked + 1
+    assert loop_lag_histogram.count() > observed
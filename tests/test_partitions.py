@@ -0,0 +1,18 @@
+from datetime import date
+
+from app.commands.partitions import expired_partitions, month_start
+
+
+def test_month_start_crosses_years():
+    assert month_start(date(2026, 10, 19)) == date(2026, 10, 1)
+    assert month_start(date(2026, 10, 19), 3) == date(2027, 1, 1)
+    assert month_start(date(2026, 1, 5), -13) == date(2024, 12, 1)
+
+
+def test_only_whole_months_before_cutoff_expire():
+    names = ["blog_posts_p202608", "blog_posts_p202609", "blog_posts_p202610",
+             "blog_posts_default", "blog_posts_p2026"]
+
+    assert expired_partitions(names, cutoff=date(2026, 10, 1)) == [
+        "blog_posts_p202608", "blog_posts_p202609",
+    ]
@@ -0,0 +1,86 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import admin
+from app.core.dependencies.current_user import get_admin_user
+from app.core.middlewares import AccessControlMiddleware, ProfilingMiddleware
+from app.core.profiling import RequestProfiler, render
+
+
+def make_client(sample_rate=0, token="secret"):
+    profiler = RequestProfiler(cache=AsyncMock(), sample_rate=sample_rate)
+    app = FastAPI()
+
+    @app.get("/items/{id}")
+    async def item(id: int):
+        return {"id": id, "total": sum(range(1000))}
+
+    app.add_middleware(ProfilingMiddleware, profiler=profiler, router=app.router, token=token)
+    return TestClient(app), profiler
+
+
+def test_authorized_header_profiles_request():
+    client, profiler = make_client()
+
+    response = client.get("/items/1", headers={"X-Profile": "secret"})
+
+    profile_id = response.headers["x-profile-id"]
+    store = profiler.cache.pipeline
+    store.assert_awaited_once()
+    assert store.await_args.kwargs == {"binary": True}
+    assert response.json() == {"id": 1, "total": 499500}
+    assert len(profile_id) == 32
+
+
+def test_unauthorized_header_is_ignored():
+    client, profiler = make_client()
+
+    response = client.get("/items/1", headers={"X-Profile": "guess"})
+
+    assert "x-profile-id" not in response.headers
+    profiler.cache.pipeline.assert_not_awaited()
+
+
+def test_sampling_is_per_route():
+    client, profiler = make_client(sample_rate=3, token=None)
+
+    profiled = [
+        "x-profile-id" in client.get(f"/items/{index}").headers for index in range(6)
+    ]
+
+    assert profiled == [False, False, True, False, False, True]
+    assert profiler._counts == {"GET /items/{id}": 0}
+
+
+def test_one_profile_at_a_time_and_report_renders():
+    profiler = RequestProfiler(cache=AsyncMock())
+    profile = profiler.start()
+    assert profiler.start() is None
+    sorted(range(10000), key=lambda value: -value)
+    data = profiler.stop(profile)
+
+    profiler.stop(profiler.start())
+    assert "function calls" in render(data)
+    asyncio.run(profiler.store("abc", {"created_at": 1.0}, data))
+
+
+def test_unknown_sort_key_is_a_bad_request(monkeypatch):
+    with pytest.raises(ValueError):
+        render(b"", sort="bogus")
+
+    monkeypatch.setattr(admin.request_profiler, "get", AsyncMock(return_value=b""))
+    app = FastAPI()
+    app.include_router(admin.router)
+    app.add_middleware(AccessControlMiddleware)
+    app.dependency_overrides[get_admin_user] = lambda: None
+    client = TestClient(app)
+
+    response = client.get("/profiles/abc", params={"format": "text", "sort": "bogus"})
+
+    assert response.status_code == 400
+    assert "cumulative" in response.json()["detail"]
@@ -0,0 +1,198 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import create_engine, delete
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from app.core.exceptions import NotFoundException
+from app.models.user import User
+from app.repositories import query_cache
+from app.repositories.blog import BlogRepository
+from app.repositories.user import UserRepository
+
+CREATED_AT = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = AsyncMock()
+    cache.get.return_value = None
+    monkeypatch.setattr(query_cache, "redis_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert().values(
+            id=1, username="ada", email="ada@example.com",
+            hashed_password="x", created_at=CREATED_AT,
+        ))
+    with Session(engine) as session:
+        yield session
+        session.rollback()
+
+
+def fake_db():
+    db = MagicMock()
+    db.info = {}
+    db.identity_map.get.return_value = None
+    db.merge = AsyncMock(side_effect=lambda obj, load: obj)
+    return db
+
+
+def make_user():
+    return User(id=1, username="ada", email="ada@example.com", hashed_password="x",
+                full_name=None, is_active=1, created_at=CREATED_AT)
+
+
+def test_miss_reads_database_and_caches_tagged_row(cache):
+    repository = UserRepository()
+    db = fake_db()
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = make_user()
+    db.execute = AsyncMock(return_value=result)
+
+    user = asyncio.run(repository.get_by_email(db=db, email="ada@example.com"))
+
+    assert user.email == "ada@example.com"
+    key, data = cache.set.await_args.args
+    assert key == "repo:User:get_by_email:ada@example.com"
+    assert cache.set.await_args.kwargs == {
+        "expire": repository.cache_ttl, "tags": ["repo:User", "repo:User:1"],
+    }
+    assert query_cache.encode(make_user(), exclude=repository.cache_exclude) == data
+    assert "hashed_password" not in data
+
+
+def test_hit_attaches_cached_row_without_query(cache):
+    cache.get.return_value = query_cache.encode(make_user(), exclude=("hashed_password",))
+    db = fake_db()
+    db.execute = AsyncMock()
+
+    user = asyncio.run(UserRepository().get_by_name(db=db, username="ada"))
+
+    cache.get.assert_awaited_once_with("repo:User:get_by_name:ada")
+    db.execute.assert_not_awaited()
+    assert (user.id, user.email, user.created_at) == (1, "ada@example.com", CREATED_AT)
+
+
+def test_miss_is_cached_briefly_and_replayed(cache):
+    repository = UserRepository()
+    db = fake_db()
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = None
+    db.execute = AsyncMock(return_value=result)
+
+    assert asyncio.run(repository.get_by_email(db=db, email="nobody@example.com")) is None
+    cache.set.assert_awaited_once_with(
+        "repo:User:get_by_email:nobody@example.com", "",
+        expire=repository.negative_cache_ttl,
+    )
+
+    cache.get.return_value = ""
+    assert asyncio.run(repository.get_by_email(db=db, email="nobody@example.com")) is None
+    db.execute.assert_awaited_once()
+
+
+def test_not_found_is_cached_and_raised_again(cache):
+    repository = BlogRepository()
+    db = fake_db()
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = None
+    db.execute = AsyncMock(return_value=result)
+
+    with pytest.raises(NotFoundException):
+        asyncio.run(repository.get_by_id(db=db, id_=404))
+    key, detail = cache.set.await_args.args
+    assert (key, detail) == ("repo:BlogPost:get_by_id:404", "BlogPost with id 404 not found")
+
+    cache.get.return_value = detail
+    with pytest.raises(NotFoundException) as error:
+        asyncio.run(repository.get_by_id(db=db, id_=404))
+    assert error.value.detail == detail
+    db.execute.assert_awaited_once()
+
+
+def test_session_that_wrote_the_model_bypasses_cache(cache):
+    db = fake_db()
+    query_cache.mark_written(db, User)
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = None
+    db.execute = AsyncMock(return_value=result)
+
+    asyncio.run(UserRepository().get_by_email(db=db, email="ada@example.com"))
+
+    cache.get.assert_not_awaited()
+    db.execute.assert_awaited_once()
+
+
+def test_bypass_cache_block_reads_from_database(cache):
+    db = fake_db()
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = None
+    db.execute = AsyncMock(return_value=result)
+
+    with query_cache.bypass_cache(db):
+        asyncio.run(UserRepository().get_by_email(db=db, email="ada@example.com"))
+    cache.get.assert_not_awaited()
+
+    asyncio.run(UserRepository().get_by_email(db=db, email="ada@example.com"))
+    cache.get.assert_awaited_once()
+
+
+def test_flushed_update_invalidates_row_on_commit(cache, session):
+    UserRepository()
+    user = session.get(User, 1)
+    user.email = "lovelace@example.com"
+
+    session.flush()
+
+    invalidation = session.info["invalidation"]
+    assert invalidation.tags == {"repo:User:1"}
+    assert "repo:User:get_by_email:lovelace@example.com" in invalidation.keys
+    assert "User" in session.info[query_cache.WRITTEN]
+
+
+def test_flushed_insert_clears_cached_misses(cache, session):
+    UserRepository()
+    session.add(User(id=2, username="bob", email="bob@example.com", hashed_password="x"))
+
+    session.flush()
+
+    invalidation = session.info["invalidation"]
+    assert invalidation.keys == {
+        "repo:User:get_by_id:2",
+        "repo:User:get_by_email:bob@example.com",
+        "repo:User:get_by_name:bob",
+    }
+    assert not invalidation.tags
+
+
+def test_bulk_delete_invalidates_model(cache, session):
+    UserRepository()
+
+    session.execute(delete(User).where(User.username == "ada"))
+
+    assert session.info["invalidation"].tags == {"repo:User"}
+
+
+def test_password_hash_of_cached_row_is_loaded_on_demand(cache, session):
+    repository = UserRepository()
+    data = query_cache.encode(session.get(User, 1), exclude=repository.cache_exclude)
+    session.expunge_all()
+    # Runs the async helpers against the sync session.
+    db = MagicMock(wraps=session, identity_map=session.identity_map)
+    db.merge = AsyncMock(side_effect=session.merge)
+    db.refresh = AsyncMock(side_effect=session.refresh)
+
+    user = asyncio.run(query_cache._attach(db, User, data))
+
+    assert "hashed_password" not in sa_inspect(user).dict
+    assert asyncio.run(repository.get_password_hash(db=db, user=user)) == "x"
+    db.refresh.assert_awaited_once_with(user, ["hashed_password"])
@@ -0,0 +1,78 @@
+import gzip
+
+import brotli
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.core import response_cache
+from app.core.response_cache import cache_response, negotiate_encoding
+
+
+class FakeResponseCache:
+    def __init__(self):
+        self.store = {}
+
+    async def get_response(self, key, encoding):
+        entry = self.store.get(key)
+        if entry is None:
+            return None
+        if encoding in entry:
+            return encoding, entry[encoding], entry["headers"]
+        return "identity", entry["identity"], entry["headers"]
+
+    async def set_response(self, key, variants, headers, expire=600, tags=()):
+        self.store[key] = {**variants, "headers": headers}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(response_cache, "redis_cache", FakeResponseCache())
+    calls = []
+    app = FastAPI()
+
+    @app.get("/items", response_model=list[dict])
+    @cache_response(namespace="items", model=list[dict])
+    async def items(response: Response, limit: int = 100):
+        calls.append(limit)
+        response.headers["X-Total-Count"] = "1000"
+        return [{"id": index, "title": "x" * 20} for index in range(limit)]
+
+    test_client = TestClient(app)
+    test_client.calls = calls
+    return test_client
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, deflate") == "identity"
+    assert negotiate_encoding("") == "identity"
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("gzip, br;q=0") == "gzip"
+
+
+def test_hit_skips_endpoint_and_serves_stored_variant(client):
+    first = client.get("/items?limit=50", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/items?limit=50", headers={"Accept-Encoding": "gzip"})
+
+    assert client.calls == [50]
+    assert second.headers["content-encoding"] == "gzip"
+    assert second.headers["x-total-count"] == "1000"
+    assert second.json() == first.json()
+    assert len(second.json()) == 50
+
+
+def test_small_bodies_fall_back_to_identity(client):
+    client.get("/items?limit=1")
+    response = client.get("/items?limit=1", headers={"Accept-Encoding": "gzip"})
+
+    assert client.calls == [1]
+    assert "content-encoding" not in response.headers
+    assert response.json() == [{"id": 0, "title": "x" * 20}]
+
+
+def test_stored_compressed_variants_are_valid(client):
+    client.get("/items?limit=50")
+    entry = next(iter(response_cache.redis_cache.store.values()))
+    assert gzip.decompress(entry["gzip"]) == entry["identity"]
+    assert brotli.decompress(entry["br"]) == entry["identity"]
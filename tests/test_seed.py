@@ -0,0 +1,63 @@
+import io
+import random
+from collections import Counter
+from datetime import datetime, timezone
+
+from app.commands.seed import generate_posts, generate_users, read_ndjson, POST_COLUMNS, USER_COLUMNS
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+END = datetime(2026, 1, 1, tzinfo=timezone.utc)
+TEMPLATES = ["hash-0", "hash-1"]
+
+
+def posts(seed, count=2000):
+    return list(generate_posts(
+        random.Random(seed), count, 1, range(1, 101), START, END, exponent=1.1, batch_size=500
+    ))
+
+
+def test_same_seed_reproduces_dataset():
+    assert posts(7) == posts(7)
+    assert posts(7) != posts(8)
+
+
+def test_authors_are_skewed_and_content_sizes_vary():
+    rows = posts(7)
+    per_author = Counter(row[3] for row in rows).most_common()
+    lengths = sorted(len(row[2]) for row in rows)
+
+    assert per_author[0][1] > 10 * per_author[-1][1]
+    assert all(START <= row[4] <= END for row in rows)
+    assert 200 <= lengths[0] and lengths[-1] <= 20000
+    assert lengths[len(lengths) // 2] > 500
+
+
+def test_users_share_password_templates():
+    users = list(generate_users(random.Random(1), 4, 10, START, END, TEMPLATES))
+
+    assert [user[0] for user in users] == [10, 11, 12, 13]
+    assert [user[3] for user in users] == ["hash-0", "hash-1", "hash-0", "hash-1"]
+    assert len({user[2] for user in users}) == 4
+
+
+def test_ndjson_import_fills_missing_hashes_and_parses_timestamps():
+    lines = io.StringIO(
+        '{"id": 3, "username": "a", "email": "a@example.com", "created_at": "2025-05-01T00:00:00+00:00", "extra": 1}\n'
+        '\n'
+        '{"id": 4, "username": "b", "email": "b@example.com", "hashed_password": "h", "created_at": null}\n'
+    )
+    columns, records = read_ndjson(lines, USER_COLUMNS, TEMPLATES)
+
+    assert columns == ["id", "username", "email", "created_at", "hashed_password"]
+    assert list(records) == [
+        (3, "a", "a@example.com", datetime(2025, 5, 1, tzinfo=timezone.utc), "hash-1"),
+        (4, "b", "b@example.com", None, "h"),
+    ]
+
+
+def test_ndjson_import_of_posts_keeps_given_columns():
+    lines = io.StringIO('{"title": "t", "content": "c", "author_id": 1}\n')
+    columns, records = read_ndjson(lines, POST_COLUMNS, TEMPLATES)
+
+    assert columns == ["title", "content", "author_id"]
+    assert list(records) == [("t", "c", 1)]
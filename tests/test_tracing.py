@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.middlewares import TracingMiddleware
+from app.core.tracing import (
+    STATUS_ERROR,
+    SpanExporter,
+    Tracer,
+    current_span,
+    instrument,
+    parse_traceparent,
+)
+
+
+@instrument
+class Repo:
+    async def get(self, id_):
+        return {"id": id_}
+
+    async def fail(self):
+        raise ValueError("boom")
+
+
+class ItemRepo(Repo):
+    pass
+
+
+def make_client(sample_ratio=1.0, tmp_path=None):
+    exporter = SpanExporter("test", path=str(tmp_path / "traces.jsonl") if tmp_path else None)
+    tracer = Tracer(exporter, sample_ratio=sample_ratio)
+    app = FastAPI()
+    repo = ItemRepo()
+
+    @app.get("/items/{id}")
+    async def item(id: int):
+        return await repo.get(id)
+
+    @app.get("/broken")
+    async def broken():
+        await repo.fail()
+
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+    return TestClient(app, raise_server_exceptions=False), exporter
+
+
+def test_sampled_request_records_nested_spans():
+    client, exporter = make_client()
+
+    response = client.get("/items/3")
+
+    trace_id = response.headers["x-trace-id"]
+    child, root = exporter._queue
+    assert root.name == "GET /items/{id}"
+    assert root.attributes["http.status_code"] == 200
+    assert child.name == "ItemRepo.get"
+    assert child.trace_id == root.trace_id == trace_id
+    assert child.parent_id == root.span_id
+    assert current_span.get() is None
+
+
+def test_unsampled_request_records_nothing():
+    client, exporter = make_client(sample_ratio=0)
+
+    response = client.get("/items/3")
+
+    assert response.json() == {"id": 3}
+    assert "x-trace-id" not in response.headers
+    assert not exporter._queue
+
+
+def test_traceparent_continues_callers_trace():
+    client, exporter = make_client(sample_ratio=0)
+    trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+
+    client.get("/items/3", headers={"traceparent": f"00-{trace_id}-{parent_id}-01"})
+    client.get("/items/3", headers={"traceparent": f"00-{trace_id}-{parent_id}-00"})
+
+    root = exporter._queue[-1]
+    assert len(exporter._queue) == 2
+    assert (root.trace_id, root.parent_id) == (trace_id, parent_id)
+
+
+def test_malformed_traceparent_is_ignored():
+    client, exporter = make_client(sample_ratio=0)
+    trace_id, parent_id = "a" * 32, "b" * 16
+
+    for header in (
+        f"00-{trace_id}-{parent_id}-zz",
+        f"00-{trace_id.upper()}-{parent_id}-01",
+        f"ff-{trace_id}-{parent_id}-01",
+        f"00-{'0' * 32}-{parent_id}-01",
+        f"00-{trace_id}-{parent_id}-01-extra",
+    ):
+        response = client.get("/items/3", headers={"traceparent": header})
+        assert response.status_code == 200
+
+    assert not exporter._queue
+    assert parse_traceparent(f"01-{trace_id}-{parent_id}-01-extra") == (trace_id, parent_id, True)
+
+
+def test_errors_mark_spans():
+    client, exporter = make_client()
+
+    assert client.get("/broken").status_code == 500
+
+    child, root = exporter._queue
+    assert child.status == root.status == STATUS_ERROR
+    assert child.attributes["exception.type"] == "ValueError"
+
+
+def test_exporter_writes_otlp_json_batches(tmp_path):
+    client, exporter = make_client(tmp_path=tmp_path)
+    exporter.batch_size = 1
+    client.get("/items/3")
+
+    asyncio.run(exporter.flush())
+
+    lines = (tmp_path / "traces.jsonl").read_text().splitlines()
+    batches = [json.loads(line)["resourceSpans"][0] for line in lines]
+    spans = [batch["scopeSpans"][0]["spans"][0] for batch in batches]
+    assert len(batches) == 2
+    assert batches[0]["resource"]["attributes"][0]["value"] == {"stringValue": "test"}
+    assert spans[1]["kind"] == 2
+    assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+    assert {"key": "http.status_code", "value": {"intValue": "200"}} in spans[1]["attributes"]
+    assert not exporter._queue
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
@@ -105,8 +107,7 @@ async def test_get_user_from_cache(mock_user_controller, mock_redis_cache,
 
     retrieved_user = await mock_user_controller.get_user(email="test@example.com")
     assert retrieved_user == mock_user_response
-    mock_redis_cache.get.assert_called_once_with(
-        "user:None")  # id is None in mock_user_response
+    mock_redis_cache.get.assert_called_once_with("user:test@example.com")
 
 
 async def test_get_user_not_found(client, mock_user_controller):
@@ -131,39 +132,62 @@ async def test_read_users_from_cache(mock_user_controller, mock_redis_cache,
     mock_redis_cache.get.assert_called_once_with("users:0:100")
 
 
-async def test_create_user_invalidates_cache(mock_user_controller, mock_redis_cache,
-                                             mock_user):
-    mock_user_controller.create_user.return_value = mock_user
-    mock_user_controller.redis_cache = mock_redis_cache
-    mock_redis_cache.redis = AsyncMock()  # Mock the underlying Redis client
-
-    user_create = UserCreate(email="new@example.com", password="password")
-    await mock_user_controller.create_user(user=user_create)
-
-    mock_redis_cache.redis.keys.assert_called_once_with("users:*")
-    mock_redis_cache.redis.delete.assert_called_once()  # Assuming there's at least one key
-
-
-async def test_delete_user_invalidates_cache(mock_user_controller, mock_redis_cache):
-    mock_user_controller.redis_cache = mock_redis_cache
-    mock_redis_cache.redis = AsyncMock()
-
-    await mock_user_controller.user_delete(id=1)
-
-    mock_redis_cache.redis.delete.assert_any_call("user:1")
-    mock_redis_cache.redis.keys.assert_called_once_with("users:*")
-    mock_redis_cache.redis.delete.assert_called()  # Ensure delete is called at least twice
-
-
-async def test_edit_user_invalidates_cache(mock_user_controller, mock_redis_cache,
-                                           mock_user):
-    mock_user_controller.edit_user_db.return_value = mock_user
-    mock_user_controller.redis_cache = mock_redis_cache
-    mock_redis_cache.redis = AsyncMock()
-
-    user_update = UserUpdate(email="updated@example.com")
-    await mock_user_controller.edit_user_db(id=1, user=user_update)
-
-    mock_redis_cache.redis.delete.assert_any_call("user:1")
-    mock_redis_cache.redis.keys.assert_called_once_with("users:*")
-    mock_redis_cache.redis.delete.assert_called()  # Ensure delete is called at least twice
+def test_create_user_invalidates_cache(mock_redis_cache, mock_user,
+                                       make_controller, commit):
+    mock_user.username = "test"
+    repository = AsyncMock()
+    repository.create.return_value = mock_user
+    controller = make_controller(UserController, user_repository=repository,
+                                 redis_cache=mock_redis_cache,
+                                 blog_repository=AsyncMock(), blog_feed=MagicMock())
+
+    user_create = UserCreate(username="test", email="test@example.com",
+                             password="password")
+    asyncio.run(controller.create_user(user=user_create))
+    mock_redis_cache.invalidate.assert_not_called()
+    commit()
+
+    changes = mock_redis_cache.invalidate.call_args.kwargs
+    assert changes["tags"] == ["users"]
+    assert changes["counters"] == {"count:users": 1}
+    assert json.loads(changes["values"]["user:test@example.com"])["id"] == 1
+
+
+def test_delete_user_invalidates_cache(mock_redis_cache, mock_user,
+                                       make_controller, commit):
+    repository = AsyncMock()
+    repository.get_by_id.return_value = mock_user
+    blog_repository = AsyncMock()
+    blog_repository.get_ids_by_author.return_value = [4, 5]
+    controller = make_controller(UserController, user_repository=repository,
+                                 redis_cache=mock_redis_cache,
+                                 blog_repository=blog_repository, blog_feed=MagicMock())
+
+    asyncio.run(controller.user_delete(id=1))
+    commit()
+
+    changes = mock_redis_cache.invalidate.call_args.kwargs
+    assert changes["keys"] == ["count:blog_posts", "user:test@example.com"]
+    assert changes["tags"] == ["author:1", "blogs", "users"]
+    assert changes["counters"] == {"count:users": -1}
+    assert [call.args for call in controller.blog_feed.remove.call_args_list] == [(4,), (5,)]
+    assert changes["ops"] == [controller.blog_feed.remove.return_value] * 2
+
+
+def test_edit_user_invalidates_cache(mock_redis_cache, mock_user,
+                                     make_controller, commit):
+    mock_user.username = "test"
+    repository = AsyncMock()
+    repository.update.return_value = mock_user
+    controller = make_controller(UserController, user_repository=repository,
+                                 redis_cache=mock_redis_cache,
+                                 blog_repository=AsyncMock(), blog_feed=MagicMock())
+
+    asyncio.run(controller.edit_user_db(id=1, user=UserUpdate(full_name="Test")))
+    commit()
+
+    repository.update.assert_awaited_once_with(
+        db=controller.session, id_=1, update_data={"full_name": "Test"})
+    changes = mock_redis_cache.invalidate.call_args.kwargs
+    assert changes["tags"] == ["users"]
+    assert "user:test@example.com" in changes["values"]